@@ -0,0 +1,10 @@
+"""
+Shared building blocks for the LunchTable TCG asset scripts.
+
+The scripts in scripts/ import from here (the scripts directory is on
+sys.path when they run). Modules follow a few rules so the scripts stay
+cheap to start and safe to interrupt: third-party packages are loaded on
+first use through deps.py, outputs are written atomically through
+fsutil.py, and per-image CPU work runs on a process pool (--workers,
+default all cores).
+"""
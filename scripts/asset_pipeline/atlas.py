@@ -0,0 +1,196 @@
+"""
+Texture atlases for the board renderer.
+
+Frames, glows and the card back are packed into a "ui" atlas at 512px wide,
+and card arts into one atlas per deck at 256px wide (thumbnail size), using
+MaxRects bin packing (best short side fit, no rotation). Each atlas is
+recorded in the manifest under "atlases" with pixel and normalised UV rects
+per sprite. Normalised UVs stay valid for the downscaled WebP/AVIF variants.
+An atlas is only re-rendered when the content hashes of its inputs change.
+"""
+
+import fnmatch
+import hashlib
+import json
+
+from .deps import load_pillow
+from .fsutil import atomic_writer, sha256_file
+from .log import log
+
+ATLAS_DIR_NAME = "atlases"
+MAX_ATLAS_SIZE = 4096
+PADDING = 2
+UI_ATLAS_PATTERNS = (
+    "frames/*.png",
+    "board/card-frame-*.png",
+    "board/zone-glow-*.png",
+    "board/card-back.png",
+)
+UI_SPRITE_WIDTH = 512
+CARD_SPRITE_WIDTH = 256
+
+
+class MaxRectsBin:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+        self.used_width = 0
+        self.used_height = 0
+
+    def insert(self, w, h):
+        """Place a w x h rect; returns (x, y) or None if it doesn't fit."""
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                score = (min(fw - w, fh - h), max(fw - w, fh - h))
+                if best is None or score < best[0]:
+                    best = (score, fx, fy)
+        if best is None:
+            return None
+        _, x, y = best
+        self._split(x, y, w, h)
+        self.used_width = max(self.used_width, x + w)
+        self.used_height = max(self.used_height, y + h)
+        return x, y
+
+    def _split(self, x, y, w, h):
+        pieces = set()
+        for fx, fy, fw, fh in self.free:
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                pieces.add((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                pieces.add((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                pieces.add((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                pieces.add((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                pieces.add((fx, y + h, fw, fy + fh - y - h))
+        self.free = [
+            a for a in pieces
+            if not any(b != a and _contains(b, a) for b in pieces)
+        ]
+
+
+def _contains(outer, inner):
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return ox <= ix and oy <= iy and ix + iw <= ox + ow and iy + ih <= oy + oh
+
+
+def pack(sizes, max_size=MAX_ATLAS_SIZE, padding=PADDING):
+    """
+    Pack {key: (w, h)} into as few max_size bins as needed.
+    Returns [(bin, {key: (x, y)})], positions being the unpadded sprite origin.
+    """
+    order = sorted(sizes, key=lambda k: (max(sizes[k]), sizes[k][0] * sizes[k][1]), reverse=True)
+    bins = []
+    for key in order:
+        w, h = sizes[key]
+        pw, ph = w + 2 * padding, h + 2 * padding
+        if pw > max_size or ph > max_size:
+            raise ValueError(f"{key} ({w}x{h}) does not fit in a {max_size}px atlas")
+        for bin_, placed in bins:
+            pos = bin_.insert(pw, ph)
+            if pos:
+                break
+        else:
+            bin_, placed = MaxRectsBin(max_size, max_size), {}
+            bins.append((bin_, placed))
+            pos = bin_.insert(pw, ph)
+        placed[key] = (pos[0] + padding, pos[1] + padding)
+    return bins
+
+
+def atlas_groups(manifest):
+    """{group name: (sprite width, [asset rel paths])} from manifest entries."""
+    groups = {"ui": (UI_SPRITE_WIDTH, [])}
+    for rel, entry in sorted(manifest.assets.items()):
+        if any(fnmatch.fnmatch(rel, p) for p in UI_ATLAS_PATTERNS):
+            groups["ui"][1].append(rel)
+        elif rel.startswith("cards/"):
+            deck = (entry.get("source") or {}).get("deck") or "misc"
+            groups.setdefault(f"cards-{deck.lower()}", (CARD_SPRITE_WIDTH, []))[1].append(rel)
+    return {name: group for name, group in groups.items() if group[1]}
+
+
+def _inputs_digest(manifest, sprite_width, rels):
+    payload = [sprite_width, PADDING, MAX_ATLAS_SIZE]
+    payload += [[rel, manifest.assets[rel].get("sha256")] for rel in rels]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def build_atlas_group(name, sprite_width, rels, assets_dir):
+    """Render one group's atlas sheet(s). Returns the manifest "atlases" entries."""
+    Image = load_pillow()
+
+    sprites = {}
+    for rel in rels:
+        with Image.open(assets_dir / rel) as im:
+            height = round(im.height * sprite_width / im.width)
+            sprites[rel] = im.convert("RGBA").resize((sprite_width, height), Image.LANCZOS)
+
+    out_dir = assets_dir / ATLAS_DIR_NAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    for index, (bin_, placed) in enumerate(pack({k: im.size for k, im in sprites.items()})):
+        # Round up to a multiple of 4 for block-compressed GPU formats.
+        width = -(-bin_.used_width // 4) * 4
+        height = -(-bin_.used_height // 4) * 4
+        sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        rects = {}
+        for rel, (x, y) in placed.items():
+            w, h = sprites[rel].size
+            sheet.paste(sprites[rel], (x, y))
+            rects[rel] = {
+                "x": x, "y": y, "w": w, "h": h,
+                "u0": round(x / width, 6), "v0": round(y / height, 6),
+                "u1": round((x + w) / width, 6), "v1": round((y + h) / height, 6),
+            }
+        sheet_name = f"{name}-{index}"
+        path = out_dir / f"{sheet_name}.png"
+        with atomic_writer(path) as f:
+            sheet.save(f, format="PNG", optimize=True)
+        entries[sheet_name] = {
+            "path": str(path.relative_to(assets_dir)),
+            "sha256": sha256_file(path),
+            "bytes": path.stat().st_size,
+            "width": width,
+            "height": height,
+            "sprites": dict(sorted(rects.items())),
+        }
+        log(f"  Atlas: {path.name} {width}x{height}, {len(rects)} sprites")
+    return entries
+
+
+def build_atlases(manifest, force=False):
+    """
+    (Re)build every atlas group whose inputs changed and record them in the
+    manifest. Returns the paths of atlas sheets written.
+    """
+    written = []
+    atlases = dict(manifest.atlases)
+    groups = atlas_groups(manifest)
+    for name in list(atlases):
+        if atlases[name].get("group") not in groups:
+            del atlases[name]
+    for name, (sprite_width, rels) in groups.items():
+        digest = _inputs_digest(manifest, sprite_width, rels)
+        current = {k: v for k, v in atlases.items() if v.get("group") == name}
+        if not force and current and all(
+            v.get("inputs") == digest and (manifest.assets_dir / v["path"]).exists()
+            for v in current.values()
+        ):
+            continue
+        for key in current:
+            del atlases[key]
+        for sheet_name, entry in build_atlas_group(
+            name, sprite_width, rels, manifest.assets_dir
+        ).items():
+            entry.update(group=name, inputs=digest)
+            atlases[sheet_name] = entry
+            written.append(manifest.assets_dir / entry["path"])
+    manifest.atlases = dict(sorted(atlases.items()))
+    return written
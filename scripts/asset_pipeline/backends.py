@@ -0,0 +1,148 @@
+"""
+Image backends.
+
+A backend is any object with the OpenAI client's `images.generate(...)` /
+`images.edit(...)` surface returning `.data[0].b64_json`. The real client
+satisfies that directly. MockImageClient is a local stand-in that returns
+deterministic PNGs after a configurable latency and fails at configurable
+rates, so the pipeline can be exercised and benchmarked offline. Transparent
+mock images are an opaque band around a clear centre, so they pass the
+quality gate (quality.py) unless `defect_rate` makes them solid.
+
+Backends are chosen with a spec string:
+
+    openai
+    mock
+    mock:latency=0.2,rate_limit=0.1,error_rate=0.02,defect_rate=0.1,seed=7
+"""
+
+import base64
+import hashlib
+import random
+import struct
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+
+MOCK_DEFAULTS = {
+    "latency": 0.05,     # mean seconds per request (uniform +/-50%)
+    "rate_limit": 0.0,   # fraction of requests answered with 429
+    "error_rate": 0.0,   # fraction of requests answered with 500
+    "retry_after": 0.1,  # Retry-After seconds sent with 429s
+    "defect_rate": 0.0,  # fraction of transparent requests answered with a solid image
+    "seed": 0,
+}
+
+
+def _png_chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+
+def solid_png(width, height, rgba, margin=0, band=0):
+    """
+    Encode a PNG filled with `rgba`. With `margin`, that many pixels around
+    the edge are fully transparent (colour type 6, RGBA). With `band`, only a
+    band that wide inside the margin is filled and the centre is clear too.
+    """
+    clear = b"\x00\x00\x00\x00"
+    fill = bytes(rgba)
+    inner = width - 2 * margin
+    edge_row = b"\x00" + clear * width
+    body_row = b"\x00" + clear * margin + fill * inner + clear * margin
+    if band:
+        hole = inner - 2 * band
+        ring_row = (
+            b"\x00" + clear * margin + fill * band + clear * hole + fill * band + clear * margin
+        )
+        body = body_row * band + ring_row * (height - 2 * margin - 2 * band) + body_row * band
+    else:
+        body = body_row * (height - 2 * margin)
+    raw = edge_row * margin + body + edge_row * margin
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + _png_chunk(b"IDAT", zlib.compress(raw, 1))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+class MockAPIError(Exception):
+    """Shaped like openai.APIStatusError: status_code plus response.headers."""
+
+    def __init__(self, status_code, message, headers=None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class _MockImages:
+    def __init__(self, options):
+        self.options = options
+        self._rng = random.Random(options["seed"])
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _roll(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self._rng.random(), self._rng.random()
+
+    def _respond(self, prompt, size, background, extra=b""):
+        jitter, fate, defect = self._roll()
+        time.sleep(self.options["latency"] * (0.5 + jitter))
+        if fate < self.options["rate_limit"]:
+            raise MockAPIError(
+                429, "Rate limit reached", {"retry-after": str(self.options["retry_after"])}
+            )
+        if fate < self.options["rate_limit"] + self.options["error_rate"]:
+            raise MockAPIError(500, "The server had an error")
+        width, height = (int(v) for v in size.split("x"))
+        digest = hashlib.sha256(prompt.encode() + extra).digest()
+        transparent = background == "transparent" and defect >= self.options["defect_rate"]
+        margin = min(width, height) // 8 if transparent else 0
+        band = min(width, height) // 16 if transparent else 0
+        png = solid_png(width, height, (digest[0], digest[1], digest[2], 255), margin, band)
+        return SimpleNamespace(data=[SimpleNamespace(b64_json=base64.b64encode(png).decode(), url=None)])
+
+    def generate(self, prompt, size="1024x1024", background="auto", **_):
+        return self._respond(prompt, size, background)
+
+    def edit(self, image, prompt, size="1024x1024", background="auto", **_):
+        return self._respond(prompt, size, background, extra=image.read())
+
+
+class MockImageClient:
+    def __init__(self, **options):
+        unknown = set(options) - set(MOCK_DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown mock backend option(s): {', '.join(sorted(unknown))}")
+        self.options = {**MOCK_DEFAULTS, **options}
+        self.images = _MockImages(self.options)
+
+
+def parse_backend_spec(spec):
+    """'mock:latency=0.2,seed=3' -> ('mock', {'latency': 0.2, 'seed': 3})."""
+    name, _, params = spec.partition(":")
+    options = {}
+    for pair in filter(None, params.split(",")):
+        key, _, value = pair.partition("=")
+        options[key.strip()] = int(value) if key.strip() == "seed" else float(value)
+    return name, options
+
+
+def make_client(spec, api_key=None):
+    """Build the image client a backend spec names."""
+    name, options = parse_backend_spec(spec)
+    if name == "mock":
+        return MockImageClient(**options)
+    if name == "openai":
+        if not api_key:
+            raise SystemExit("ERROR: Set OPENAI_API_KEY environment variable")
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise SystemExit("ERROR: pip install openai")
+        return OpenAI(api_key=api_key)
+    raise SystemExit(f"ERROR: unknown image backend {name!r} (expected openai or mock)")
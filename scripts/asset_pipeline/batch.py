@@ -0,0 +1,329 @@
+"""
+Batch submission of image requests.
+
+Every request the cache can't satisfy becomes one line of a JSONL batch
+(custom_id = its cache key), submitted once and polled until it finishes.
+The Runner then renders the requests with BatchSubmission.renderer(), which
+writes each output from the downloaded results, so the cache, journal and
+quality gate work as after live calls; a reject or a missing result falls
+back to a live call. The submitted batch is kept in pending.json until its
+results are fanned out, so an interrupted run resumes polling it, provided
+it asks for the same images (see BatchSubmission.check_selection()).
+
+A batch backend has submit(input_path) -> id, poll(id) -> (status, counts)
+and download(id, dest_dir) -> [result paths], with OpenAI Batch API
+statuses and result lines. LocalBatchBackend answers from a mock image
+client so the flow runs offline.
+"""
+
+import json
+import shutil
+import time
+import uuid
+from contextlib import nullcontext
+
+from .backends import MockImageClient, parse_backend_spec
+from .cache import plan
+from .fsutil import atomic_write_text
+from .log import log
+from .metrics import count, phase
+from .payloads import estimate_payload_bytes, write_b64
+
+IMAGES_ENDPOINT = "/v1/images/generations"
+COMPLETION_WINDOW = "24h"
+TERMINAL = ("completed", "failed", "expired", "cancelled")
+DEFAULT_POLL_SECONDS = 30.0
+
+
+def batch_line(req):
+    """One batch input line for `req`, keyed by its cache key."""
+    return {
+        "custom_id": req.cache_key(),
+        "method": "POST",
+        "url": IMAGES_ENDPOINT,
+        "body": {
+            "model": req.model,
+            "prompt": req.prompt,
+            "n": 1,
+            "size": req.size,
+            "quality": req.quality,
+            "background": req.background,
+        },
+    }
+
+
+class OpenAIBatchBackend:
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, input_path):
+        with open(input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id, endpoint=IMAGES_ENDPOINT, completion_window=COMPLETION_WINDOW
+        )
+        return batch.id
+
+    def poll(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return batch.status, {
+            "completed": counts.completed if counts else 0,
+            "failed": counts.failed if counts else 0,
+            "total": counts.total if counts else 0,
+        }
+
+    def download(self, batch_id, dest_dir):
+        batch = self.client.batches.retrieve(batch_id)
+        paths = []
+        for name, file_id in (("output.jsonl", batch.output_file_id), ("errors.jsonl", batch.error_file_id)):
+            if file_id:
+                path = dest_dir / name
+                with self.client.files.with_streaming_response.content(file_id) as response:
+                    response.stream_to_file(path)
+                paths.append(path)
+        return paths
+
+
+class LocalBatchBackend:
+    """
+    Batches as directories under `root`: the submitted input, a status file,
+    and once `delay` seconds have passed since submission, output and error
+    files answered line by line by `images` (a MockImageClient). An API
+    error from `images` becomes an error line, as a failed request would in
+    a real batch.
+    """
+
+    def __init__(self, root, images, delay=0.0):
+        self.root = root
+        self.images = images
+        self.delay = delay
+
+    def _status_path(self, batch_id):
+        return self.root / batch_id / "batch.json"
+
+    def submit(self, input_path):
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        (self.root / batch_id).mkdir(parents=True)
+        shutil.copy(input_path, self.root / batch_id / "input.jsonl")
+        with open(input_path, encoding="utf-8") as f:
+            total = sum(1 for _ in f)
+        status = {"status": "in_progress", "submitted": time.time(), "total": total, "failed": 0}
+        atomic_write_text(self._status_path(batch_id), json.dumps(status))
+        return batch_id
+
+    def _process(self, batch_id):
+        folder = self.root / batch_id
+        failed = 0
+        with open(folder / "input.jsonl", encoding="utf-8") as lines, \
+                open(folder / "output.jsonl", "w", encoding="utf-8") as out, \
+                open(folder / "errors.jsonl", "w", encoding="utf-8") as errors:
+            for line in lines:
+                request = json.loads(line)
+                try:
+                    result = self.images.generate(**request["body"])
+                except Exception as e:
+                    failed += 1
+                    status_code = getattr(e, "status_code", 500)
+                    record = {"status_code": status_code, "body": {"error": {"message": str(e)}}}
+                    target = errors
+                else:
+                    record = {"status_code": 200, "body": {"data": [{"b64_json": result.data[0].b64_json}]}}
+                    target = out
+                target.write(json.dumps({"custom_id": request["custom_id"], "response": record, "error": None}) + "\n")
+        return failed
+
+    def poll(self, batch_id):
+        status = json.loads(self._status_path(batch_id).read_text())
+        if status["status"] == "in_progress" and time.time() - status["submitted"] >= self.delay:
+            status.update(status="completed", failed=self._process(batch_id))
+            atomic_write_text(self._status_path(batch_id), json.dumps(status))
+        done = status["status"] == "completed"
+        return status["status"], {
+            "completed": status["total"] - status["failed"] if done else 0,
+            "failed": status["failed"],
+            "total": status["total"],
+        }
+
+    def download(self, batch_id, dest_dir):
+        paths = []
+        for name in ("output.jsonl", "errors.jsonl"):
+            source = self.root / batch_id / name
+            if source.exists():
+                shutil.copy(source, dest_dir / name)
+                paths.append(dest_dir / name)
+        return paths
+
+
+def batch_requests(requests, cache):
+    """The requests a batch would hold: one per uncached key, edits stay live."""
+    return [req for req, status in plan(cache, requests) if status == "generate" and not req.reference]
+
+
+def make_batch_backend(spec, client, root):
+    """
+    The batch backend matching an image backend spec: the Batch API for
+    "openai", a LocalBatchBackend under `root` for "mock" (its options apply
+    per line, except that latency is the whole batch's turnaround and there
+    is no rate limiting).
+    """
+    name, options = parse_backend_spec(spec)
+    if name == "mock":
+        delay = options.pop("latency", 0.0)
+        options.pop("rate_limit", None)
+        images = MockImageClient(latency=0.0, **options).images
+        return LocalBatchBackend(root, images, delay=delay)
+    return OpenAIBatchBackend(client)
+
+
+class BatchSubmission:
+    """One batch at a time under `batch_dir`, from submission to fan-out."""
+
+    def __init__(self, backend, batch_dir, journal=None):
+        self.backend = backend
+        self.batch_dir = batch_dir
+        self.journal = journal
+        self.state_path = batch_dir / "pending.json"
+        self._results = {}
+        self._errors = {}
+
+    def _load_state(self):
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text())
+        return None
+
+    def submit(self, requests, cache):
+        """
+        Serialize the requests the cache can't satisfy (one line per distinct
+        cache key; edits with a reference image stay live) and submit them.
+        Returns the state saved for the batch, or None if nothing needs it.
+        """
+        todo = batch_requests(requests, cache)
+        if not todo:
+            return None
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        input_path = self.batch_dir / "input.jsonl"
+        with open(input_path, "w", encoding="utf-8") as f:
+            for req in todo:
+                f.write(json.dumps(batch_line(req)) + "\n")
+        batch_id = self.backend.submit(input_path)
+        if self.journal is not None:
+            self.journal.queue(todo)
+        state = {
+            "id": batch_id,
+            "submitted": time.time(),
+            "requests": len(todo),
+            "keys": sorted(req.cache_key() for req in todo),
+        }
+        atomic_write_text(self.state_path, json.dumps(state))
+        input_path.unlink()
+        log(f"  Submitted batch {batch_id} ({len(todo)} requests)")
+        return state
+
+    def check_selection(self, state, requests, cache):
+        """
+        Refuse to resume a batch holding images `requests` doesn't ask for
+        (fanning it out would throw them away); warn about requests that
+        aren't in it, which render live.
+        """
+        batch_keys = set(state["keys"])
+        dropped = batch_keys - {req.cache_key() for req in requests}
+        if dropped:
+            raise SystemExit(
+                f"ERROR: pending batch {state['id']} holds {len(dropped)} images this run doesn't "
+                f"ask for; rerun with the selection it was submitted for, or delete "
+                f"{self.state_path} to abandon it"
+            )
+        extra = [req for req in batch_requests(requests, cache) if req.cache_key() not in batch_keys]
+        if extra:
+            log(f"  WARNING: {len(extra)} requests are not in batch {state['id']} and will render live")
+
+    def wait(self, batch_id, poll_seconds=DEFAULT_POLL_SECONDS):
+        """Poll until the batch reaches a terminal status; returns it."""
+        last = None
+        while True:
+            status, counts = self.backend.poll(batch_id)
+            progress = f"{status}: {counts['completed']}/{counts['total']} done, {counts['failed']} failed"
+            if progress != last:
+                log(f"  Batch {batch_id} {progress}")
+                last = progress
+            if status in TERMINAL:
+                return status
+            time.sleep(poll_seconds)
+
+    def collect(self, batch_id):
+        """Download the results and index them by custom_id (file offset, not payload)."""
+        dest = self.batch_dir / batch_id
+        dest.mkdir(parents=True, exist_ok=True)
+        for path in self.backend.download(batch_id, dest):
+            with open(path, "rb") as f:
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    record = json.loads(line)
+                    response = record.get("response") or {}
+                    if response.get("status_code") == 200:
+                        self._results[record["custom_id"]] = (path, offset)
+                    else:
+                        error = record.get("error") or (response.get("body") or {}).get("error") or {}
+                        self._errors[record["custom_id"]] = error.get("message", "no result")
+                    del record, line
+        log(f"  Batch results: {len(self._results)} images, {len(self._errors)} errors")
+
+    def run(self, runner, requests, poll_seconds=DEFAULT_POLL_SECONDS):
+        """
+        Submit (or resume) the batch for `requests`, wait for it, then render
+        every request through `runner`. Returns runner.run()'s result.
+        """
+        state = self._load_state()
+        if state is not None:
+            log(f"  Resuming batch {state['id']} submitted {time.ctime(state['submitted'])}")
+            self.check_selection(state, requests, runner.cache)
+        else:
+            state = self.submit(requests, runner.cache)
+        if state is not None:
+            try:
+                status = self.wait(state["id"], poll_seconds)
+            except KeyboardInterrupt:
+                log(f"\n  Batch {state['id']} is still pending; run again with --batch to resume it")
+                raise
+            if status != "completed":
+                log(f"  WARNING: batch {state['id']} ended {status}; missing results render live")
+            self.collect(state["id"])
+        result = runner.run(requests)
+        if state is not None:
+            shutil.rmtree(self.batch_dir / state["id"], ignore_errors=True)
+            self.state_path.unlink(missing_ok=True)
+        return result
+
+    def _read(self, key):
+        path, offset = self._results.pop(key)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            record = json.loads(f.readline())
+        return record["response"]["body"]["data"][0]["b64_json"]
+
+    def renderer(self, fallback, budget=None):
+        """
+        Render function writing a request's batch result, once; quality
+        retries and requests without a result go through `fallback`.
+        """
+        def render(req):
+            key = req.cache_key()
+            if key not in self._results:
+                if key in self._errors:
+                    log(f"  Batch failed for {req.label} ({self._errors.pop(key)}); rendering live")
+                return fallback(req)
+            with budget.reserve(estimate_payload_bytes(req.size)) if budget else nullcontext():
+                b64 = self._read(key)
+                count("renders")
+                with phase("write"):
+                    nbytes = write_b64(b64, req.path)
+                count("response_bytes", nbytes)
+                del b64
+            log(f"  Saved from batch: {req.path} ({nbytes // 1024}KB)")
+            return True
+
+        return render
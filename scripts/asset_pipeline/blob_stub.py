@@ -0,0 +1,131 @@
+"""
+A local stand-in for the Vercel Blob REST API: serves the calls BlobClient
+makes over keep-alive HTTP/1.1 and stores blobs as files under `root`.
+`fail_rate` answers that fraction of requests with 503 (Retry-After: 0).
+"""
+
+import hashlib
+import json
+import random
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class BlobStub:
+    def __init__(self, root, fail_rate=0.0, seed=0):
+        self.root = root
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self.connections = 0
+        self.failures = 0
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self._random.random() < self.fail_rate:
+                self.failures += 1
+                return True
+            return False
+
+    def _store(self, pathname, data):
+        path = self.root / pathname
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return {"url": f"{self.url}/{pathname}", "pathname": pathname, "size": len(data)}
+
+    def _multipart(self, action, pathname, headers, body):
+        if action == "create":
+            upload_id = uuid.uuid4().hex
+            with self._lock:
+                self._uploads[upload_id] = {}
+            return {"key": pathname, "uploadId": upload_id}
+        upload_id = headers.get("x-mpu-upload-id")
+        with self._lock:
+            parts = self._uploads.get(upload_id)
+        if parts is None or unquote(headers.get("x-mpu-key", "")) != pathname:
+            raise KeyError(f"unknown upload {upload_id}")
+        if action == "upload":
+            etag = hashlib.md5(body).hexdigest()
+            with self._lock:
+                parts[int(headers["x-mpu-part-number"])] = (etag, body)
+            return {"etag": etag}
+        if action == "complete":
+            listed = json.loads(body)
+            if [p["etag"] for p in listed] != [parts[p["partNumber"]][0] for p in listed]:
+                raise KeyError("part etags don't match")
+            with self._lock:
+                del self._uploads[upload_id]
+            return self._store(pathname, b"".join(parts[p["partNumber"]][1] for p in listed))
+        raise KeyError(f"unknown x-mpu-action {action!r}")
+
+    def _delete(self, urls):
+        for url in urls:
+            path = self.root / urlsplit(url).path.lstrip("/")
+            if path.is_file():
+                path.unlink()
+        return {}
+
+
+def _handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with stub._lock:
+                stub.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, payload, headers=None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self):
+            body = self.rfile.read(int(self.headers.get("content-length") or 0))
+            if not self.headers.get("authorization", "").startswith("Bearer "):
+                return self._reply(403, {"error": "missing token"})
+            if stub._should_fail():
+                return self._reply(503, {"error": "injected failure"}, {"retry-after": "0"})
+            url = urlsplit(self.path)
+            pathname = parse_qs(url.query).get("pathname", [None])[0]
+            try:
+                if self.command == "PUT" and url.path == "/" and pathname:
+                    return self._reply(200, stub._store(pathname, body))
+                if self.command == "POST" and url.path == "/mpu" and pathname:
+                    action = self.headers.get("x-mpu-action")
+                    return self._reply(200, stub._multipart(action, pathname, self.headers, body))
+                if self.command == "POST" and url.path == "/delete":
+                    return self._reply(200, stub._delete(json.loads(body)["urls"]))
+            except (KeyError, ValueError) as e:
+                return self._reply(400, {"error": str(e)})
+            self._reply(404, {"error": f"no route {self.command} {url.path}"})
+
+        do_PUT = _handle
+        do_POST = _handle
+
+    return Handler
@@ -0,0 +1,358 @@
+"""
+Incremental upload of assets to Vercel Blob.
+
+Local files are described by content hash (game-assets/ through its
+manifest, public/lunchtable/ through an mtime/size-keyed hash cache) and
+compared with a state file of what was last uploaded; only differences go
+up. Uploads are scheduler Jobs over keep-alive connections, files above
+MULTIPART_THRESHOLD as multipart uploads. Each job records its result in
+the state, so an interrupted sync resumes where it stopped, half-done
+multipart uploads included. blob_stub.py serves the same calls locally.
+"""
+
+import http.client
+import json
+import mimetypes
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from .fsutil import atomic_write_text, sha256_file
+from .log import log
+from .scheduler import Job, is_retryable
+
+DEFAULT_API_URL = "https://vercel.com/api/blob"
+API_VERSION = "11"
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+PART_SIZE = 8 * 1024 * 1024
+STATE_VERSION = 1
+SAVE_EVERY = 20
+CONTENT_TYPES = {".webp": "image/webp", ".avif": "image/avif", ".json": "application/json"}
+
+
+class BlobHTTPError(Exception):
+    """Shaped like openai.APIStatusError so scheduler.is_retryable() understands it."""
+
+    def __init__(self, status_code, message, headers=None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+def content_type(path):
+    return CONTENT_TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0] or (
+        "application/octet-stream"
+    )
+
+
+class BlobClient:
+    """Vercel Blob REST client over keep-alive connections, one per calling thread."""
+
+    def __init__(self, api_url, token, timeout=120):
+        parts = urlsplit(api_url)
+        self._https = parts.scheme == "https"
+        self._host = parts.netloc
+        self._base = parts.path.rstrip("/")
+        self._token = token
+        self._timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = []
+        self.connections_opened = 0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self._host, timeout=self._timeout)
+            with self._lock:
+                self._opened.append(conn)
+                self.connections_opened += 1
+        return conn
+
+    def close(self):
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened = []
+
+    def _request(self, method, route, pathname=None, body=None, headers=None):
+        url = f"{self._base}{route}"
+        if pathname is not None:
+            url += f"?pathname={quote(pathname, safe='')}"
+        headers = {
+            "authorization": f"Bearer {self._token}",
+            "x-api-version": API_VERSION,
+            **(headers or {}),
+        }
+        conn = self._connection()
+        try:
+            conn.request(method, url, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            self._local.conn = None
+            raise ConnectionError(f"{method} {route}: {e}") from e
+        if resp.will_close:
+            conn.close()
+            self._local.conn = None
+        if resp.status >= 400:
+            raise BlobHTTPError(resp.status, data[:200].decode("utf-8", "replace"), resp.headers)
+        return json.loads(data) if data else {}
+
+    def _put_headers(self, content_type):
+        return {
+            "x-content-type": content_type,
+            "x-vercel-blob-access": "public",
+            "x-add-random-suffix": "0",
+            "x-allow-overwrite": "1",
+        }
+
+    def put(self, pathname, data, content_type):
+        return self._request("PUT", "/", pathname, data, self._put_headers(content_type))
+
+    def create_multipart(self, pathname, content_type):
+        headers = {**self._put_headers(content_type), "x-mpu-action": "create"}
+        result = self._request("POST", "/mpu", pathname, b"", headers)
+        return result["key"], result["uploadId"]
+
+    def upload_part(self, pathname, key, upload_id, number, data):
+        headers = {
+            "x-mpu-action": "upload",
+            "x-mpu-key": quote(key, safe=""),
+            "x-mpu-upload-id": upload_id,
+            "x-mpu-part-number": str(number),
+        }
+        return self._request("POST", "/mpu", pathname, data, headers)["etag"]
+
+    def complete_multipart(self, pathname, key, upload_id, parts, content_type):
+        headers = {
+            **self._put_headers(content_type),
+            "x-mpu-action": "complete",
+            "x-mpu-key": quote(key, safe=""),
+            "x-mpu-upload-id": upload_id,
+            "content-type": "application/json",
+        }
+        body = json.dumps([{"partNumber": n, "etag": etag} for n, etag in parts]).encode()
+        return self._request("POST", "/mpu", pathname, body, headers)
+
+    def delete(self, urls):
+        body = json.dumps({"urls": urls}).encode()
+        return self._request("POST", "/delete", body=body, headers={"content-type": "application/json"})
+
+
+def hash_tree(root, cache):
+    """
+    {rel path: (path, sha256, bytes)} for every non-hidden file under root.
+    `cache` ({rel: {mtime_ns, size, sha256}}) is consulted and updated in place.
+    """
+    files = {}
+    for path in sorted(root.rglob("*")):
+        rel = path.relative_to(root)
+        if not path.is_file() or any(part.startswith(".") for part in rel.parts):
+            continue
+        key = str(rel)
+        stat = path.stat()
+        entry = cache.get(key)
+        if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = cache[key] = {
+                "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256_file(path),
+            }
+        files[key] = (path, entry["sha256"], stat.st_size)
+    for key in set(cache) - set(files):
+        del cache[key]
+    return files
+
+
+def manifest_objects(manifest):
+    """{rel path: (path, sha256, bytes)} for everything game-assets/manifest.json lists."""
+    assets_dir = manifest.assets_dir
+    files = {}
+
+    def add(rel, sha):
+        path = assets_dir / rel
+        if sha and path.exists():
+            files[rel] = (path, sha, path.stat().st_size)
+
+    for entries in (manifest.assets, manifest.atlases):
+        for rel, entry in entries.items():
+            add(entry.get("path", rel), entry.get("sha256"))
+            for variant in entry.get("variants", []):
+                add(variant["path"], variant.get("sha256"))
+    if manifest.path.exists():
+        add(str(manifest.path.relative_to(assets_dir)), sha256_file(manifest.path))
+    return files
+
+
+class SyncState:
+    """
+    What has been uploaded: {"objects": {pathname: {sha256, bytes, url,
+    uploaded}}}, multipart uploads in progress ({"multipart": {pathname:
+    {sha256, key, upload_id, parts}}}), and the local hash cache used by
+    hash_tree(). The record methods are safe to call from worker threads.
+    """
+
+    def __init__(self, path, save_every=SAVE_EVERY):
+        self.path = path
+        self.save_every = save_every
+        self.objects = {}
+        self.multipart = {}
+        self.local_hashes = {}
+        self._lock = threading.RLock()
+        self._unsaved = 0
+        if path.exists():
+            data = json.loads(path.read_text())
+            if data.get("version") == STATE_VERSION:
+                self.objects = data.get("objects", {})
+                self.multipart = data.get("multipart", {})
+                self.local_hashes = data.get("local_hashes", {})
+
+    def _changed(self):
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def record(self, pathname, sha, size, url):
+        with self._lock:
+            self.objects[pathname] = {"sha256": sha, "bytes": size, "url": url, "uploaded": time.time()}
+            self.multipart.pop(pathname, None)
+            self._changed()
+
+    def start_multipart(self, pathname, sha, key, upload_id):
+        with self._lock:
+            self.multipart[pathname] = {"sha256": sha, "key": key, "upload_id": upload_id, "parts": {}}
+            self._changed()
+
+    def record_part(self, pathname, number, etag):
+        with self._lock:
+            self.multipart[pathname]["parts"][str(number)] = etag
+            self._changed()
+
+    def forget_multipart(self, pathname):
+        with self._lock:
+            if self.multipart.pop(pathname, None) is not None:
+                self._changed()
+
+    def save(self):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "version": STATE_VERSION,
+                "objects": dict(sorted(self.objects.items())),
+                "multipart": self.multipart,
+                "local_hashes": self.local_hashes,
+            }
+            atomic_write_text(self.path, json.dumps(data, indent=1) + "\n")
+            self._unsaved = 0
+
+
+def diff(local, state):
+    """(changed {pathname: (path, sha, bytes)}, stale [pathname]) against the state."""
+    changed = {
+        pathname: obj for pathname, obj in local.items()
+        if state.objects.get(pathname, {}).get("sha256") != obj[1]
+    }
+    stale = sorted(set(state.objects) - set(local))
+    return changed, stale
+
+
+def _read_range(path, offset, size):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def upload(client, scheduler, changed, state, part_size=PART_SIZE, threshold=MULTIPART_THRESHOLD):
+    """
+    Upload `changed` ({pathname: (path, sha, bytes)}), recording each
+    success in `state` from the job that finished it. A multipart upload
+    saved in `state` for the same content is continued from its missing
+    parts; one the server rejects is forgotten so the next run starts over.
+    Returns (uploaded pathnames, failed pathnames).
+    """
+    failed = set()
+    # Multipart uploads of content that has since changed can't be continued.
+    for pathname in list(state.multipart):
+        if state.multipart[pathname]["sha256"] != changed.get(pathname, (None, None))[1]:
+            state.forget_multipart(pathname)
+
+    def put(pathname):
+        path, sha, size = changed[pathname]
+        result = client.put(pathname, path.read_bytes(), content_type(path))
+        state.record(pathname, sha, size, result.get("url"))
+
+    def create(pathname):
+        path, sha, _ = changed[pathname]
+        key, upload_id = client.create_multipart(pathname, content_type(path))
+        state.start_multipart(pathname, sha, key, upload_id)
+
+    def send_part(pathname, number, offset):
+        entry = state.multipart.get(pathname)
+        if entry is None:
+            raise RuntimeError("multipart upload abandoned after another part was rejected")
+        data = _read_range(changed[pathname][0], offset, part_size)
+        etag = client.upload_part(pathname, entry["key"], entry["upload_id"], number, data)
+        state.record_part(pathname, number, etag)
+
+    def complete(pathname):
+        path, sha, size = changed[pathname]
+        entry = state.multipart[pathname]
+        parts = sorted((int(n), etag) for n, etag in entry["parts"].items())
+        result = client.complete_multipart(
+            pathname, entry["key"], entry["upload_id"], parts, content_type(path)
+        )
+        state.record(pathname, sha, size, result.get("url"))
+
+    def run(jobs):
+        for result in scheduler.run(jobs):
+            if not result.ok:
+                failed.add(result.job.key)
+                if not is_retryable(result.error):
+                    state.forget_multipart(result.job.key)
+
+    small = [p for p, (_, _, size) in changed.items() if size <= threshold]
+    large = sorted(p for p, (_, _, size) in changed.items() if size > threshold)
+
+    # Pass 1: single-request uploads and multipart creates, all in parallel.
+    run([Job(p, p, lambda p=p: put(p)) for p in small] + [
+        Job(p, f"{p} (create)", lambda p=p: create(p)) for p in large if p not in state.multipart
+    ])
+
+    # Pass 2: every part not uploaded yet, of every multipart upload.
+    part_jobs = []
+    for pathname in large:
+        if pathname in failed:
+            continue
+        done = state.multipart[pathname]["parts"]
+        for number, offset in enumerate(range(0, changed[pathname][2], part_size), 1):
+            if str(number) not in done:
+                part_jobs.append(Job(
+                    pathname, f"{pathname} (part {number})",
+                    lambda p=pathname, n=number, o=offset: send_part(p, n, o),
+                ))
+    run(part_jobs)
+
+    # Pass 3: complete the uploads whose parts all landed.
+    run([
+        Job(p, f"{p} (complete)", lambda p=p: complete(p)) for p in large if p not in failed
+    ])
+
+    for pathname in sorted(failed):
+        log(f"  FAILED: {pathname}")
+    uploaded = [p for p in changed if p not in failed]
+    return uploaded, sorted(failed)
+
+
+def prune(client, state, stale):
+    """Delete blobs that no longer exist locally and forget them."""
+    urls = [state.objects[p]["url"] for p in stale if state.objects[p].get("url")]
+    if urls:
+        client.delete(urls)
+    for pathname in stale:
+        del state.objects[pathname]
+
+
+def pathname_for(prefix, rel):
+    return f"{prefix}/{rel}" if prefix else rel
+
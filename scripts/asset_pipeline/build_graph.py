@@ -0,0 +1,115 @@
+"""
+Make-style build order for asset spec targets.
+
+A request depends on another when its reference image is the other's
+output. build_layers() sorts requests into layers that depend only on
+earlier layers, and each layer runs through the scheduler as one batch. A
+target is out of date exactly when the cache can't satisfy its key.
+"""
+
+from fnmatch import fnmatch
+
+from .cache import plan
+
+# Plan status for a request whose reference will be rebuilt first.
+AFTER_DEPENDENCY = "after-dep"
+
+
+def dependencies(requests):
+    """{request name: [names of the requests whose output it references]}."""
+    by_output = {req.path: req.name for req in requests}
+    return {
+        req.name: [by_output[req.reference]] if req.reference in by_output else []
+        for req in requests
+    }
+
+
+def build_layers(requests):
+    """Requests in dependency layers, spec order within a layer. Exits on a cycle."""
+    deps = dependencies(requests)
+    done = set()
+    remaining = list(requests)
+    layers = []
+    while remaining:
+        layer = [req for req in remaining if all(d in done for d in deps[req.name])]
+        if not layer:
+            cycle = ", ".join(f"{req.name} -> {deps[req.name][0]}" for req in remaining)
+            raise SystemExit(f"ERROR: dependency cycle between assets: {cycle}")
+        layers.append(layer)
+        done.update(req.name for req in layer)
+        remaining = [req for req in remaining if req.name not in done]
+    return layers
+
+
+def select(requests, patterns, base_dir):
+    """
+    Requests whose name or output path (relative to `base_dir`) matches one
+    of the glob `patterns`, plus everything they depend on, in their
+    original order.
+    """
+    deps = dependencies(requests)
+    by_name = {req.name: req for req in requests}
+    wanted = set()
+    todo = [
+        req.name for req in requests
+        if any(
+            fnmatch(req.name, p) or fnmatch(req.path.relative_to(base_dir).as_posix(), p)
+            for p in patterns
+        )
+    ]
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [by_name[name] for name in by_name if name in wanted]
+
+
+def plan_layers(cache, layers):
+    """
+    [(layer number, request, status)] with cache.plan() statuses, or
+    AFTER_DEPENDENCY when a dependency will be rebuilt first (its dependents'
+    keys can't be known until then).
+    """
+    statuses = []
+    rebuilt = set()
+    for number, layer in enumerate(layers, 1):
+        deps = dependencies([req for previous in layers[:number] for req in previous])
+        waiting = [req for req in layer if any(d in rebuilt for d in deps[req.name])]
+        ready = [req for req in layer if req not in waiting]
+        for req, status in plan(cache, ready):
+            statuses.append((number, req, status))
+            if status != "unchanged":
+                rebuilt.add(req.name)
+        for req in waiting:
+            statuses.append((number, req, AFTER_DEPENDENCY))
+            rebuilt.add(req.name)
+    return statuses
+
+
+def build(runner, layers, log=print):
+    """
+    Run the layers in order through `runner`. A request whose dependency
+    failed is not attempted. Returns (ok_count, failed_labels,
+    blocked_labels).
+    """
+    deps = dependencies([req for layer in layers for req in layer])
+    failed_names = set()
+    ok, failed, blocked = 0, [], []
+    for number, layer in enumerate(layers, 1):
+        runnable = []
+        for req in layer:
+            if any(d in failed_names for d in deps[req.name]):
+                blocked.append(req.label)
+                failed_names.add(req.name)
+            else:
+                runnable.append(req)
+        if len(layers) > 1:
+            log(f"\n--- Layer {number}/{len(layers)}: {len(runnable)} targets ---\n")
+        layer_ok, layer_failed = runner.run(runnable)
+        ok += layer_ok
+        failed.extend(layer_failed)
+        for req in runnable:
+            if not req.path.exists() or not runner.cache.is_current(req.path, req.cache_key()):
+                failed_names.add(req.name)
+    return ok, failed, blocked
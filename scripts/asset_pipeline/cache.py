@@ -0,0 +1,186 @@
+"""
+Content-addressed cache of generated images.
+
+Each render is stored under its ImageRequest.cache_key() in an object store
+next to a JSON index. The index also remembers which key every output file
+was produced from, so an unchanged request is a single dict lookup and an
+edited prompt (or reference image) shows up as a key mismatch. Objects are
+evicted least-recently-used once the store exceeds `max_bytes`.
+"""
+
+import json
+import threading
+import time
+
+from .fsutil import atomic_copy, atomic_write_text
+from .log import log
+from .scheduler import Job
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class GenerationCache:
+    def __init__(self, root, base_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.index_path = root / "generation-index.json"
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._outputs = {}
+        if self.index_path.exists():
+            data = json.loads(self.index_path.read_text())
+            self._entries = data.get("entries", {})
+            self._outputs = data.get("outputs", {})
+
+    def _object_path(self, key):
+        return self.root / "objects" / key[:2] / f"{key}.png"
+
+    def _rel(self, path):
+        try:
+            return str(path.relative_to(self.base_dir))
+        except ValueError:
+            return str(path)
+
+    def _touch(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry["last_used"] = time.time()
+
+    def is_current(self, path, key):
+        """True if `path` exists and was produced from exactly this key."""
+        with self._lock:
+            if self._outputs.get(self._rel(path)) != key or not path.exists():
+                return False
+            self._touch(key)
+            return True
+
+    def is_tracked(self, path):
+        with self._lock:
+            return self._rel(path) in self._outputs
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries and self._object_path(key).exists()
+
+    def store(self, key, path):
+        """Record `path` as the render for `key` and keep a copy in the object store."""
+        obj = self._object_path(key)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        atomic_copy(path, obj)
+        with self._lock:
+            self._entries[key] = {"bytes": obj.stat().st_size, "last_used": time.time()}
+            self._outputs[self._rel(path)] = key
+            self._evict()
+            self._save()
+
+    def materialize(self, key, path):
+        """Copy a cached render to `path` without calling the API."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_copy(self._object_path(key), path)
+        with self._lock:
+            self._touch(key)
+            self._outputs[self._rel(path)] = key
+            self._save()
+
+    def forget(self, path):
+        with self._lock:
+            if self._outputs.pop(self._rel(path), None) is not None:
+                self._save()
+
+    def _evict(self):
+        total = sum(e["bytes"] for e in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            self._object_path(key).unlink(missing_ok=True)
+            del self._entries[key]
+            total -= entry["bytes"]
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            self.index_path, json.dumps({"entries": self._entries, "outputs": self._outputs})
+        )
+
+
+def cached_jobs(cache, requests, make_job):
+    """
+    Turn ImageRequests into scheduler Jobs, skipping everything the cache
+    already covers.
+
+    Outputs whose recorded key still matches are skipped. Outputs whose key
+    is in the object store are copied from it. Untracked files that already
+    exist (rendered before the cache existed) are adopted as-is. Requests that
+    share a key are folded into one Job that renders once and copies the
+    result to the others; its value is the number of outputs written.
+    Returns (jobs, skipped_requests, touched_requests), where touched is the
+    subset of skipped outputs that were copied in or adopted this time.
+    """
+    groups = {}
+    skipped = []
+    touched = []
+    for req in requests:
+        key = req.cache_key()
+        if cache.is_current(req.path, key):
+            log(f"  Skipping (unchanged): {req.path.name}")
+            skipped.append(req)
+        elif cache.contains(key):
+            cache.materialize(key, req.path)
+            log(f"  Reused from cache: {req.path.name}")
+            skipped.append(req)
+            touched.append(req)
+        elif req.path.exists() and not cache.is_tracked(req.path):
+            cache.store(key, req.path)
+            log(f"  Adopted (exists): {req.path.name}")
+            skipped.append(req)
+            touched.append(req)
+        else:
+            groups.setdefault(key, []).append(req)
+
+    jobs = []
+    for key, reqs in groups.items():
+        leader, followers = reqs[0], reqs[1:]
+        job = make_job(leader)
+        run = _fan_out(cache, key, job.run, leader, followers)
+        jobs.append(Job(job.key, job.label, run, requests=reqs))
+    return jobs, skipped, touched
+
+
+def _fan_out(cache, key, run, leader, followers):
+    def wrapped():
+        run()
+        cache.store(key, leader.path)
+        for req in followers:
+            cache.materialize(key, req.path)
+            log(f"  Shared render: {req.path.name} (same prompt as {leader.path.name})")
+        return 1 + len(followers)
+
+    return wrapped
+
+
+def plan(cache, requests):
+    """
+    What cached_jobs() would do with each request, without doing it.
+    Returns [(request, status)] with status one of "unchanged", "cached",
+    "adopt", "shared" or "generate".
+    """
+    seen = set()
+    statuses = []
+    for req in requests:
+        key = req.cache_key()
+        if cache.is_current(req.path, key):
+            status = "unchanged"
+        elif cache.contains(key):
+            status = "cached"
+        elif req.path.exists() and not cache.is_tracked(req.path):
+            status = "adopt"
+        elif key in seen:
+            status = "shared"
+        else:
+            status = "generate"
+            seen.add(key)
+        statuses.append((req, status))
+    return statuses
@@ -0,0 +1,94 @@
+"""
+Compiled card index: the master xlsx reduced to what generation needs.
+
+Parsing the workbook means importing pandas and running openpyxl, which
+dominates startup. The index is a JSON file keyed by card name (in sheet
+order) holding deck, type, the resolved art prompt and the output filename.
+It is rebuilt only when the xlsx content hash, the compiler version or the
+prompt settings from the asset spec ([cards] prompt_columns/prompt_suffix)
+change. The hash itself is only recomputed when the file's mtime or size
+moves.
+"""
+
+import hashlib
+import json
+
+from .fsutil import atomic_write_text, sha256_file
+
+INDEX_VERSION = 1
+SHEET_NAME = "Master Cards"
+
+
+def card_filename(name):
+    """Output filename for a card's art."""
+    return name.lower().replace(" ", "_").replace("'", "").replace("-", "_") + ".png"
+
+
+def _compiler_fingerprint(prompt_columns, prompt_suffix):
+    payload = json.dumps([INDEX_VERSION, SHEET_NAME, list(prompt_columns), prompt_suffix])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _present(value):
+    return isinstance(value, str) and value.strip() != ""
+
+
+def compile_cards(xlsx_path, prompt_columns, prompt_suffix):
+    """
+    Parse the workbook (slow: imports pandas) into {name: card record}. A
+    card's prompt is the first non-empty of `prompt_columns` plus
+    `prompt_suffix`.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise SystemExit("ERROR: pip install pandas openpyxl")
+
+    df = pd.read_excel(xlsx_path, sheet_name=SHEET_NAME)
+    cards = {}
+    for row in df.to_dict("records"):
+        name = row["Card_Name"]
+        if not _present(name):
+            continue
+        prompt = next((row.get(c) for c in prompt_columns if _present(row.get(c))), None)
+        cards[name] = {
+            "deck": row.get("Deck") if _present(row.get("Deck")) else None,
+            "type": row.get("Card_Type") if _present(row.get("Card_Type")) else None,
+            "prompt": prompt + prompt_suffix if prompt else None,
+            "filename": card_filename(name),
+        }
+    return cards
+
+
+def load_card_index(xlsx_path, index_path, prompt_columns, prompt_suffix, log=print):
+    """Return {name: card record}, recompiling the index only if its inputs changed."""
+    fingerprint = _compiler_fingerprint(prompt_columns, prompt_suffix)
+    stat = xlsx_path.stat()
+    index = None
+    if index_path.exists():
+        try:
+            index = json.loads(index_path.read_text())
+        except json.JSONDecodeError:
+            index = None
+    if index and index.get("compiler") == fingerprint:
+        source = index["source"]
+        if source["mtime_ns"] == stat.st_mtime_ns and source["size"] == stat.st_size:
+            return index["cards"]
+        digest = sha256_file(xlsx_path)
+        if source["sha256"] == digest:
+            source.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            atomic_write_text(index_path, json.dumps(index))
+            return index["cards"]
+    else:
+        digest = sha256_file(xlsx_path)
+
+    log(f"Compiling card index from {xlsx_path.name}...")
+    cards = compile_cards(xlsx_path, prompt_columns, prompt_suffix)
+    index = {
+        "compiler": fingerprint,
+        "source": {"sha256": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size},
+        "cards": cards,
+    }
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(index_path, json.dumps(index))
+    return cards
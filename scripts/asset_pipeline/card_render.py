@@ -0,0 +1,182 @@
+"""
+Pre-composited card renders.
+
+For every card with generated art, the art is cover-fitted into the top
+ART_WINDOW of its type's frame (frames/frame-*.png from
+generate-card-frame.py) over a deck-coloured backdrop, and the deck-tinted
+frame is laid over it. This mirrors the layered composite BoardSlot.tsx does
+in the browser, so low-end clients can show game-assets/renders/<card>.png
+instead. Blending is whole-array NumPy "over" on float32, one card per
+process-pool task. A render is redone only when its inputs (art and frame
+hashes, deck colour, render settings) change.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from .deps import load_numpy, load_pillow
+from .fsutil import atomic_writer, sha256_file
+from .log import log
+
+RENDERS_DIR_NAME = "renders"
+RENDER_VERSION = 1
+
+# Archetype color map for card frame tinting
+DECK_COLORS = {
+    "Dropouts": "#ef4444",    # red
+    "Preps": "#3b82f6",       # blue
+    "Geeks": "#eab308",       # yellow
+    "Freaks": "#a855f7",      # purple
+    "Nerds": "#22c55e",       # green
+    "Goodies": "#9ca3af",     # gray
+}
+FRAME_BY_TYPE = {
+    "Stereotype": "frame-monster.png",
+    "Spell": "frame-spell.png",
+    "Trap": "frame-trap.png",
+    "Environment": "frame-environment.png",
+}
+DEFAULT_FRAME = "frame-monster.png"
+# The frame prompts leave the top 60% as a transparent art window.
+ART_WINDOW = 0.6
+# Card body colour behind art and frame (BoardSlot.tsx).
+BASE_COLOR = "#0d0c0a"
+# How far frame pixels are pulled toward the deck colour (multiply blend).
+TINT_STRENGTH = 0.35
+# Deck-colour wash at the top of the art window, fading out toward its bottom.
+BACKDROP_STRENGTH = 0.3
+
+
+def hex_rgb(value):
+    """'#ef4444' -> float32 array [r, g, b] in 0..1."""
+    np = load_numpy()
+    value = value.lstrip("#")
+    return np.array([int(value[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.float32) / 255
+
+
+def _to_array(im):
+    np = load_numpy()
+    return np.asarray(im.convert("RGBA"), dtype=np.float32) / 255
+
+
+def cover_fit(im, width, height):
+    """Scale `im` to cover width x height and centre-crop (CSS object-fit: cover)."""
+    Image = load_pillow()
+    scale = max(width / im.width, height / im.height)
+    scaled = (max(width, round(im.width * scale)), max(height, round(im.height * scale)))
+    im = im.resize(scaled, Image.LANCZOS)
+    left = (scaled[0] - width) // 2
+    top = (scaled[1] - height) // 2
+    return im.crop((left, top, left + width, top + height))
+
+
+def blend_over(dst, src):
+    """Alpha-composite straight-alpha RGBA `src` onto opaque RGB `dst`, in place."""
+    alpha = src[..., 3:4]
+    dst *= 1 - alpha
+    dst += src[..., :3] * alpha
+    return dst
+
+
+@lru_cache(maxsize=8)
+def _frame_array(path, _mtime_ns):
+    Image = load_pillow()
+    with Image.open(path) as im:
+        return _to_array(im)
+
+
+def composite_card(art_path, frame_path, deck_color, out_path):
+    """Render one finished card to `out_path` (opaque RGB PNG at frame size)."""
+    np = load_numpy()
+    Image = load_pillow()
+    frame = _frame_array(frame_path, frame_path.stat().st_mtime_ns)
+    height, width = frame.shape[:2]
+    window = round(height * ART_WINDOW)
+    tint = hex_rgb(deck_color)
+
+    canvas = np.empty((height, width, 3), dtype=np.float32)
+    canvas[:] = hex_rgb(BASE_COLOR)
+    ramp = np.linspace(BACKDROP_STRENGTH, 0, window, dtype=np.float32)[:, None, None]
+    canvas[:window] *= 1 - ramp
+    canvas[:window] += tint * ramp
+
+    with Image.open(art_path) as art:
+        blend_over(canvas[:window], _to_array(cover_fit(art, width, window)))
+
+    tinted = frame.copy()
+    tinted[..., :3] *= (1 - TINT_STRENGTH) + TINT_STRENGTH * tint
+    blend_over(canvas, tinted)
+
+    pixels = (np.clip(canvas, 0, 1) * 255 + 0.5).astype(np.uint8)
+    with atomic_writer(out_path) as f:
+        Image.fromarray(pixels, "RGB").save(f, format="PNG", optimize=True)
+    return out_path
+
+
+def _asset_sha(manifest, path):
+    rel = str(path.relative_to(manifest.assets_dir))
+    return manifest.assets.get(rel, {}).get("sha256") or sha256_file(path)
+
+
+def _inputs_digest(art_sha, frame_sha, deck_color):
+    payload = [
+        RENDER_VERSION, ART_WINDOW, BASE_COLOR, TINT_STRENGTH, BACKDROP_STRENGTH,
+        art_sha, frame_sha, deck_color,
+    ]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def build_card_renders(cards, manifest, workers=None, force=False):
+    """
+    Composite every card in `cards` (compiled card index) whose art exists and
+    whose inputs changed, recording each render in the manifest with a
+    "card-render" source. Returns the paths written; failures are logged.
+    """
+    assets_dir = manifest.assets_dir
+    out_dir = assets_dir / RENDERS_DIR_NAME
+    jobs = []
+    missing_frames = set()
+    for name, card in cards.items():
+        art = assets_dir / "cards" / card["filename"]
+        if not art.exists():
+            continue
+        frame = assets_dir / "frames" / FRAME_BY_TYPE.get(card["type"], DEFAULT_FRAME)
+        if not frame.exists():
+            missing_frames.add(frame.name)
+            continue
+        color = DECK_COLORS.get(card["deck"], BASE_COLOR)
+        digest = _inputs_digest(_asset_sha(manifest, art), _asset_sha(manifest, frame), color)
+        out = out_dir / card["filename"]
+        recorded = manifest.assets.get(str(out.relative_to(assets_dir)), {}).get("source") or {}
+        if not force and out.exists() and recorded.get("inputs") == digest:
+            continue
+        source = {
+            "kind": "card-render", "card": name, "deck": card["deck"], "type": card["type"],
+            "inputs": digest,
+        }
+        jobs.append((art, frame, color, out, source))
+    for frame_name in sorted(missing_frames):
+        log(f"  WARNING: frames/{frame_name} not found; run generate-card-frame.py first")
+    if not jobs:
+        return []
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(composite_card, art, frame, color, out): (out, source)
+            for art, frame, color, out, source in jobs
+        }
+        for future, (out, source) in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                log(f"  ERROR: render for {source['card']}: {e}")
+                continue
+            manifest.update(out, source=source)
+            written.append(out)
+            log(f"  Render: {out.name} [{source['deck']}] {source['type']}")
+    return written
@@ -0,0 +1,207 @@
+"""
+Duplicate detection across the asset library.
+
+A persistent index records, per image, its sha256 plus two 64-bit
+perceptual hashes: dHash (gradient of a 9x8 greyscale thumbnail) and pHash
+(sign of the low 8x8 DCT coefficients of a 32x32 thumbnail against their
+median). Entries are keyed "<root label>/<path relative to that root>" and
+are only rehashed when the file's mtime or size moves, so a rescan after a
+generation run decodes just the new files.
+
+Files with the same sha256 are exact duplicates. Distinct files within
+PHASH_DISTANCE and DHASH_DISTANCE bits of each other on both hashes are
+near-duplicates (a regenerated card art that came back almost unchanged,
+a re-export of the same picture).
+"""
+
+import json
+
+from .deps import load_numpy, load_pillow
+from .fsutil import atomic_write_text, sha256_file
+from .log import log
+
+INDEX_VERSION = 1
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+# Derived trees under game-assets/ that duplicate their sources by design.
+SKIP_DIRS = {".cache", "variants", "atlases", "renders"}
+PHASH_DISTANCE = 6
+DHASH_DISTANCE = 8
+
+
+def _bits_to_hex(bits):
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return f"{value:016x}"
+
+
+def _dct_matrix(n):
+    np = load_numpy()
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+def image_hashes(path):
+    """{"sha256", "dhash", "phash"} for one image file."""
+    np = load_numpy()
+    Image = load_pillow()
+    with Image.open(path) as im:
+        # Composite transparency onto white so alpha-only differences don't vanish.
+        im = im.convert("RGBA")
+        flat = Image.new("RGBA", im.size, (255, 255, 255, 255))
+        flat.alpha_composite(im)
+        grey = flat.convert("L")
+    small = np.asarray(grey.resize((9, 8), Image.LANCZOS), dtype=np.float32)
+    dhash = small[:, 1:] > small[:, :-1]
+    pixels = np.asarray(grey.resize((32, 32), Image.LANCZOS), dtype=np.float32)
+    dct = _dct_matrix(32)
+    low = (dct @ pixels @ dct.T)[:8, :8].flatten()
+    phash = low > np.median(low[1:])
+    return {"sha256": sha256_file(path), "dhash": _bits_to_hex(dhash), "phash": _bits_to_hex(phash)}
+
+
+def iter_images(root):
+    for path in sorted(root.rglob("*")):
+        rel = path.relative_to(root)
+        if path.suffix.lower() not in IMAGE_SUFFIXES or not path.is_file():
+            continue
+        if any(part in SKIP_DIRS or part.startswith(".") for part in rel.parts):
+            continue
+        yield path
+
+
+class DedupIndex:
+    """The persisted hash index, {"<label>/<rel path>": entry}."""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == INDEX_VERSION:
+                self.files = data.get("files", {})
+
+    def refresh(self, roots, workers=None):
+        """
+        Bring the index in line with the images under `roots` ({label: dir}):
+        hash new or changed files on a process pool, drop vanished ones.
+        Returns the number of files (re)hashed.
+        """
+        seen = set()
+        stale = []
+        for label, root in roots.items():
+            if not root.exists():
+                continue
+            for path in iter_images(root):
+                rel = f"{label}/{path.relative_to(root)}"
+                seen.add(rel)
+                stat = path.stat()
+                entry = self.files.get(rel)
+                if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    continue
+                stale.append((rel, path, stat))
+        for rel in set(self.files) - seen:
+            del self.files[rel]
+
+        if stale:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(image_hashes, path): (rel, stat) for rel, path, stat in stale}
+                for future, (rel, stat) in futures.items():
+                    try:
+                        hashes = future.result()
+                    except Exception as e:
+                        log(f"  ERROR: hashing {rel}: {e}")
+                        continue
+                    self.files[rel] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, **hashes}
+        return len(stale)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "files": dict(sorted(self.files.items()))}
+        atomic_write_text(self.path, json.dumps(data, indent=1) + "\n")
+
+
+def exact_clusters(files):
+    """[[rel, ...]] of files sharing a sha256 (2+ members, sorted)."""
+    by_hash = {}
+    for rel, entry in files.items():
+        by_hash.setdefault(entry["sha256"], []).append(rel)
+    return sorted(sorted(rels) for rels in by_hash.values() if len(rels) > 1)
+
+
+def near_clusters(files, phash_distance=PHASH_DISTANCE, dhash_distance=DHASH_DISTANCE):
+    """
+    [[rel, ...]] of distinct-content files linked (transitively) by both
+    perceptual hashes being within the given Hamming distances. One
+    representative per exact-duplicate group takes part.
+    """
+    np = load_numpy()
+    reps = {}
+    for rel, entry in sorted(files.items()):
+        reps.setdefault(entry["sha256"], rel)
+    rels = list(reps.values())
+    if len(rels) < 2:
+        return []
+
+    popcount = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def distances(key):
+        values = np.array([int(files[r][key], 16) for r in rels], dtype=np.uint64)
+        xor = values[:, None] ^ values[None, :]
+        return popcount[xor.view(np.uint8)].reshape(len(rels), len(rels), 8).sum(axis=2)
+
+    close = (distances("phash") <= phash_distance) & (distances("dhash") <= dhash_distance)
+    parent = list(range(len(rels)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(close, k=1))):
+        parent[find(int(i))] = find(int(j))
+    groups = {}
+    for i, rel in enumerate(rels):
+        groups.setdefault(find(i), []).append(rel)
+    return sorted(sorted(g) for g in groups.values() if len(g) > 1)
+
+
+def alias_duplicates(sections, files):
+    """
+    Point every manifest entry that is a byte-identical copy of another at
+    one canonical file via "alias_of", and clear aliases that no longer
+    hold. `sections` maps an index label to the manifest entries for that
+    root, e.g. {"game-assets": manifest.assets, "lunchtable":
+    manifest.lunchtable}, so a copy in one tree can alias a file in the
+    other. Aliases name the canonical by its index key (shortest, then
+    alphabetical). Returns {alias key: canonical key}.
+    """
+    by_hash = {}
+    for label, entries in sections.items():
+        for rel in entries:
+            entry = files.get(f"{label}/{rel}")
+            if entry:
+                by_hash.setdefault(entry["sha256"], []).append(f"{label}/{rel}")
+    aliases = {}
+    for keys in by_hash.values():
+        canonical = min(keys, key=lambda k: (len(k), k))
+        for key in keys:
+            if key != canonical:
+                aliases[key] = canonical
+    for label, entries in sections.items():
+        for rel, entry in entries.items():
+            key = f"{label}/{rel}"
+            if key in aliases:
+                entry["alias_of"] = aliases[key]
+            else:
+                entry.pop("alias_of", None)
+    return aliases
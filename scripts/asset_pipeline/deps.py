@@ -0,0 +1,36 @@
+"""
+Third-party modules the pipeline needs only for some stages. Each loader
+imports on first use and exits with an install hint if the module is
+missing, so entry points stay importable (and fast to start) without them.
+"""
+
+
+def load_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise SystemExit("ERROR: pip install numpy")
+    return np
+
+
+def load_pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("ERROR: pip install pillow")
+    try:
+        import pillow_avif  # noqa: F401  (registers AVIF on Pillow < 11.2)
+    except ImportError:
+        pass
+    return Image
+
+
+def load_toml():
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise SystemExit("ERROR: pip install tomli (or use Python 3.11+)")
+    return tomllib
@@ -0,0 +1,165 @@
+"""
+Draft-then-final generation.
+
+Drafts render at DRAFT_QUALITY, shrunk to DRAFT_WIDTH, into a directory
+outside the manifest. The ledger (drafts.json) records each draft's prompt
+hash, which covers everything but quality, so promotion runs only the final
+render and refuses a draft whose prompt has changed since.
+"""
+
+import hashlib
+import json
+
+from .deps import load_pillow
+from .fsutil import atomic_write_text, atomic_writer
+from .image_request import ImageRequest, file_digest
+from .log import log
+
+DRAFT_QUALITY = "low"
+DRAFT_WIDTH = 384
+LEDGER_NAME = "drafts.json"
+SHEET_COLUMNS = 8
+SHEET_ROWS = 6
+THUMB_WIDTH = 192
+LABEL_HEIGHT = 28
+SHEET_BACKGROUND = (32, 32, 32)
+
+
+def prompt_hash(req):
+    """Hash of what determines the picture, independent of render quality."""
+    fields = {
+        "prompt": req.prompt,
+        "model": req.model,
+        "size": req.size,
+        "background": req.background,
+        "reference": file_digest(req.reference) if req.reference else None,
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def draft_request(req, drafts_dir, assets_dir):
+    """The draft counterpart of a final ImageRequest."""
+    return ImageRequest(
+        req.name,
+        drafts_dir / req.path.relative_to(assets_dir),
+        req.prompt,
+        model=req.model,
+        size=req.size,
+        background=req.background,
+        quality=DRAFT_QUALITY,
+        reference=req.reference,
+        label=req.label,
+        source=req.source,
+    )
+
+
+def shrink_draft(path, width=DRAFT_WIDTH):
+    """Downscale a saved draft in place to `width` pixels wide."""
+    Image = load_pillow()
+    with Image.open(path) as im:
+        if im.width <= width:
+            return
+        small = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+    with atomic_writer(path) as f:
+        small.save(f, format="PNG", optimize=True)
+
+
+def draft_renderer(render):
+    """Wrap a Runner render function so its outputs are shrunk to draft size."""
+    def run(req):
+        value = render(req)
+        shrink_draft(req.path)
+        return value
+
+    return run
+
+
+class DraftLedger:
+    def __init__(self, drafts_dir):
+        self.drafts_dir = drafts_dir
+        self.path = drafts_dir / LEDGER_NAME
+        self.entries = {}
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text()).get("drafts", {})
+
+    def is_drafted(self, req):
+        """True if a draft exists for this request's current prompt."""
+        entry = self.entries.get(req.name)
+        return bool(entry) and entry["prompt"] == prompt_hash(req) and (
+            self.drafts_dir / entry["path"]
+        ).exists()
+
+    def is_promoted(self, req):
+        entry = self.entries.get(req.name)
+        return bool(entry) and entry.get("promoted") == prompt_hash(req)
+
+    def record(self, draft):
+        """Note a finished draft (an ImageRequest from draft_request())."""
+        entry = self.entries.setdefault(draft.name, {})
+        entry.update(
+            prompt=prompt_hash(draft),
+            path=str(draft.path.relative_to(self.drafts_dir)),
+            label=draft.label,
+        )
+
+    def promotion_problem(self, req):
+        """Why `req` can't be promoted yet, or None if it can."""
+        entry = self.entries.get(req.name)
+        if not entry:
+            return "not drafted yet"
+        if entry["prompt"] != prompt_hash(req):
+            return "prompt changed since it was drafted; draft it again"
+        return None
+
+    def mark_promoted(self, req):
+        self.entries[req.name]["promoted"] = prompt_hash(req)
+
+    def current(self, requests):
+        """(name, draft path) for each of `requests` with a current draft, in order."""
+        return [
+            (req.name, self.drafts_dir / self.entries[req.name]["path"])
+            for req in requests
+            if self.is_drafted(req)
+        ]
+
+    def save(self):
+        self.drafts_dir.mkdir(parents=True, exist_ok=True)
+        data = {"drafts": dict(sorted(self.entries.items()))}
+        atomic_write_text(self.path, json.dumps(data, indent=2) + "\n")
+
+
+def build_contact_sheets(tiles, out_dir, prefix="contact-sheet"):
+    """
+    Tile [(caption, image path)] into numbered review sheets of
+    SHEET_COLUMNS x SHEET_ROWS thumbnails. Captions are the names --promote
+    takes.
+    Returns the sheet paths written.
+    """
+    Image = load_pillow()
+    from PIL import ImageDraw
+
+    per_sheet = SHEET_COLUMNS * SHEET_ROWS
+    for stale in out_dir.glob(f"{prefix}-*.png"):
+        stale.unlink()
+    sheets = []
+    for page, start in enumerate(range(0, len(tiles), per_sheet), 1):
+        chunk = tiles[start:start + per_sheet]
+        thumbs = []
+        for label, path in chunk:
+            with Image.open(path) as im:
+                height = round(im.height * THUMB_WIDTH / im.width)
+                thumbs.append((label, im.convert("RGBA").resize((THUMB_WIDTH, height), Image.LANCZOS)))
+        cell_h = max(t.height for _, t in thumbs) + LABEL_HEIGHT
+        rows = -(-len(thumbs) // SHEET_COLUMNS)
+        sheet = Image.new("RGB", (SHEET_COLUMNS * THUMB_WIDTH, rows * cell_h), SHEET_BACKGROUND)
+        draw = ImageDraw.Draw(sheet)
+        for i, (label, thumb) in enumerate(thumbs):
+            x, y = (i % SHEET_COLUMNS) * THUMB_WIDTH, (i // SHEET_COLUMNS) * cell_h
+            sheet.paste(thumb, (x, y), thumb)
+            draw.text((x + 4, y + thumb.height + 4), f"{start + i + 1}. {label}"[:32], fill=(230, 230, 230))
+        path = out_dir / f"{prefix}-{page}.png"
+        with atomic_writer(path) as f:
+            sheet.save(f, format="PNG", optimize=True)
+        log(f"  Contact sheet: {path} ({len(chunk)} drafts)")
+        sheets.append(path)
+    return sheets
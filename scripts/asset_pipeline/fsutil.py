@@ -0,0 +1,51 @@
+"""
+Crash-safe file writes (write to a hidden temp file, fsync, then rename) and
+file hashing.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+
+def temp_path(path):
+    """Hidden sibling temp file, unique per process and thread."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+@contextmanager
+def atomic_writer(path):
+    """Binary file handle whose contents replace `path` only if the block succeeds."""
+    tmp = temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def atomic_write_bytes(path, data):
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+def atomic_write_text(path, text):
+    atomic_write_bytes(path, text.encode())
+
+
+def atomic_copy(src, path):
+    with atomic_writer(path) as f, open(src, "rb") as s:
+        shutil.copyfileobj(s, f)
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
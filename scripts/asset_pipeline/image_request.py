@@ -0,0 +1,89 @@
+"""Description of a single image to render, shared by both generator scripts."""
+
+import hashlib
+import json
+from pathlib import Path
+
+from .fsutil import sha256_file
+
+_reference_digests = {}
+
+
+def file_digest(path):
+    """sha256 of a file's bytes, memoized on (path, mtime, size)."""
+    stat = path.stat()
+    memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    digest = _reference_digests.get(memo_key)
+    if digest is None:
+        digest = _reference_digests[memo_key] = sha256_file(path)
+    return digest
+
+
+class ImageRequest:
+    """
+    Everything that determines an image's pixels, plus where it should land.
+
+    `reference` is the input image for images.edit; None means images.generate.
+    `source` is manifest metadata about what the image depicts (kind, card,
+    deck, type); it does not affect the render.
+    """
+
+    def __init__(
+        self,
+        name,
+        path,
+        prompt,
+        model="gpt-image-1",
+        size="1024x1024",
+        background="transparent",
+        quality="high",
+        reference=None,
+        label=None,
+        source=None,
+    ):
+        self.name = name
+        self.path = path
+        self.prompt = prompt
+        self.model = model
+        self.size = size
+        self.background = background
+        self.quality = quality
+        self.reference = reference
+        self.label = label or name
+        self.source = source
+
+    def to_dict(self, base_dir):
+        """JSON-safe form with paths relative to `base_dir`."""
+        return {
+            "name": self.name,
+            "path": str(self.path.relative_to(base_dir)),
+            "prompt": self.prompt,
+            "model": self.model,
+            "size": self.size,
+            "background": self.background,
+            "quality": self.quality,
+            "reference": str(self.reference) if self.reference else None,
+            "label": self.label,
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_dict(cls, data, base_dir):
+        fields = dict(data)
+        fields["path"] = base_dir / fields["path"]
+        if fields.get("reference"):
+            fields["reference"] = Path(fields["reference"])
+        return cls(**fields)
+
+    def cache_key(self):
+        """Content address of the render: same key means same request to the API."""
+        fields = {
+            "prompt": self.prompt,
+            "model": self.model,
+            "size": self.size,
+            "background": self.background,
+            "quality": self.quality,
+            "reference": file_digest(self.reference) if self.reference else None,
+        }
+        payload = json.dumps(fields, sort_keys=True).encode()
+        return hashlib.sha256(payload).hexdigest()
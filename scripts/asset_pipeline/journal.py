@@ -0,0 +1,133 @@
+"""
+Append-only JSONL journal of generation job states.
+
+Every transition (queued, in-flight, done, failed) is appended and fsynced
+as one line, keyed on the output path, so a run killed at any point leaves
+an exact record of what still needs doing. "queued" lines carry the full
+ImageRequest, which lets --resume / --retry-failed replay unfinished jobs
+without rebuilding them from the card database.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from .fsutil import atomic_write_text
+from .image_request import ImageRequest
+
+QUEUED = "queued"
+IN_FLIGHT = "in-flight"
+DONE = "done"
+FAILED = "failed"
+UNFINISHED = (QUEUED, IN_FLIGHT, FAILED)
+
+# Rewrite the journal down to one line per job once it gets this much longer.
+COMPACT_RATIO = 4
+
+
+class Journal:
+    def __init__(self, path, base_dir):
+        self.path = path
+        self.base_dir = base_dir
+        self.run_id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._requests = {}
+        lines = 0
+        if path.exists():
+            text = path.read_text()
+            if text and not text.endswith("\n"):
+                # Drop a line torn by a crash so the next record starts on its own line.
+                with open(path, "r+b") as f:
+                    f.truncate(f.read().rfind(b"\n") + 1)
+            for line in text.splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from a crash
+                lines += 1
+                self._apply(record)
+        if lines > COMPACT_RATIO * max(1, len(self._latest)):
+            self._compact()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _apply(self, record):
+        key = record["key"]
+        if "request" in record:
+            self._requests[key] = record["request"]
+        self._latest[key] = record
+
+    def _compact(self):
+        lines = []
+        for key, record in self._latest.items():
+            record = dict(record)
+            if key in self._requests:
+                record["request"] = self._requests[key]
+            lines.append(json.dumps(record) + "\n")
+        atomic_write_text(self.path, "".join(lines))
+
+    def _key(self, req):
+        return str(req.path.relative_to(self.base_dir))
+
+    def record(self, req, state, attempt=0, error=None, include_request=False):
+        record = {
+            "ts": time.time(),
+            "run": self.run_id,
+            "key": self._key(req),
+            "state": state,
+            "attempt": attempt,
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        if include_request:
+            record["request"] = req.to_dict(self.base_dir)
+        with self._lock:
+            self._apply(record)
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def queue(self, requests):
+        """Record `requests` as queued, skipping any whose latest line already queues it as is."""
+        for req in requests:
+            key = self._key(req)
+            latest = self._latest.get(key)
+            if latest and latest["state"] == QUEUED and self._requests.get(key) == req.to_dict(self.base_dir):
+                continue
+            self.record(req, QUEUED, include_request=True)
+
+    def listener(self, event, job, attempt, error):
+        """Scheduler listener that mirrors job transitions into the journal."""
+        state = {"start": IN_FLIGHT, "retry": IN_FLIGHT, "done": DONE, "failed": FAILED}[event]
+        for req in job.requests:
+            self.record(req, state, attempt=attempt, error=error)
+
+    def state(self, req):
+        record = self._latest.get(self._key(req))
+        return record["state"] if record else None
+
+    def pending(self, states=UNFINISHED):
+        """ImageRequests whose latest state is in `states`, ready to re-run."""
+        return [
+            ImageRequest.from_dict(self._requests[key], self.base_dir)
+            for key, record in self._latest.items()
+            if record["state"] in states and key in self._requests
+        ]
+
+    def summary(self):
+        counts = {}
+        for record in self._latest.values():
+            counts[record["state"]] = counts.get(record["state"], 0) + 1
+        return counts
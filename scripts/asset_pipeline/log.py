@@ -0,0 +1,13 @@
+"""Thread-safe console output for concurrent generation runs."""
+
+import sys
+import threading
+
+_lock = threading.Lock()
+
+
+def log(message=""):
+    """Print a whole line without interleaving with other workers."""
+    with _lock:
+        sys.stdout.write(f"{message}\n")
+        sys.stdout.flush()
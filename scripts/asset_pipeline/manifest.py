@@ -0,0 +1,166 @@
+"""
+game-assets/manifest.json, updated in place from the files a run touched.
+
+Shape (keys are paths relative to game-assets/):
+
+    {
+      "version": 2,
+      "generated": ["board/playmat.png", ...],
+      "assets": {
+        "cards/foo.png": {
+          "sha256": "...", "bytes": 812345, "width": 1024, "height": 1536,
+          "alpha": true, "alias_of": "game-assets/cards/bar.png",
+          "source": {"kind": "card-art", "card": "Foo", "deck": "Geeks", "type": "Stereotype"},
+          "placeholder": {"blurhash": "L00Ss5...", "lqip": "data:image/webp;base64,...",
+                          "color": "#2a1f18"},
+          "variants": [{"path": "variants/cards/foo-256w.webp", "format": "webp",
+                        "width": 256, "height": 384, "bytes": 9876, "sha256": "..."}]
+        }
+      },
+      "atlases": {
+        "ui-0": {"path": "atlases/ui-0.png", "sha256": "...", "width": 2048, "height": 1540,
+                 "group": "ui", "inputs": "...", "variants": [...],
+                 "sprites": {"frames/frame-monster.png": {"x": 2, "y": 2, "w": 512, "h": 768,
+                             "u0": 0.000977, "v0": 0.001299, "u1": 0.250977, "v1": 0.5}}}
+      },
+      "lunchtable": {
+        "pvp.png": {"sha256": "...", "width": 1536, "height": 1024, "placeholder": {...}}
+      }
+    }
+
+`generated` is kept for consumers of the original flat manifest. The content
+hashes let the client build immutable, long-cache URLs, and the dimensions
+let it reserve layout boxes before an image arrives. `alias_of` (set by
+dedup-assets.py, in `assets` and `lunchtable`) marks a byte-identical copy
+of another image, named "game-assets/<path>" or "lunchtable/<path>". Atlases are
+described in asset_pipeline/atlas.py. `placeholder` (see
+asset_pipeline/placeholders.py) is what the client paints while the image
+loads; `lunchtable` carries the same for public/lunchtable/ images, keyed by
+their path there.
+"""
+
+import json
+import struct
+
+from .fsutil import atomic_write_text, sha256_file
+
+MANIFEST_VERSION = 2
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG colour types that carry an alpha channel: greyscale+alpha, RGBA.
+ALPHA_COLOR_TYPES = {4, 6}
+
+
+def png_info(path):
+    """(width, height, has_alpha) from the PNG header chunks, without decoding pixels."""
+    with open(path, "rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError(f"{path.name} is not a PNG")
+        length, chunk_type = struct.unpack(">I4s", f.read(8))
+        if chunk_type != b"IHDR":
+            raise ValueError(f"{path.name} has no IHDR chunk")
+        width, height, _depth, color_type = struct.unpack(">IIBB", f.read(10))
+        has_alpha = color_type in ALPHA_COLOR_TYPES
+        f.seek(length - 10 + 4, 1)  # rest of IHDR + CRC
+        # A tRNS chunk before the image data gives palette/RGB images transparency.
+        while not has_alpha:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack(">I4s", header)
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+            has_alpha = chunk_type == b"tRNS"
+            f.seek(length + 4, 1)
+    return width, height, has_alpha
+
+
+class Manifest:
+    def __init__(self, path, assets_dir):
+        self.path = path
+        self.assets_dir = assets_dir
+        self.assets = {}
+        self.atlases = {}
+        self.lunchtable = {}
+        if path.exists():
+            data = json.loads(path.read_text())
+            self.assets = data.get("assets", {})
+            self.atlases = data.get("atlases", {})
+            self.lunchtable = data.get("lunchtable", {})
+            # Seed from a version-1 manifest (flat path list) without re-globbing.
+            for rel in data.get("generated", []):
+                self.assets.setdefault(rel, {})
+
+    def _rel(self, path):
+        return str(path.relative_to(self.assets_dir))
+
+    @staticmethod
+    def variant_records(variants, assets_dir):
+        return [
+            {
+                "path": str(v["path"].relative_to(assets_dir)),
+                "format": v["format"],
+                "width": v["width"],
+                "height": v["height"],
+                "bytes": v["bytes"],
+                "sha256": sha256_file(v["path"]),
+            }
+            for v in variants
+        ]
+
+    def update(self, path, source=None, variants=None):
+        """Refresh one asset's entry from disk. `variants` replaces the recorded list if given."""
+        rel = self._rel(path)
+        entry = self.assets.get(rel, {})
+        width, height, alpha = png_info(path)
+        digest = sha256_file(path)
+        if entry.get("sha256") != digest:
+            # New content: any duplicate alias (see dedup.py) no longer holds and
+            # the placeholder describes the old picture.
+            entry.pop("alias_of", None)
+            entry.pop("placeholder", None)
+        entry.update(
+            sha256=digest,
+            bytes=path.stat().st_size,
+            width=width,
+            height=height,
+            alpha=alpha,
+        )
+        if source:
+            entry["source"] = source
+        if variants is not None:
+            entry["variants"] = self.variant_records(variants, self.assets_dir)
+        self.assets[rel] = entry
+        return entry
+
+    def remove(self, path):
+        self.assets.pop(self._rel(path), None)
+
+    def prune(self):
+        """Drop entries whose file is gone (a stat per entry, no directory walk)."""
+        gone = [rel for rel in self.assets if not (self.assets_dir / rel).exists()]
+        for rel in gone:
+            del self.assets[rel]
+        return gone
+
+    def to_dict(self):
+        assets = dict(sorted(self.assets.items()))
+        return {
+            "version": MANIFEST_VERSION,
+            "generated": list(assets),
+            "assets": assets,
+            "atlases": self.atlases,
+            "lunchtable": dict(sorted(self.lunchtable.items())),
+        }
+
+    def save(self):
+        atomic_write_text(self.path, json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def update_manifest(manifest, requests, variants=None):
+    """Refresh the entries for `requests` (ImageRequests) and save."""
+    variants = variants or {}
+    for req in requests:
+        if req.path.exists():
+            manifest.update(req.path, source=req.source, variants=variants.get(req.path))
+    manifest.prune()
+    manifest.save()
@@ -0,0 +1,291 @@
+"""
+Per-job instrumentation for generation runs.
+
+RunMetrics attaches to a Runner the way the journal does. Code inside a job
+times its phases with `phase(name)` ("budget", "api", "write", "validate")
+and adds to counters with `count(field)`; both are no-ops outside a metered
+job. Each finished job is appended to a JSONL events file;
+write_prometheus() and summary_lines() report the run's totals, with spend
+estimated from IMAGE_PRICES per rendered image.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .card_render import DECK_COLORS
+from .fsutil import atomic_write_text
+
+# Estimated USD per output image by (quality, size), from gpt-image-1 output
+# token pricing. "auto" is counted as high so estimates err on the high side.
+IMAGE_PRICES = {
+    ("low", "1024x1024"): 0.011,
+    ("medium", "1024x1024"): 0.042,
+    ("high", "1024x1024"): 0.167,
+    ("low", "1024x1536"): 0.016,
+    ("medium", "1024x1536"): 0.063,
+    ("high", "1024x1536"): 0.25,
+    ("low", "1536x1024"): 0.016,
+    ("medium", "1536x1024"): 0.063,
+    ("high", "1536x1024"): 0.25,
+}
+QUALITY_ALIASES = {"auto": "high", "standard": "medium", "hd": "high"}
+PERCENTILES = (0.5, 0.9, 0.99)
+PROM_PREFIX = "ltcg_asset"
+
+_current = threading.local()
+
+
+@contextmanager
+def phase(name):
+    """Time a phase of the job running on this thread."""
+    record = getattr(_current, "record", None)
+    if record is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        record["phases"].append(
+            {"phase": name, "attempt": record["attempts"], "start": start, "end": time.time()}
+        )
+
+
+def count(field, amount=1):
+    """Add to a counter (renders, response_bytes, rejects) on this thread's job."""
+    record = getattr(_current, "record", None)
+    if record is not None:
+        record[field] += amount
+
+
+def estimate_price(size, quality):
+    quality = QUALITY_ALIASES.get(quality, quality)
+    return IMAGE_PRICES.get((quality, size), IMAGE_PRICES[("high", "1024x1536")])
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def _bucket(req):
+    """Spend bucket: the card's deck, else the asset kind (board, frame, card-back)."""
+    source = req.source or {}
+    return source.get("deck") or source.get("kind") or "other"
+
+
+class RunMetrics:
+    """
+    Collects one record per job. Events go to `<dir>/<name>-<run id>.jsonl`,
+    the Prometheus snapshot to `<dir>/<name>.prom`.
+    """
+
+    def __init__(self, metrics_dir, name, run_id=None):
+        self.run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.events_path = metrics_dir / f"{name}-{self.run_id}.jsonl"
+        self.prom_path = metrics_dir / f"{name}.prom"
+        self.started = time.time()
+        self.records = []
+        self._open = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _record(self, req, key, outputs, queued):
+        return {
+            "run": self.run_id,
+            "job": key,
+            "label": req.label,
+            "path": req.path.name,
+            "model": req.model,
+            "size": req.size,
+            "quality": req.quality,
+            "bucket": _bucket(req),
+            "outputs": outputs,
+            "queued": queued,
+            "started": None,
+            "finished": None,
+            "attempts": 0,
+            "renders": 0,
+            "rejects": 0,
+            "response_bytes": 0,
+            "phases": [],
+            "retries": [],
+            "outcome": None,
+            "error": None,
+            "error_message": None,
+        }
+
+    def _emit(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self._file is None:
+                self.events_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.events_path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def queue(self, jobs):
+        now = time.time()
+        with self._lock:
+            for job in jobs:
+                self._open[job.key] = self._record(job.requests[0], job.key, len(job.requests), now)
+
+    def cached(self, requests):
+        """Record requests the cache satisfied without a job."""
+        now = time.time()
+        for req in requests:
+            record = self._record(req, req.name, 1, now)
+            record.update(started=now, finished=now, outcome="cached")
+            self._emit(record)
+
+    def listener(self, event, job, attempt, error):
+        """Scheduler listener; runs on the worker thread executing `job`."""
+        with self._lock:
+            record = self._open.get(job.key)
+        if record is None:
+            return
+        now = time.time()
+        if event == "start":
+            record["attempts"] = attempt
+            if record["started"] is None:
+                record["started"] = now
+            _current.record = record
+            return
+        _current.record = None
+        if event == "retry":
+            record["retries"].append({"attempt": attempt, "at": now, "error": type(error).__name__})
+            return
+        record.update(
+            finished=now,
+            outcome="ok" if event == "done" else "failed",
+            error=type(error).__name__ if error else None,
+            error_message=str(error)[:300] if error else None,
+        )
+        with self._lock:
+            del self._open[job.key]
+        self._emit(record)
+
+    def _totals(self):
+        records = self.records
+        jobs = [r for r in records if r["outcome"] in ("ok", "failed")]
+        totals = {
+            "outcomes": {},
+            "failures": {},
+            "retries": {},
+            "phases": {},
+            "spend": {},
+            "renders": sum(r["renders"] for r in records),
+            "attempts": sum(r["attempts"] for r in records),
+            "response_bytes": sum(r["response_bytes"] for r in records),
+            "latency": [r["finished"] - r["started"] for r in jobs],
+            "queue": [r["started"] - r["queued"] for r in jobs],
+            "elapsed": max([r["finished"] for r in records], default=self.started) - self.started,
+        }
+        for r in records:
+            totals["outcomes"][r["outcome"]] = totals["outcomes"].get(r["outcome"], 0) + 1
+            if r["outcome"] == "failed":
+                totals["failures"][r["error"]] = totals["failures"].get(r["error"], 0) + 1
+            for retry in r["retries"]:
+                totals["retries"][retry["error"]] = totals["retries"].get(retry["error"], 0) + 1
+            for p in r["phases"]:
+                totals["phases"][p["phase"]] = totals["phases"].get(p["phase"], 0.0) + p["end"] - p["start"]
+            if r["renders"]:
+                spent, renders = totals["spend"].get(r["bucket"], (0.0, 0))
+                totals["spend"][r["bucket"]] = (
+                    spent + r["renders"] * estimate_price(r["size"], r["quality"]),
+                    renders + r["renders"],
+                )
+        return totals
+
+    def write_prometheus(self):
+        """Write the run's totals in Prometheus text exposition format."""
+        t = self._totals()
+        p = PROM_PREFIX
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{p}_{name}{{{label_text}}} {value}" if label_text else f"{p}_{name} {value}")
+
+        metric("jobs_total", "counter", "Generation jobs by outcome.",
+               [({"outcome": k}, v) for k, v in sorted(t["outcomes"].items())])
+        metric("failures_total", "counter", "Failed jobs by error class.",
+               [({"error": k}, v) for k, v in sorted(t["failures"].items())])
+        metric("retries_total", "counter", "Retried attempts by error class.",
+               [({"error": k}, v) for k, v in sorted(t["retries"].items())])
+        metric("attempts_total", "counter", "API attempts, including retries.", [({}, t["attempts"])])
+        metric("renders_total", "counter", "Images returned by the API.", [({}, t["renders"])])
+        metric("response_bytes_total", "counter", "Decoded image bytes written.", [({}, t["response_bytes"])])
+        metric("phase_seconds_total", "counter", "Time spent per job phase.",
+               [({"phase": k}, round(v, 3)) for k, v in sorted(t["phases"].items())])
+        for name, values, help_text in (
+            ("job_seconds", t["latency"], "Job latency from first start to finish."),
+            ("queue_seconds", t["queue"], "Time from queueing to first start."),
+        ):
+            samples = [({"quantile": str(q)}, round(percentile(values, q), 3)) for q in PERCENTILES]
+            metric(name, "summary", help_text, samples)
+            lines.append(f"{p}_{name}_sum {round(sum(values), 3)}")
+            lines.append(f"{p}_{name}_count {len(values)}")
+        metric("estimated_spend_usd", "gauge", "Estimated image spend by deck or asset kind.",
+               [({"bucket": k}, round(v[0], 4)) for k, v in sorted(t["spend"].items())])
+        metric("run_seconds", "gauge", "Wall time of the run so far.", [({}, round(t["elapsed"], 3))])
+        self.prom_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.prom_path, "\n".join(lines) + "\n")
+
+    def summary_lines(self):
+        t = self._totals()
+        outcomes = t["outcomes"]
+        elapsed = max(t["elapsed"], 1e-9)
+        lines = [
+            f"Jobs: {outcomes.get('ok', 0)} ok, {outcomes.get('failed', 0)} failed, "
+            f"{outcomes.get('cached', 0)} from cache in {t['elapsed']:.1f}s "
+            f"({t['renders'] / elapsed * 60:.1f} images/min, {t['attempts']} API attempts)"
+        ]
+        if t["latency"]:
+            quantiles = " / ".join(f"{percentile(t['latency'], q):.1f}s" for q in PERCENTILES)
+            lines.append(
+                f"Latency p50/p90/p99: {quantiles}; queue p50 {percentile(t['queue'], 0.5):.1f}s"
+            )
+        busy = sum(t["phases"].values())
+        if busy:
+            lines.append("Time by phase: " + ", ".join(
+                f"{name} {seconds:.1f}s ({seconds / busy:.0%})"
+                for name, seconds in sorted(t["phases"].items(), key=lambda kv: -kv[1])
+            ))
+        if t["failures"]:
+            lines.append("Failures: " + ", ".join(
+                f"{name} x{n}" for name, n in sorted(t["failures"].items(), key=lambda kv: -kv[1])
+            ))
+        if t["retries"]:
+            lines.append("Retried: " + ", ".join(
+                f"{name} x{n}" for name, n in sorted(t["retries"].items(), key=lambda kv: -kv[1])
+            ))
+        if t["spend"]:
+            total = sum(spent for spent, _ in t["spend"].values())
+            lines.append(f"Estimated spend: ${total:.2f}")
+            order = list(DECK_COLORS) + sorted(b for b in t["spend"] if b not in DECK_COLORS)
+            for bucket in order:
+                if bucket in t["spend"]:
+                    spent, renders = t["spend"][bucket]
+                    lines.append(f"  {bucket:<10} ${spent:.2f} ({renders} images)")
+        return lines
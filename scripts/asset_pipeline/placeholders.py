@@ -0,0 +1,177 @@
+"""
+Instant-paint placeholders for manifest images.
+
+Each image gets a BlurHash (from a SAMPLE_WIDTH thumbnail, transparency
+composited onto the card base colour), a LQIP_WIDTH px WebP data URI and its
+dominant colour as #rrggbb, computed once per content hash.
+"""
+
+import base64
+import io
+import math
+
+from .card_render import BASE_COLOR, hex_rgb
+from .dedup import IMAGE_SUFFIXES, iter_images
+from .deps import load_numpy, load_pillow
+from .fsutil import sha256_file
+from .log import log
+
+BLURHASH_COMPONENTS = (4, 3)
+SAMPLE_WIDTH = 64
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+CHUNK_SIZE = 8
+# Alpha at or above this counts towards the dominant colour.
+VISIBLE_ALPHA = 128
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value, length):
+    return "".join(BASE83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _srgb_to_linear(np, values):
+    v = values / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(value):
+    v = min(1.0, max(0.0, value))
+    srgb = v * 12.92 if v <= 0.0031308 else 1.055 * v ** (1 / 2.4) - 0.055
+    return int(srgb * 255 + 0.5)
+
+
+def blurhash(rgb, components=BLURHASH_COMPONENTS):
+    """BlurHash of an (h, w, 3) uint8 array."""
+    np = load_numpy()
+    cx, cy = components
+    height, width = rgb.shape[:2]
+    linear = _srgb_to_linear(np, rgb.astype(np.float64))
+    cos_x = np.cos(np.pi * np.arange(cx)[:, None] * np.arange(width)[None, :] / width)
+    cos_y = np.cos(np.pi * np.arange(cy)[:, None] * np.arange(height)[None, :] / height)
+    # factors[j, i] = sum over pixels of cos_y[j, y] * cos_x[i, x] * linear[y, x]
+    factors = np.einsum("jy,ix,yxc->jic", cos_y, cos_x, linear) / (width * height)
+    factors[1:, :] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(cx * cy, 3)
+
+    dc, ac = factors[0], factors[1:]
+    out = _base83((cx - 1) + (cy - 1) * 9, 1)
+    if len(ac):
+        quantised_max = int(max(0, min(82, math.floor(float(np.abs(ac).max()) * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        out += _base83(quantised_max, 1)
+    else:
+        max_value = 1.0
+        out += _base83(0, 1)
+    out += _base83(
+        (_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4
+    )
+    if len(ac):
+        scaled = np.sign(ac) * np.abs(ac / max_value) ** 0.5
+        quant = np.clip(np.floor(scaled * 9 + 9.5), 0, 18).astype(int)
+        for r, g, b in quant:
+            out += _base83(int(r) * 19 * 19 + int(g) * 19 + int(b), 2)
+    return out
+
+
+def dominant_color(rgba):
+    """Most populated colour bin of the visible pixels of an (h, w, 4) array, as #rrggbb."""
+    np = load_numpy()
+    pixels = rgba.reshape(-1, 4)
+    visible = pixels[pixels[:, 3] >= VISIBLE_ALPHA]
+    if not len(visible):
+        visible = pixels
+    rgb = visible[:, :3].astype(np.int64)
+    bins = (rgb[:, 0] >> 4) * 256 + (rgb[:, 1] >> 4) * 16 + (rgb[:, 2] >> 4)
+    top = np.bincount(bins).argmax()
+    r, g, b = (int(round(c)) for c in rgb[bins == top].mean(axis=0))
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def placeholder(path):
+    """({"blurhash", "lqip", "color"}, (width, height)) for one image file."""
+    np = load_numpy()
+    Image = load_pillow()
+    with Image.open(path) as im:
+        size = im.size
+        im.draft("RGB", (SAMPLE_WIDTH * 2, SAMPLE_WIDTH * 2))  # JPEG: decode at reduced scale
+        im = im.convert("RGBA")
+        sample = im.resize(
+            (SAMPLE_WIDTH, max(1, round(im.height * SAMPLE_WIDTH / im.width))), Image.BOX
+        )
+    lqip = sample.resize(
+        (LQIP_WIDTH, max(1, round(sample.height * LQIP_WIDTH / sample.width))), Image.LANCZOS
+    )
+    buf = io.BytesIO()
+    lqip.save(buf, format="WEBP", quality=LQIP_QUALITY, method=6)
+
+    rgba = np.asarray(sample)
+    alpha = rgba[..., 3:4].astype(np.float64) / 255
+    backdrop = np.array(hex_rgb(BASE_COLOR), dtype=np.float64)
+    flat = (rgba[..., :3] * alpha + backdrop * (1 - alpha)).round().astype(np.uint8)
+    return {
+        "blurhash": blurhash(flat),
+        "lqip": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+        "color": dominant_color(rgba),
+    }, size
+
+
+def build_placeholders(paths, workers=None):
+    """{path: (placeholder, (width, height))} for `paths`, on a process pool. Failures are logged."""
+    results = {}
+    if not paths:
+        return results
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        outcomes = pool.map(_safe_placeholder, paths, chunksize=CHUNK_SIZE)
+        for path, (value, error) in zip(paths, outcomes):
+            if error:
+                log(f"  ERROR: placeholder for {path.name}: {error}")
+            else:
+                results[path] = value
+    return results
+
+
+def _safe_placeholder(path):
+    try:
+        return placeholder(path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def refresh_placeholders(manifest, lunchtable_dir=None, workers=None, force=False):
+    """
+    Give every manifest image asset, and every image under `lunchtable_dir`
+    (recorded in manifest.lunchtable), a current placeholder. Returns the
+    number computed this time.
+    """
+    assets_dir = manifest.assets_dir
+    todo = {}
+    for rel, entry in manifest.assets.items():
+        path = assets_dir / rel
+        if path.suffix.lower() in IMAGE_SUFFIXES and path.exists() and (force or "placeholder" not in entry):
+            todo[path] = entry
+
+    if lunchtable_dir is not None and lunchtable_dir.exists():
+        seen = set()
+        for path in iter_images(lunchtable_dir):
+            rel = str(path.relative_to(lunchtable_dir))
+            seen.add(rel)
+            digest = sha256_file(path)
+            entry = manifest.lunchtable.get(rel)
+            if entry is None or entry.get("sha256") != digest:
+                entry = manifest.lunchtable[rel] = {"sha256": digest}
+            if force or "placeholder" not in entry:
+                todo[path] = entry
+        for rel in set(manifest.lunchtable) - seen:
+            del manifest.lunchtable[rel]
+
+    computed = build_placeholders(list(todo), workers)
+    for path, (value, (width, height)) in computed.items():
+        entry = todo[path]
+        entry["placeholder"] = value
+        entry.setdefault("width", width)
+        entry.setdefault("height", height)
+    return len(computed)
@@ -0,0 +1,93 @@
+"""Post-generation stages shared by both generator scripts."""
+
+from .atlas import build_atlases
+from .card_render import build_card_renders
+from .fsutil import sha256_file
+from .manifest import Manifest, update_manifest
+from .placeholders import refresh_placeholders
+from .variants import build_variants
+
+
+def encode_atlas_variants(manifest, sheets):
+    """Encode WebP/AVIF copies of freshly written atlas sheets and record them."""
+    encoded = build_variants(sheets, manifest.assets_dir)
+    for entry in manifest.atlases.values():
+        records = encoded.get(manifest.assets_dir / entry["path"])
+        if records is not None:
+            entry["variants"] = Manifest.variant_records(records, manifest.assets_dir)
+
+
+def render_cards(manifest, cards, variants=True):
+    """Composite changed card renders (see card_render.py), with their variants."""
+    written = build_card_renders(cards, manifest)
+    if written and variants:
+        for path, records in build_variants(written, manifest.assets_dir).items():
+            manifest.update(path, variants=records)
+    return written
+
+
+def out_of_date(manifest, requests, wants_variants):
+    """
+    The requests whose output is on disk but whose manifest entry is
+    missing, describes other content or source, or has no variants although
+    `wants_variants(request)` says it should.
+    """
+    stale = []
+    for req in requests:
+        if not req.path.exists():
+            continue
+        entry = manifest.assets.get(str(req.path.relative_to(manifest.assets_dir)))
+        if (
+            not entry
+            or entry.get("sha256") != sha256_file(req.path)
+            or (req.source and entry.get("source") != req.source)
+            or (wants_variants(req) and not entry.get("variants"))
+        ):
+            stale.append(req)
+    return stale
+
+
+def finish_run(
+    touched, assets_dir, variants=True, atlases=True, cards=None, manifest_path=None, encode=None,
+    unchanged=(),
+):
+    """
+    Run the stages that follow generation on the requests a run touched:
+    WebP/AVIF variants (for the requests `encode(request)` accepts, default
+    all; see AssetSpec.wants_variants), manifest entries, finished card
+    renders (when the card index is given), placeholders, then texture
+    atlases. Requests in `unchanged` (outputs the cache says are current)
+    go through the same stages when out_of_date() finds their manifest entry
+    behind, e.g. after a run interrupted during post-processing. Renders and
+    atlases are rebuilt only when their inputs changed, placeholders only
+    for assets without one for their current content. `manifest_path`
+    defaults to assets_dir/manifest.json. Returns the saved Manifest.
+    """
+    manifest = Manifest(manifest_path or assets_dir / "manifest.json", assets_dir)
+
+    def wants_variants(req):
+        return variants and (encode is None or encode(req))
+
+    fresh = {req.path for req in touched}
+    behind = out_of_date(manifest, [req for req in unchanged if req.path not in fresh], wants_variants)
+    if behind:
+        print(f"\n=== {len(behind)} current assets missing from the manifest or their variants ===")
+        touched = list(touched) + behind
+    encoded = {}
+    todo = [req.path for req in touched if wants_variants(req)]
+    if todo:
+        print(f"\n=== Encoding variants for {len(todo)} assets ===\n")
+        encoded = build_variants(todo, assets_dir)
+    update_manifest(manifest, touched, encoded)
+
+    if cards:
+        if render_cards(manifest, cards, variants):
+            manifest.save()
+    if refresh_placeholders(manifest):
+        manifest.save()
+    if atlases:
+        sheets = build_atlases(manifest)
+        if sheets and variants:
+            encode_atlas_variants(manifest, sheets)
+        manifest.save()
+    return manifest
@@ -0,0 +1,119 @@
+"""
+Alpha-channel quality gate for generated images.
+
+Every output requested with a transparent background is checked right after
+it is saved, before the cache records it:
+
+- coverage: the fraction of visible pixels must be above MIN_COVERAGE (not a
+  blank render) and the fraction of fully opaque pixels below MAX_OPAQUE (the
+  model didn't ignore the transparent background);
+- frames: the art window (FRAME_WINDOW, inside the top ~60% the frame prompts
+  reserve for artwork) must be almost entirely clear;
+- card arts that pass are cropped to their visible bounding box (plus
+  TRIM_PADDING) when that saves at least TRIM_MIN_SAVING of the area.
+
+Runner re-renders a rejected output up to its quality retry budget, then
+fails the job (and deletes the output) so --retry-failed picks it up later.
+"""
+
+from .deps import load_numpy, load_pillow
+from .fsutil import atomic_writer
+from .log import log
+
+# Alpha above this counts as visible, at or above OPAQUE_ALPHA as solid.
+ALPHA_THRESHOLD = 8
+OPAQUE_ALPHA = 250
+MIN_COVERAGE = 0.02
+MAX_OPAQUE = 0.97
+# (left, top, right, bottom) as fractions of the image, and the largest
+# fraction of that region allowed to be visible.
+FRAME_WINDOW = (0.25, 0.25, 0.75, 0.5)
+FRAME_WINDOW_MAX_VISIBLE = 0.05
+TRIM_PADDING = 4
+TRIM_MIN_SAVING = 0.05
+# Card backs are full-bleed designs; a solid result is expected.
+UNCHECKED_KINDS = {"card-back"}
+DEFAULT_QUALITY_RETRIES = 2
+
+
+class QualityError(Exception):
+    def __init__(self, req, problems):
+        super().__init__(f"{req.path.name} rejected: {'; '.join(problems)}")
+        self.problems = problems
+
+
+def _is_frame(req):
+    kind = (req.source or {}).get("kind")
+    return kind == "frame" or req.path.name.startswith("card-frame-")
+
+
+def alpha_stats(alpha, window=None):
+    """Coverage figures for a uint8 alpha array; `window` adds the visible fraction there."""
+    visible = alpha > ALPHA_THRESHOLD
+    stats = {
+        "coverage": float(visible.mean()),
+        "opaque": float((alpha >= OPAQUE_ALPHA).mean()),
+    }
+    if window:
+        height, width = alpha.shape
+        left, top, right, bottom = window
+        region = visible[
+            round(top * height):round(bottom * height), round(left * width):round(right * width)
+        ]
+        stats["window"] = float(region.mean()) if region.size else 0.0
+    return stats
+
+
+def visible_bbox(alpha, padding=TRIM_PADDING):
+    """(left, top, right, bottom) of the visible pixels plus padding, or None if blank."""
+    np = load_numpy()
+    visible = alpha > ALPHA_THRESHOLD
+    rows = np.flatnonzero(visible.any(axis=1))
+    cols = np.flatnonzero(visible.any(axis=0))
+    if not rows.size:
+        return None
+    height, width = alpha.shape
+    return (
+        max(0, int(cols[0]) - padding),
+        max(0, int(rows[0]) - padding),
+        min(width, int(cols[-1]) + 1 + padding),
+        min(height, int(rows[-1]) + 1 + padding),
+    )
+
+
+def check_output(req, trim=True):
+    """
+    Validate (and for card art, trim unless `trim` is false) the image just
+    written for `req`. Returns a list of problems; empty means it passed.
+    """
+    kind = (req.source or {}).get("kind")
+    if req.background != "transparent" or kind in UNCHECKED_KINDS:
+        return []
+    np = load_numpy()
+    Image = load_pillow()
+
+    with Image.open(req.path) as im:
+        if im.mode != "RGBA" and "transparency" not in im.info and im.mode not in ("LA", "PA"):
+            return ["no alpha channel"]
+        im = im.convert("RGBA")
+    alpha = np.asarray(im.getchannel("A"))
+    stats = alpha_stats(alpha, FRAME_WINDOW if _is_frame(req) else None)
+
+    problems = []
+    if stats["coverage"] < MIN_COVERAGE:
+        problems.append(f"mostly empty ({stats['coverage']:.1%} visible)")
+    if stats["opaque"] > MAX_OPAQUE:
+        problems.append(f"background not transparent ({stats['opaque']:.1%} opaque)")
+    if stats.get("window", 0.0) > FRAME_WINDOW_MAX_VISIBLE:
+        problems.append(f"art window not clear ({stats['window']:.1%} visible)")
+    if problems or kind != "card-art" or not trim:
+        return problems
+
+    bbox = visible_bbox(alpha)
+    area = alpha.shape[0] * alpha.shape[1]
+    if bbox and (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) <= area * (1 - TRIM_MIN_SAVING):
+        trimmed = im.crop(bbox)
+        with atomic_writer(req.path) as f:
+            trimmed.save(f, format="PNG", optimize=True)
+        log(f"  Trimmed: {req.path.name} {im.width}x{im.height} -> {trimmed.width}x{trimmed.height}")
+    return []
@@ -0,0 +1,233 @@
+"""
+Lossless PNG recompression and image size budgets.
+
+Each PNG is re-encoded as every lossless reduction its pixels allow (grey,
+no alpha, exact palette) at zlib level 9 with each of ZLIB_STRATEGIES. The
+smallest replaces the file only if it is smaller and decodes to the same
+RGBA pixels. Metadata chunks are dropped, colour chunks kept; animated and
+16-bit PNGs are left alone. RecompressIndex remembers, by content hash,
+files that can't shrink further, so reruns skip them.
+"""
+
+import hashlib
+import io
+import json
+import struct
+import zlib
+
+from .dedup import iter_images
+from .deps import load_numpy, load_pillow
+from .fsutil import atomic_write_bytes, atomic_write_text, sha256_file
+from .log import log
+
+INDEX_VERSION = 1
+ZLIB_LEVEL = 9
+ZLIB_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)
+# Modes whose RGBA conversion is exact; anything else (16-bit, I, F) is skipped.
+SUPPORTED_MODES = {"1", "L", "LA", "P", "PA", "RGB", "RGBA"}
+CHUNK_SIZE = 2
+
+
+def _colour_info(im):
+    """(icc_profile, PngInfo with sRGB/gAMA/cHRM) carried over from `im`."""
+    from PIL.PngImagePlugin import PngInfo
+
+    info = PngInfo()
+    if "srgb" in im.info:
+        info.add(b"sRGB", bytes([im.info["srgb"]]))
+    if "gamma" in im.info:
+        info.add(b"gAMA", struct.pack(">I", round(im.info["gamma"] * 100000)))
+    if "chromaticity" in im.info:
+        info.add(b"cHRM", struct.pack(">8I", *(round(v * 100000) for v in im.info["chromaticity"])))
+    return im.info.get("icc_profile"), info
+
+
+def reductions(rgba):
+    """Every lossless re-encoding of the RGBA array `rgba`, as PIL images."""
+    np = load_numpy()
+    Image = load_pillow()
+    opaque = bool((rgba[..., 3] == 255).all())
+    grey = bool(((rgba[..., 0] == rgba[..., 1]) & (rgba[..., 1] == rgba[..., 2])).all())
+    if grey:
+        base = rgba[..., 0] if opaque else rgba[..., [0, 3]]
+    else:
+        base = rgba[..., :3] if opaque else rgba
+    candidates = [Image.fromarray(np.ascontiguousarray(base))]
+
+    packed = rgba.view(np.uint32).reshape(rgba.shape[:2])
+    colours, indices = np.unique(packed, return_inverse=True)
+    if len(colours) <= 256:
+        entries = colours.view(np.uint8).reshape(-1, 4)
+        # Translucent entries first, so tRNS can stop at the last one.
+        order = np.argsort(entries[:, 3] == 255, kind="stable")
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        entries = entries[order]
+        pixels = remap[indices.reshape(packed.shape)].astype(np.uint8)
+        im = Image.frombytes("P", (packed.shape[1], packed.shape[0]), pixels.tobytes())
+        im.putpalette(entries[:, :3].tobytes())
+        translucent = int((entries[:, 3] < 255).sum())
+        if translucent:
+            im.info["transparency"] = entries[:translucent, 3].tobytes()
+        candidates.append(im)
+    return candidates
+
+
+def encode(im, icc_profile, pnginfo, strategy):
+    buf = io.BytesIO()
+    params = {"compress_level": ZLIB_LEVEL, "compress_type": strategy, "pnginfo": pnginfo}
+    if im.mode == "P":
+        # optimize=True lets Pillow pick 1/2/4-bit depth for small palettes.
+        params["optimize"] = True
+        if "transparency" in im.info:
+            params["transparency"] = im.info["transparency"]
+    if icc_profile:
+        params["icc_profile"] = icc_profile
+    im.save(buf, format="PNG", **params)
+    return buf.getvalue()
+
+
+def recompress_png(path, write=True):
+    """
+    Recompress one PNG in place (unless `write` is false). Returns
+    {"before", "after", "sha256", "mode", "written"} where sha256 is the
+    hash of the file as it now is; "skipped" gives a reason for a file left
+    alone without trying.
+    """
+    np = load_numpy()
+    Image = load_pillow()
+    original = path.read_bytes()
+    result = {"before": len(original), "after": len(original), "mode": None, "written": False}
+    with Image.open(io.BytesIO(original)) as im:
+        if getattr(im, "n_frames", 1) > 1:
+            result["skipped"] = "animated"
+        elif im.mode not in SUPPORTED_MODES:
+            result["skipped"] = f"mode {im.mode}"
+        else:
+            icc_profile, pnginfo = _colour_info(im)
+            rgba = np.asarray(im.convert("RGBA"))
+    if "skipped" in result:
+        result["sha256"] = sha256_file(path)
+        return result
+
+    best = None
+    for candidate in reductions(rgba):
+        for strategy in ZLIB_STRATEGIES:
+            data = encode(candidate, icc_profile, pnginfo, strategy)
+            if best is None or len(data) < len(best[1]):
+                best = (candidate.mode, data)
+    mode, data = best
+    if len(data) < len(original):
+        with Image.open(io.BytesIO(data)) as check:
+            if not np.array_equal(np.asarray(check.convert("RGBA")), rgba):
+                raise RuntimeError(f"{mode} re-encoding does not round-trip; left unchanged")
+        if write:
+            atomic_write_bytes(path, data)
+        result.update(after=len(data), mode=mode, written=write)
+    else:
+        data = original
+    result["sha256"] = hashlib.sha256(data).hexdigest()
+    return result
+
+
+def _safe_recompress(args):
+    path, write = args
+    try:
+        return recompress_png(path, write), None
+    except Exception as e:
+        return None, str(e)
+
+
+class RecompressIndex:
+    """
+    {sha256: {"bytes", "original_bytes"}} for PNGs this optimizer can't
+    shrink any further, plus the settings that produced it; an index written
+    with other settings or another Pillow is discarded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        # {path: sha256} of the PNGs seen by the last refresh().
+        self.hashes = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("settings") == self.settings():
+                self.files = data.get("files", {})
+
+    @staticmethod
+    def settings():
+        import PIL
+
+        return {
+            "version": INDEX_VERSION,
+            "level": ZLIB_LEVEL,
+            "strategies": list(ZLIB_STRATEGIES),
+            "pillow": PIL.__version__,
+        }
+
+    def refresh(self, roots, workers=None, write=True):
+        """
+        Recompress every PNG under `roots` (directories or files) whose
+        content hash isn't indexed yet, on a process pool. Returns {path:
+        result} for the files tried (see recompress_png, plus the
+        "source_sha256" they had); hashes no longer on disk are dropped.
+        """
+        hashes = {}
+        for root in roots:
+            paths = [root] if root.is_file() else iter_images(root)
+            for path in paths:
+                if path.suffix.lower() == ".png":
+                    hashes[path] = sha256_file(path)
+        todo = [path for path, digest in hashes.items() if digest not in self.files]
+        results = {}
+        if todo:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outcomes = pool.map(_safe_recompress, [(path, write) for path in todo], chunksize=CHUNK_SIZE)
+                for path, (result, error) in zip(todo, outcomes):
+                    if error:
+                        log(f"  ERROR: recompressing {path.name}: {error}")
+                        continue
+                    result["source_sha256"] = hashes[path]
+                    results[path] = result
+                    hashes[path] = result["sha256"]
+                    self.files[result["sha256"]] = {"bytes": result["after"], "original_bytes": result["before"]}
+        current = set(hashes.values())
+        self.files = {digest: entry for digest, entry in self.files.items() if digest in current}
+        self.hashes = hashes
+        return results
+
+    def saved_bytes(self):
+        """Bytes recompression has saved across the PNGs seen by the last refresh()."""
+        entries = (self.files.get(digest) for digest in self.hashes.values())
+        return sum(entry["original_bytes"] - entry["bytes"] for entry in entries if entry)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"settings": self.settings(), "files": dict(sorted(self.files.items()))}
+        atomic_write_text(self.path, json.dumps(data, indent=1) + "\n")
+
+
+def size_budget(roots, max_file_bytes, max_total_bytes):
+    """
+    Sizes of every image under `roots`: {"files": [(path, bytes)] largest
+    first, "total", "over_file": [(path, bytes)] above max_file_bytes,
+    "over_total": bool}. A budget of None is not checked.
+    """
+    files = []
+    for root in roots:
+        for path in ([root] if root.is_file() else iter_images(root)):
+            files.append((path, path.stat().st_size))
+    files.sort(key=lambda item: item[1], reverse=True)
+    total = sum(size for _, size in files)
+    return {
+        "files": files,
+        "total": total,
+        "over_file": [item for item in files if max_file_bytes is not None and item[1] > max_file_bytes],
+        "over_total": max_total_bytes is not None and total > max_total_bytes,
+    }
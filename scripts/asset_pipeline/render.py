@@ -0,0 +1,46 @@
+"""
+The image API call behind every ImageRequest.
+
+Requests with a reference go through images.edit, the rest through
+images.generate, both with the request's own model, size, background and
+quality. The response is written to request.path under a payload budget
+reservation; API errors propagate so the scheduler can retry.
+"""
+
+from contextlib import nullcontext
+
+from .log import log
+from .metrics import count, phase
+from .payloads import download, estimate_payload_bytes, write_b64
+
+
+def render_request(client, budget, req):
+    with budget.reserve(estimate_payload_bytes(req.size)) if budget else nullcontext():
+        params = dict(
+            model=req.model,
+            prompt=req.prompt,
+            n=1,
+            size=req.size,
+            quality=req.quality,
+            background=req.background,
+        )
+        if req.reference:
+            with open(req.reference, "rb") as img_file, phase("api"):
+                result = client.images.edit(image=img_file, **params)
+        else:
+            with phase("api"):
+                result = client.images.generate(**params)
+        count("renders")
+        data = result.data[0]
+        # Decode/stream in chunks straight to disk
+        with phase("write"):
+            if getattr(data, "b64_json", None):
+                nbytes = write_b64(data.b64_json, req.path)
+            elif getattr(data, "url", None):
+                nbytes = download(data.url, req.path)
+            else:
+                raise RuntimeError("response contained neither b64_json nor url")
+        count("response_bytes", nbytes)
+        del result, data
+    log(f"  Saved: {req.path} ({nbytes // 1024}KB)")
+    return True
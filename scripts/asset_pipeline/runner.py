@@ -0,0 +1,94 @@
+"""Glue between ImageRequests, the generation cache, the journal and the scheduler."""
+
+from .cache import cached_jobs
+from .journal import DONE
+from .log import log
+from .metrics import count, phase
+from .quality import DEFAULT_QUALITY_RETRIES, QualityError
+from .scheduler import Job
+
+
+class Runner:
+    """
+    Renders ImageRequests through `render(request)`, which must write
+    request.path (atomically) and raise on failure.
+
+    `validate(request)`, if given, runs on each fresh output before it is
+    cached and returns a list of problems. A rejected output is rendered
+    again, up to `quality_retries` times per request across scheduler
+    retries; after that the output is deleted and the job fails with a
+    QualityError.
+
+    `metrics` (a RunMetrics), if given, gets a record per job and per cache
+    hit; validation is timed as the "validate" phase.
+
+    `touched` accumulates the ImageRequest of every output written across
+    run() calls, for post-processing stages that only need to see new files;
+    `unchanged` those whose output was already current (see finish_run).
+    """
+
+    def __init__(
+        self, render, scheduler, cache, journal=None, validate=None,
+        quality_retries=DEFAULT_QUALITY_RETRIES, metrics=None,
+    ):
+        self.render = render
+        self.scheduler = scheduler
+        self.cache = cache
+        self.journal = journal
+        self.validate = validate
+        self.quality_retries = quality_retries
+        self.metrics = metrics
+        self.touched = []
+        self.unchanged = []
+
+    def _job(self, req):
+        rejects = 0  # per job, so a later run() (--watch) starts afresh
+
+        def run():
+            nonlocal rejects
+            while True:
+                log(f"  Generating: {req.label} -> {req.path.name}")
+                value = self.render(req)
+                with phase("validate"):
+                    problems = self.validate(req) if self.validate else []
+                if not problems:
+                    return value
+                count("rejects")
+                rejects += 1
+                if rejects > self.quality_retries:
+                    req.path.unlink(missing_ok=True)
+                    raise QualityError(req, problems)
+                log(
+                    f"  Rejected [{req.label}] ({rejects}/{self.quality_retries}): "
+                    f"{'; '.join(problems)}; regenerating"
+                )
+
+        return Job(req.name, req.label, run)
+
+    def run(self, requests):
+        """Render whatever the cache can't satisfy. Returns (ok_count, failed_labels)."""
+        jobs, skipped, touched = cached_jobs(self.cache, requests, self._job)
+        listeners = []
+        if self.journal is not None:
+            for req in skipped:
+                if self.journal.state(req) not in (None, DONE):
+                    self.journal.record(req, DONE)
+            self.journal.queue(req for job in jobs for req in job.requests)
+            listeners.append(self.journal.listener)
+        if self.metrics is not None:
+            self.metrics.cached(skipped)
+            self.metrics.queue(jobs)
+            listeners.append(self.metrics.listener)
+        for listener in listeners:
+            self.scheduler.add_listener(listener)
+        try:
+            results = self.scheduler.run(jobs)
+        finally:
+            for listener in listeners:
+                self.scheduler.remove_listener(listener)
+        self.touched.extend(touched)
+        self.unchanged.extend(req for req in skipped if req not in touched)
+        self.touched.extend(req for r in results if r.ok for req in r.job.requests)
+        ok = len(skipped) + sum(r.value for r in results if r.ok)
+        failed = [r.job.label for r in results if not r.ok]
+        return ok, failed
@@ -0,0 +1,185 @@
+"""
+Bounded, rate-limit-aware worker pool for image generation jobs.
+
+Jobs run on a thread pool of at most `concurrency` workers. The number of
+requests allowed in flight adapts AIMD-style: a 429/5xx halves it and pauses
+new requests for the backoff window, and a full window of successes raises it
+by one again (up to `concurrency`).
+
+Listeners registered with add_listener() are called as
+`listener(event, job, attempt, error)` for every "start", "retry", "done" and
+"failed" transition, from the worker thread that ran the attempt.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .log import log
+
+RETRYABLE_STATUS = {408, 409, 429}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+
+class Job:
+    """
+    One unit of work: `run()` raises on failure, returns a value on success.
+    `requests` lists the ImageRequests the job produces, if any.
+    """
+
+    def __init__(self, key, label, run, requests=()):
+        self.key = key
+        self.label = label
+        self.run = run
+        self.requests = list(requests)
+
+
+class JobResult:
+    def __init__(self, job, ok, value=None, error=None, attempts=0):
+        self.job = job
+        self.ok = ok
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+
+
+def status_code(exc):
+    """HTTP status carried by an API error, if any."""
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc):
+    """True for rate limits, server errors and dropped connections."""
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS or code >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def retry_after(exc):
+    """Seconds requested by a Retry-After header, if the server sent one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveScheduler:
+    def __init__(self, concurrency=1, max_attempts=5, base_delay=2.0, max_delay=60.0):
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._limit = self.concurrency
+        self._active = 0
+        self._streak = 0
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+        self._executor = None
+        self._listeners = []
+
+    @property
+    def limit(self):
+        return self._limit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # On Ctrl-C (or any error) drop queued jobs; in-flight ones still finish.
+        self.close(cancel_pending=exc_type is not None)
+
+    def close(self, cancel_pending=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+            self._executor = None
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event, job, attempt, error=None):
+        for listener in self._listeners:
+            listener(event, job, attempt, error)
+
+    def run(self, jobs):
+        """Run jobs to completion and return their JobResults in input order."""
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="asset-job"
+            )
+        futures = [self._executor.submit(self._run_job, job) for job in jobs]
+        return [f.result() for f in futures]
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self._active >= self._limit:
+                    self._cond.wait()
+                else:
+                    self._active += 1
+                    return
+
+    def _release(self, outcome, delay=0.0):
+        with self._cond:
+            self._active -= 1
+            if outcome == "ok":
+                self._streak += 1
+                if self._streak >= self._limit and self._limit < self.concurrency:
+                    self._limit += 1
+                    self._streak = 0
+            elif outcome == "throttled":
+                self._streak = 0
+                self._limit = max(1, self._limit // 2)
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            self._cond.notify_all()
+
+    def _backoff(self, exc, attempt):
+        delay = retry_after(exc)
+        if delay is None:
+            delay = self.base_delay * (2 ** (attempt - 1))
+        return min(self.max_delay, delay) * random.uniform(1.0, 1.25)
+
+    def _run_job(self, job):
+        attempt = 0
+        while True:
+            attempt += 1
+            self._acquire()
+            self._emit("start", job, attempt)
+            try:
+                value = job.run()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if not retryable or attempt >= self.max_attempts:
+                    self._release("failed")
+                    log(f"  ERROR [{job.label}] after {attempt} attempt(s): {e}")
+                    self._emit("failed", job, attempt, e)
+                    return JobResult(job, False, error=e, attempts=attempt)
+                delay = self._backoff(e, attempt)
+                self._release("throttled", delay)
+                log(
+                    f"  Retry [{job.label}] in {delay:.1f}s "
+                    f"(attempt {attempt}/{self.max_attempts}, concurrency now {self._limit}): {e}"
+                )
+                self._emit("retry", job, attempt, e)
+                continue
+            self._release("ok")
+            self._emit("done", job, attempt)
+            return JobResult(job, True, value=value, attempts=attempt)
@@ -0,0 +1,123 @@
+"""
+Deterministic sharding of a generation run across machines.
+
+`--shard i/N` keeps the requests whose name's sha256 falls in shard i
+(1-based) of N, so adding or removing cards never moves the others. Each
+shard writes its own journal, a partial manifest and a status file;
+merge_shards() folds the partial manifests into manifest.json once the
+shard trees are collected into one game-assets/ directory.
+"""
+
+import hashlib
+import json
+import time
+
+from .fsutil import atomic_write_text
+from .manifest import Manifest
+
+SHARDS_DIR_NAME = "shards"
+
+
+def parse_shard(spec):
+    """'2/4' -> (2, 4)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise SystemExit(f"ERROR: --shard expects i/N (e.g. 1/4), got {spec!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise SystemExit(f"ERROR: --shard {spec}: need 1 <= i <= N")
+    return index, count
+
+
+def shard_of(name, count):
+    """The 1-based shard a request name belongs to out of `count`."""
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+    return int(digest[:16], 16) % count + 1
+
+
+def in_shard(requests, shard):
+    index, count = shard
+    return [req for req in requests if shard_of(req.name, count) == index]
+
+
+def shard_tag(shard):
+    return f"{shard[0]}-of-{shard[1]}"
+
+
+def manifest_path(shards_dir, shard):
+    return shards_dir / f"manifest-{shard_tag(shard)}.json"
+
+
+def write_status(shards_dir, shard, requests, failed_labels, assets_dir):
+    """
+    Record what this shard run was responsible for and what failed, on top
+    of any earlier status for the same shard (so a --resume run clears the
+    failures it fixed).
+    """
+    path = shards_dir / f"status-{shard_tag(shard)}.json"
+    status = json.loads(path.read_text()) if path.exists() else {"expected": {}, "failed": []}
+    ran = {req.name for req in requests}
+    failed = set(failed_labels)
+    status["shard"] = list(shard)
+    status["finished"] = time.time()
+    status["expected"].update(
+        {req.name: str(req.path.relative_to(assets_dir)) for req in requests}
+    )
+    status["failed"] = sorted(
+        {name for name in status["failed"] if name not in ran}
+        | {req.name for req in requests if req.label in failed}
+    )
+    shards_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(status, indent=2) + "\n")
+
+
+def load_statuses(shards_dir):
+    """{(index, count): status} for every shard status file present."""
+    statuses = {}
+    for path in sorted(shards_dir.glob("status-*.json")):
+        status = json.loads(path.read_text())
+        statuses[tuple(status["shard"])] = status
+    return statuses
+
+
+def merge_shards(manifest, shards_dir):
+    """
+    Overlay every shard's partial manifest onto `manifest` (shard entries
+    win) and check the result. Returns a report dict: count, missing_shards,
+    failed {name: shard}, missing {name: path} (expected outputs with no
+    file or entry), merged (entries taken from partials).
+    """
+    statuses = load_statuses(shards_dir)
+    counts = {count for _, count in statuses}
+    if len(counts) > 1:
+        raise SystemExit(
+            f"ERROR: {shards_dir} holds shards from runs split {sorted(counts)} ways; "
+            "clear out the stale ones before merging"
+        )
+    count = counts.pop() if counts else 0
+
+    merged = 0
+    for shard in sorted(statuses):
+        path = manifest_path(shards_dir, shard)
+        if path.exists():
+            partial = Manifest(path, manifest.assets_dir)
+            manifest.assets.update(partial.assets)
+            merged += len(partial.assets)
+
+    failed = {}
+    missing = {}
+    for shard, status in sorted(statuses.items()):
+        for name in status["failed"]:
+            failed[name] = shard_tag(shard)
+        for name, rel in status["expected"].items():
+            if name in failed:
+                continue
+            if rel not in manifest.assets or not (manifest.assets_dir / rel).exists():
+                missing[name] = rel
+    return {
+        "count": count,
+        "missing_shards": [i for i in range(1, count + 1) if (i, count) not in statuses],
+        "failed": failed,
+        "missing": missing,
+        "merged": merged,
+    }
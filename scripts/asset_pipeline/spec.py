@@ -0,0 +1,165 @@
+"""
+Declarative asset spec (scripts/assets.toml).
+
+The spec lists every generated asset once (output, group, render
+parameters, prompt parts, references, post steps) plus the [cards] settings
+for card art. Prompt parts are concatenated with "{NAME}" replaced by the
+[fragments] entry. References are candidate lists, first existing file
+wins; a reference another asset writes becomes a build dependency (see
+build_graph.py). Spec errors exit with an ERROR message.
+"""
+
+import re
+from pathlib import Path
+
+from .deps import load_toml
+from .image_request import ImageRequest
+
+SPEC_PATH = Path(__file__).parent.parent / "assets.toml"
+FRAGMENT = re.compile(r"\{([A-Z_]+)\}")
+RENDER_FIELDS = ("model", "size", "background", "quality")
+POST_STEPS = {"gate", "variants", "renders"}
+
+
+def _text(value):
+    return "".join(value) if isinstance(value, list) else value
+
+
+class AssetSpec:
+    def __init__(self, data, assets_dir, roots, path=SPEC_PATH):
+        self.path = path
+        self.assets_dir = assets_dir
+        self.roots = roots
+        self.defaults = data.get("defaults", {})
+        self.fragments = {name: _text(value) for name, value in data.get("fragments", {}).items()}
+        self.cards = {**self.defaults, **data.get("cards", {})}
+        self.prompt_columns = tuple(self.cards.get("prompt_columns", ()))
+        self.prompt_suffix = self.cards.get("prompt_suffix", "")
+        self.assets = []
+        outputs, names = {}, {}
+        for entry in data.get("asset", []):
+            asset = {**self.defaults, **entry}
+            for field in ("path", "group", "prompt"):
+                if field not in asset:
+                    self._fail(f"asset {entry.get('path', '?')} has no {field!r}")
+            rel = asset["path"]
+            asset.setdefault("name", Path(rel).name)
+            asset["prompt"] = self._expand(_text(asset["prompt"]), rel)
+            refs = asset.get("reference") or []
+            asset["reference"] = [refs] if isinstance(refs, str) else refs
+            asset.setdefault("post", [])
+            unknown = set(asset["post"]) - POST_STEPS
+            if unknown:
+                self._fail(f"{rel}: unknown post step(s) {', '.join(sorted(unknown))}")
+            for seen, key, what in ((outputs, rel, "output"), (names, asset["name"], "name")):
+                if key in seen:
+                    self._fail(f"{rel} and {seen[key]} both use the {what} {key!r}")
+                seen[key] = rel
+            self.assets.append(asset)
+        self.post = {asset["name"]: set(asset["post"]) for asset in self.assets}
+
+    @classmethod
+    def load(cls, assets_dir, roots, path=SPEC_PATH):
+        tomllib = load_toml()
+        try:
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            raise SystemExit(f"ERROR: could not read asset spec {path}: {e}")
+        return cls(data, assets_dir, roots, path)
+
+    def _fail(self, message):
+        raise SystemExit(f"ERROR: {self.path.name}: {message}")
+
+    def _expand(self, text, where):
+        def fragment(match):
+            name = match.group(1)
+            if name not in self.fragments:
+                self._fail(f"{where}: unknown fragment {{{name}}}")
+            return self.fragments[name]
+
+        return FRAGMENT.sub(fragment, text)
+
+    def groups(self):
+        return list(dict.fromkeys(asset["group"] for asset in self.assets))
+
+    def _selected(self, group):
+        return [asset for asset in self.assets if group is None or asset["group"] == group]
+
+    def _candidate(self, ref):
+        root, sep, rel = ref.partition(":")
+        if not sep:
+            return self.assets_dir / ref
+        if root not in self.roots:
+            self._fail(f"unknown reference root {root!r} in {ref!r}")
+        return self.roots[root] / rel
+
+    def inputs(self, group=None):
+        """Every reference candidate outside the spec's own outputs, for watching."""
+        outputs = self.outputs()
+        paths = {
+            self._candidate(ref)
+            for asset in self._selected(group)
+            for ref in asset["reference"]
+        }
+        return sorted(paths - outputs)
+
+    def outputs(self):
+        return {self.assets_dir / asset["path"] for asset in self.assets}
+
+    def _resolve(self, asset):
+        if not asset["reference"]:
+            return None
+        outputs = self.outputs()
+        candidates = [self._candidate(ref) for ref in asset["reference"]]
+        for path in candidates:
+            if path in outputs or path.exists():
+                return path
+        self._fail(f"{asset['path']}: reference image not found: {', '.join(map(str, candidates))}")
+
+    def requests(self, group=None):
+        """ImageRequests for the assets in `group` (all groups when None), in spec order."""
+        return [
+            ImageRequest(
+                asset["name"],
+                self.assets_dir / asset["path"],
+                asset["prompt"],
+                reference=self._resolve(asset),
+                source={"kind": asset.get("kind", asset["group"])},
+                **{field: asset[field] for field in RENDER_FIELDS if field in asset},
+            )
+            for asset in self._selected(group)
+        ]
+
+    def card_request(self, name, card):
+        """ImageRequest for one card record from the compiled card index."""
+        return ImageRequest(
+            name,
+            self.assets_dir / self.cards["dir"] / card["filename"],
+            card["prompt"],
+            label=f"[{card['deck']}] {name} ({card['type']})",
+            source={"kind": "card-art", "card": name, "deck": card["deck"], "type": card["type"]},
+            **{field: self.cards[field] for field in RENDER_FIELDS if field in self.cards},
+        )
+
+    def steps(self, req):
+        """
+        Post-processing steps for a request, by name so drafts and journal
+        replays of an asset get the same ones.
+        """
+        if (req.source or {}).get("kind") == "card-art":
+            return set(self.cards.get("post", ()))
+        return self.post.get(req.name, set(self.defaults.get("post", ())))
+
+    def gate(self, check):
+        """Wrap a quality check so it only runs on requests whose post includes "gate"."""
+        def validate(req):
+            return check(req) if "gate" in self.steps(req) else []
+
+        return validate
+
+    def wants_variants(self, req):
+        return "variants" in self.steps(req)
+
+    def renders_cards(self):
+        return "renders" in self.cards.get("post", ())
@@ -0,0 +1,147 @@
+"""
+Responsive WebP/AVIF variants of generated PNGs.
+
+For game-assets/cards/foo.png this writes
+game-assets/variants/cards/foo-256w.webp, foo-512w.webp, foo-<full>w.webp and
+the same widths as .avif. The 256px width is sized for hand and collection
+grids, the full width for inspect views. Alpha is kept for RGBA sources.
+Sources are encoded on a process pool, and variants newer than their source
+are left alone, so the stage is cheap to re-run over the whole tree.
+"""
+
+import os
+
+from .deps import load_pillow
+from .fsutil import temp_path
+from .log import log
+
+VARIANTS_DIR_NAME = "variants"
+# None means the source's own width.
+VARIANT_WIDTHS = (256, 512, None)
+FORMATS = ("webp", "avif")
+ENCODE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 82, "method": 6},
+    "avif": {"format": "AVIF", "quality": 60, "speed": 6},
+}
+
+
+def available_formats(formats=FORMATS):
+    """The subset of `formats` this Pillow build can encode."""
+    Image = load_pillow()
+    Image.init()
+    return tuple(f for f in formats if ENCODE_OPTIONS[f]["format"] in Image.SAVE)
+
+
+def variant_dir(src, assets_dir):
+    return assets_dir / VARIANTS_DIR_NAME / src.parent.relative_to(assets_dir)
+
+
+def _target_widths(width, widths):
+    targets = {width if w is None else w for w in widths}
+    return sorted(w for w in targets if w <= width)
+
+
+def encode_variants(src, out_dir, widths=VARIANT_WIDTHS, formats=FORMATS, force=False):
+    """
+    Write every width x format variant of `src` into `out_dir`.
+    Returns one dict per variant (written or already current).
+    """
+    Image = load_pillow()
+    src_mtime = src.stat().st_mtime_ns
+    records = []
+    with Image.open(src) as im:
+        has_alpha = im.mode in ("RGBA", "LA", "PA") or "transparency" in im.info
+        pending = []
+        for width in _target_widths(im.width, widths):
+            height = round(im.height * width / im.width)
+            for fmt in formats:
+                out = out_dir / f"{src.stem}-{width}w.{fmt}"
+                records.append(
+                    {"path": out, "format": fmt, "width": width, "height": height}
+                )
+                if force or not out.exists() or out.stat().st_mtime_ns < src_mtime:
+                    pending.append((out, fmt, width, height))
+        if pending:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            base = im.convert("RGBA" if has_alpha else "RGB")
+            resized = {}
+            for out, fmt, width, height in pending:
+                if width not in resized:
+                    resized[width] = (
+                        base if width == base.width
+                        else base.resize((width, height), Image.LANCZOS)
+                    )
+                tmp = temp_path(out)
+                try:
+                    resized[width].save(tmp, **ENCODE_OPTIONS[fmt])
+                    os.replace(tmp, out)
+                finally:
+                    tmp.unlink(missing_ok=True)
+    for record in records:
+        record["bytes"] = record["path"].stat().st_size
+        record["alpha"] = has_alpha
+    return records
+
+
+def existing_variants(src, assets_dir, size, widths=VARIANT_WIDTHS, formats=FORMATS):
+    """
+    Records for the variants of `src` already on disk and not older than it,
+    in the shape Manifest.update() takes. `size` is src's (width, height).
+    """
+    width, height = size
+    out_dir = variant_dir(src, assets_dir)
+    src_mtime = src.stat().st_mtime_ns
+    records = []
+    for target in _target_widths(width, widths):
+        for fmt in formats:
+            out = out_dir / f"{src.stem}-{target}w.{fmt}"
+            if out.exists() and out.stat().st_mtime_ns >= src_mtime:
+                records.append({
+                    "path": out, "format": fmt, "width": target,
+                    "height": round(height * target / width), "bytes": out.stat().st_size,
+                })
+    return records
+
+
+def build_variants(sources, assets_dir, widths=VARIANT_WIDTHS, workers=None, force=False):
+    """
+    Encode variants for every path in `sources` across a process pool.
+    Returns {source_path: [variant records]}; failures are logged and skipped.
+    """
+    sources = [s for s in dict.fromkeys(sources) if s.exists()]
+    if not sources:
+        return {}
+    formats = available_formats()
+    missing = set(FORMATS) - set(formats)
+    if missing:
+        log(f"  WARNING: this Pillow build can't encode {', '.join(sorted(missing))}; skipping")
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                encode_variants, src, variant_dir(src, assets_dir), widths, formats, force
+            ): src
+            for src in sources
+        }
+        for future, src in futures.items():
+            try:
+                results[src] = future.result()
+            except Exception as e:
+                log(f"  ERROR: variants for {src.name}: {e}")
+                continue
+            total = sum(r["bytes"] for r in results[src])
+            log(f"  Variants: {src.name} -> {len(results[src])} files ({total // 1024}KB)")
+    return results
+
+
+def iter_sources(assets_dir):
+    """Every generated PNG under assets_dir, excluding the cache, variant and atlas trees."""
+    skip = {".cache", VARIANTS_DIR_NAME, "atlases"}
+    for path in sorted(assets_dir.rglob("*.png")):
+        rel = path.relative_to(assets_dir)
+        if rel.parts[0] in skip or path.name.startswith("."):
+            continue
+        yield path
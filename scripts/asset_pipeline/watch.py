@@ -0,0 +1,111 @@
+"""
+Polling support for --watch runs.
+
+FileWatcher reports files whose (mtime, size) moved and then held still for
+one poll, i.e. once the editor has finished saving. card_changes() diffs two
+card indexes; retire_outputs() removes what a renamed or deleted card left
+behind.
+"""
+
+import time
+
+from .card_render import RENDERS_DIR_NAME
+from .log import log
+
+DEFAULT_POLL_SECONDS = 2.0
+# Card index fields whose change means the card's art or render must be redone.
+WATCHED_FIELDS = ("prompt", "type", "deck")
+
+
+def _stat(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._seen = {path: _stat(path) for path in self.paths}
+        self._moving = {}
+
+    def poll(self):
+        """Paths whose change has settled since the last report."""
+        settled = []
+        for path in self.paths:
+            current = _stat(path)
+            if current == self._seen[path]:
+                self._moving.pop(path, None)
+                continue
+            if self._moving.get(path) == current:
+                del self._moving[path]
+                self._seen[path] = current
+                settled.append(path)
+            else:
+                self._moving[path] = current
+        return settled
+
+    def wait(self, interval=DEFAULT_POLL_SECONDS):
+        """Block until at least one watched path changes; returns the changed paths."""
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            time.sleep(interval)
+
+
+def _fingerprint(card):
+    return tuple(card.get(field) for field in WATCHED_FIELDS)
+
+
+def card_changes(old, new):
+    """
+    Diff two {name: card record} indexes. Returns (changed, removed, renamed):
+    names in `new` that are new or differ on WATCHED_FIELDS, names gone from
+    `new`, and {old name: new name} for removed cards whose fields reappear
+    unchanged under a new name (renamed cards are also in changed/removed).
+    """
+    changed = [
+        name for name, card in new.items()
+        if name not in old or _fingerprint(old[name]) != _fingerprint(card)
+    ]
+    removed = [name for name in old if name not in new]
+    added = {}
+    for name in changed:
+        if name not in old:
+            added.setdefault(_fingerprint(new[name]), []).append(name)
+    renamed = {}
+    for name in removed:
+        candidates = added.get(_fingerprint(old[name]))
+        if candidates:
+            renamed[name] = candidates.pop(0)
+    return changed, removed, renamed
+
+
+def card_output_paths(card, assets_dir):
+    """The files generation and rendering produce for one card."""
+    return [
+        assets_dir / "cards" / card["filename"],
+        assets_dir / RENDERS_DIR_NAME / card["filename"],
+    ]
+
+
+def retire_outputs(paths, manifest, cache):
+    """
+    Delete `paths` with their recorded variants, forget their cache mapping
+    and drop their manifest entries. Returns the manifest paths removed.
+    """
+    retired = []
+    for path in paths:
+        rel = str(path.relative_to(manifest.assets_dir))
+        entry = manifest.assets.pop(rel, None)
+        for variant in (entry or {}).get("variants", []):
+            (manifest.assets_dir / variant["path"]).unlink(missing_ok=True)
+        cache.forget(path)
+        if path.exists() or entry is not None:
+            path.unlink(missing_ok=True)
+            retired.append(rel)
+            log(f"  Retired: {rel}")
+    return retired
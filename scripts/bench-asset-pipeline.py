@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of generate-assets.py against the mock image backend.
+
+Each mode runs as a subprocess in a fresh temporary assets directory (cold
+cache), and "all" is then re-run in the same directory to measure the warm,
+fully cached path. Per-job latency comes from the run's job journal (first
+attempt start to done/failed, so it includes retries and backoff).
+
+First, each entry-point script is imported in a fresh interpreter and must
+stay within --import-budget-ms without loading openai, pandas, numpy or
+Pillow (exit 1 otherwise); --imports-only runs just that check.
+
+Usage:
+  python3 scripts/bench-asset-pipeline.py
+  python3 scripts/bench-asset-pipeline.py --modes all --concurrency 8 --latency 0.5 --rate-limit 0.1
+  python3 scripts/bench-asset-pipeline.py --json bench.json   # Also write results as JSON
+  python3 scripts/bench-asset-pipeline.py --imports-only --import-budget-ms 100
+
+Needs pandas once to compile the card index (see generate-assets.py).
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from asset_pipeline.card_index import load_card_index
+from asset_pipeline.spec import AssetSpec
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent
+XLSX_PATH = (
+    PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable" / "lunchtable_MASTER_card_database.xlsx"
+)
+IMPORT_CHECK_SCRIPTS = ("ltcg-assets.py", "generate-assets.py", "generate-card-frame.py", "build-assets.py")
+# Imported only once a subcommand needs them, never at startup.
+DEFERRED_MODULES = ("openai", "pandas", "numpy", "PIL")
+DEFAULT_IMPORT_BUDGET_MS = 150.0
+IMPORT_RUNS = 3
+
+# Run in a fresh interpreter: argv is scripts dir, script path, deferred modules.
+IMPORT_PROBE = """
+import importlib.util, json, sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("import_probe", sys.argv[2])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "loaded": [m for m in sys.argv[3:] if m in sys.modules]}))
+"""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def tree_bytes(root):
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def job_latencies(journal_path, since):
+    """Seconds from first start to final state, per job journaled after `since` (epoch s)."""
+    if not journal_path.exists():
+        return [], {}
+    records = [json.loads(line) for line in journal_path.read_text().splitlines() if line.strip()]
+    started, finished, states = {}, {}, {}
+    for r in records:
+        if r["ts"] < since:
+            continue
+        if r["state"] == "in-flight":
+            started.setdefault(r["key"], r["ts"])
+        elif r["state"] in ("done", "failed"):
+            finished[r["key"]] = r["ts"]
+            states[r["key"]] = r["state"]
+    latencies = [finished[k] - started[k] for k in finished if k in started]
+    counts = {}
+    for state in states.values():
+        counts[state] = counts.get(state, 0) + 1
+    return latencies, counts
+
+
+def import_cost(script, runs=IMPORT_RUNS):
+    """Best-of-`runs` ms to import `script` without running it, and the deferred modules it loaded."""
+    best, loaded = None, set()
+    for _ in range(runs):
+        cmd = [sys.executable, "-c", IMPORT_PROBE, str(SCRIPTS_DIR), str(SCRIPTS_DIR / script), *DEFERRED_MODULES]
+        result = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout)
+        best = result["ms"] if best is None else min(best, result["ms"])
+        loaded.update(result["loaded"])
+    return {"import_ms": round(best, 1), "deferred_loaded": sorted(loaded)}
+
+
+def check_imports(budget_ms):
+    """Measure every entry-point script's import cost. Returns ({script: cost}, [violations])."""
+    costs, violations = {}, []
+    print(f"{'script':<24} {'import ms':>10}  (budget {budget_ms:g} ms)")
+    for script in IMPORT_CHECK_SCRIPTS:
+        cost = costs[script] = import_cost(script)
+        print(f"{script:<24} {cost['import_ms']:>10.1f}  {' '.join(cost['deferred_loaded'])}")
+        if cost["import_ms"] > budget_ms:
+            violations.append(f"{script} imports in {cost['import_ms']} ms, over the {budget_ms:g} ms budget")
+        if cost["deferred_loaded"]:
+            violations.append(f"{script} imports {', '.join(cost['deferred_loaded'])} at startup")
+    return costs, violations
+
+
+def run_mode(mode, assets_dir, args):
+    cmd = [
+        sys.executable,
+        str(SCRIPTS_DIR / "generate-assets.py"),
+        "--mode", mode,
+        "--concurrency", str(args.concurrency),
+        "--backend",
+        f"mock:latency={args.latency},rate_limit={args.rate_limit},error_rate={args.error_rate}",
+    ]
+    if args.no_variants:
+        cmd.append("--no-variants")
+    env = dict(os.environ, LTCG_ASSETS_DIR=str(assets_dir))
+    before = tree_bytes(assets_dir)
+    log_path = assets_dir.parent / f"{assets_dir.name}-{mode}.log"
+    started_at = time.time()
+    start = time.perf_counter()
+    with open(log_path, "w") as log_file:
+        proc = subprocess.Popen(cmd, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own rusage (including the encoder pool it reaps).
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        print(f"  {mode}: exited {proc.returncode}, see {log_path}")
+
+    latencies, states = job_latencies(assets_dir / ".cache" / "journal-assets.jsonl", started_at)
+    jobs = sum(states.values())
+    return {
+        "jobs": jobs,
+        "states": states,
+        "wall_s": round(wall, 3),
+        "jobs_per_s": round(jobs / wall, 2) if wall else 0.0,
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p95_s": round(percentile(latencies, 95), 3),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "bytes_written": tree_bytes(assets_dir) - before,
+        "exit_code": proc.returncode,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the asset pipeline against the mock backend")
+    parser.add_argument("--modes", default="board,sample,all", help="Comma-separated modes to run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock mean request latency (s)")
+    parser.add_argument("--rate-limit", type=float, default=0.05, help="Mock fraction of 429 responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock fraction of 500 responses")
+    parser.add_argument("--no-variants", action="store_true", help="Skip WebP/AVIF encoding")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary assets directories")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument(
+        "--import-budget-ms",
+        type=float,
+        default=DEFAULT_IMPORT_BUDGET_MS,
+        help="Max import time per entry-point script",
+    )
+    parser.add_argument(
+        "--imports-only", action="store_true", help="Only run the import-time and deferred-import check"
+    )
+    args = parser.parse_args()
+
+    imports, violations = check_imports(args.import_budget_ms)
+    for violation in violations:
+        print(f"ERROR: {violation}")
+    if args.imports_only:
+        sys.exit(1 if violations else 0)
+    print()
+
+    work = Path(tempfile.mkdtemp(prefix="ltcg-asset-bench-"))
+    index_path = work / "card-index.json"
+    spec = AssetSpec.load(work, {})
+    load_card_index(XLSX_PATH, index_path, spec.prompt_columns, spec.prompt_suffix)
+
+    results = {}
+    try:
+        for mode in args.modes.split(","):
+            assets_dir = work / mode
+            (assets_dir / ".cache").mkdir(parents=True)
+            shutil.copy(index_path, assets_dir / ".cache" / "card-index.json")
+            results[mode] = run_mode(mode, assets_dir, args)
+            if mode == "all":
+                results["all (warm)"] = run_mode(mode, assets_dir, args)
+    finally:
+        if args.keep:
+            print(f"Kept benchmark directories in {work}")
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+    print(
+        f"\nconcurrency={args.concurrency} latency={args.latency}s "
+        f"rate_limit={args.rate_limit} error_rate={args.error_rate}\n"
+    )
+    print(f"{'mode':<12} {'jobs':>5} {'wall s':>8} {'jobs/s':>8} {'p50 s':>7} {'p95 s':>7} {'RSS MB':>7} {'written':>10}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<12} {r['jobs']:>5} {r['wall_s']:>8.2f} {r['jobs_per_s']:>8.2f} "
+            f"{r['p50_s']:>7.3f} {r['p95_s']:>7.3f} {r['peak_rss_mb']:>7.1f} "
+            f"{r['bytes_written'] // 1024:>8}KB"
+        )
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps({"args": vars(args), "imports": imports, "results": results}, indent=2)
+        )
+        print(f"\nResults written to {args.json}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Build the assets described by the asset spec (scripts/assets.toml) as one
+dependency graph.
+
+Every [[asset]] entry, and with the "cards" group every card art, is a
+target. Targets render layer by layer after the targets whose output they
+reference (see asset_pipeline/build_graph.py); like make, only the ones the
+generation cache can't satisfy are rebuilt, and the spec's post steps run
+on what changed.
+
+Usage:
+  python3 scripts/build-assets.py                          # Every group in the spec
+  python3 scripts/build-assets.py --plan                   # What would rebuild, layer by layer
+  python3 scripts/build-assets.py --group frames board     # Only these groups
+  python3 scripts/build-assets.py --group cards --concurrency 6
+  python3 scripts/build-assets.py 'frames/*' playmat.png   # Matching targets plus their dependencies
+  python3 scripts/build-assets.py --backend mock           # Offline stand-in, no API key needed
+
+Targets match on name or path under game-assets/. generate-assets.py and
+generate-card-frame.py build the "board"/cards and "frames" parts of the
+same spec with their own modes (drafts, shards, watch).
+
+Requires OPENAI_API_KEY (except for --plan and --backend mock), and pandas
+when the card index needs recompiling. LTCG_ASSETS_DIR overrides the output
+directory.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from asset_pipeline.backends import make_client
+from asset_pipeline.build_graph import build, build_layers, plan_layers, select
+from asset_pipeline.cache import GenerationCache
+from asset_pipeline.card_index import load_card_index
+from asset_pipeline.journal import Journal
+from asset_pipeline.metrics import RunMetrics
+from asset_pipeline.payloads import DEFAULT_BUDGET_BYTES, PayloadBudget
+from asset_pipeline.postprocess import finish_run
+from asset_pipeline.quality import DEFAULT_QUALITY_RETRIES, check_output
+from asset_pipeline.render import render_request
+from asset_pipeline.runner import Runner
+from asset_pipeline.scheduler import AdaptiveScheduler
+from asset_pipeline.spec import SPEC_PATH, AssetSpec
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+CACHE_DIR = ASSETS_DIR / ".cache"
+JOURNAL_PATH = CACHE_DIR / "journal-build.jsonl"
+METRICS_DIR = CACHE_DIR / "metrics"
+CARD_INDEX_PATH = CACHE_DIR / "card-index.json"
+XLSX_PATH = LUNCHTABLE_DIR / "lunchtable_MASTER_card_database.xlsx"
+CARDS_GROUP = "cards"
+
+
+def target_requests(spec, groups):
+    """(ImageRequests for the chosen groups in spec order, card index or None)."""
+    requests = []
+    for group in spec.groups():
+        if group in groups:
+            requests.extend(spec.requests(group))
+    cards = None
+    if CARDS_GROUP in groups:
+        cards = load_card_index(XLSX_PATH, CARD_INDEX_PATH, spec.prompt_columns, spec.prompt_suffix)
+        for name, card in cards.items():
+            if card["prompt"]:
+                requests.append(spec.card_request(name, card))
+            else:
+                print(f"  Skipping (no prompt): {name}")
+    return requests, cards
+
+
+def show_plan(layers, cache):
+    counts = {}
+    for number, req, status in plan_layers(cache, layers):
+        counts[status] = counts.get(status, 0) + 1
+        print(f"  {number}  {status:<9} {req.path.relative_to(ASSETS_DIR)}  {req.label}")
+    total = sum(len(layer) for layer in layers)
+    print(f"\nPlan: {total} targets in {len(layers)} layers, {counts}")
+
+
+def report_metrics(metrics):
+    """Print the run summary and refresh the Prometheus snapshot."""
+    metrics.write_prometheus()
+    print("\n=== Run metrics ===")
+    for line in metrics.summary_lines():
+        print(f"  {line}")
+    print(f"  Events: {metrics.events_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build LunchTable TCG assets from the asset spec")
+    parser.add_argument("targets", nargs="*", help="Glob patterns for target names or paths (default: all)")
+    parser.add_argument(
+        "--group",
+        nargs="+",
+        metavar="GROUP",
+        help=f"Spec groups to build, plus {CARDS_GROUP!r} for card art (default: all)",
+    )
+    parser.add_argument("--spec", type=Path, default=SPEC_PATH, help="Asset spec to build from")
+    parser.add_argument(
+        "--plan", action="store_true", help="Show each target's layer and status without calling the API"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Max image requests in flight (backs off on 429/5xx, ramps back up on success)",
+    )
+    parser.add_argument(
+        "--quality-retries",
+        type=int,
+        default=DEFAULT_QUALITY_RETRIES,
+        help="Re-renders allowed per image that fails the alpha quality gate",
+    )
+    parser.add_argument("--no-variants", action="store_true", help="Skip WebP/AVIF variant encoding")
+    parser.add_argument("--no-renders", action="store_true", help="Skip pre-composited card renders")
+    parser.add_argument("--no-atlas", action="store_true", help="Skip texture atlas packing")
+    parser.add_argument(
+        "--backend",
+        default="openai",
+        help="Image backend: openai, or mock[:latency=S,rate_limit=P,error_rate=P,defect_rate=P,seed=N]",
+    )
+    parser.add_argument(
+        "--max-payload-mb",
+        type=int,
+        default=DEFAULT_BUDGET_BYTES // (1024 * 1024),
+        help="Memory budget for image payloads held by in-flight requests",
+    )
+    args = parser.parse_args()
+
+    spec = AssetSpec.load(ASSETS_DIR, {"lunchtable": LUNCHTABLE_DIR}, args.spec)
+    known = spec.groups() + [CARDS_GROUP]
+    groups = args.group or known
+    unknown = [group for group in groups if group not in known]
+    if unknown:
+        print(f"ERROR: unknown group(s) {', '.join(unknown)}; the spec has {', '.join(known)}")
+        sys.exit(1)
+
+    requests, cards = target_requests(spec, groups)
+    if args.targets:
+        requests = select(requests, args.targets, ASSETS_DIR)
+        if not requests:
+            print(f"ERROR: no targets match {' '.join(args.targets)}")
+            sys.exit(1)
+    layers = build_layers(requests)
+
+    cache = GenerationCache(CACHE_DIR, ASSETS_DIR)
+    if args.plan:
+        show_plan(layers, cache)
+        return
+
+    client = make_client(args.backend, os.environ.get("OPENAI_API_KEY"))
+    budget = PayloadBudget(args.max_payload_mb * 1024 * 1024)
+    for parent in {req.path.parent for req in requests}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"=== Building {len(requests)} targets in {len(layers)} layers ===")
+    metrics = RunMetrics(METRICS_DIR, "build")
+    with Journal(JOURNAL_PATH, ASSETS_DIR) as journal, metrics:
+        with AdaptiveScheduler(concurrency=args.concurrency) as scheduler:
+            runner = Runner(
+                lambda req: render_request(client, budget, req),
+                scheduler,
+                cache,
+                journal,
+                validate=spec.gate(check_output),
+                quality_retries=args.quality_retries,
+                metrics=metrics,
+            )
+            ok, failed, blocked = build(runner, layers)
+        print(f"\nTargets: {ok}/{len(requests)} current")
+        print(f"Journal: {journal.summary()}")
+        report_metrics(metrics)
+
+    renders = cards is not None and spec.renders_cards() and not args.no_renders
+    manifest = finish_run(
+        runner.touched,
+        ASSETS_DIR,
+        variants=not args.no_variants,
+        encode=spec.wants_variants,
+        atlases=not args.no_atlas,
+        cards=cards if renders else None,
+        unchanged=runner.unchanged,
+    )
+    print(f"\nManifest updated: {manifest.path} ({len(runner.touched)} assets refreshed)")
+    for label in failed:
+        print(f"  FAILED: {label}")
+    for label in blocked:
+        print(f"  SKIPPED (dependency failed): {label}")
+    if failed or blocked:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Pack generated game assets into texture atlases.
+
+generate-assets.py and generate-card-frame.py run this stage after every
+run; this script re-runs it on its own against game-assets/manifest.json.
+Frames, glows and the card back go into atlases/ui-N.png, card arts into
+one atlases/cards-<deck>-N.png per deck, with sprite rects and UVs recorded
+under "atlases" in the manifest. Groups whose inputs are unchanged are
+skipped unless --force is given.
+
+Usage:
+  python3 scripts/build-atlases.py
+  python3 scripts/build-atlases.py --force         # Re-pack every group
+  python3 scripts/build-atlases.py --no-variants   # Skip WebP/AVIF copies of the sheets
+
+Requires Pillow.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from asset_pipeline.atlas import build_atlases
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.postprocess import encode_atlas_variants
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack game assets into texture atlases")
+    parser.add_argument("--force", action="store_true", help="Re-pack even if inputs are unchanged")
+    parser.add_argument(
+        "--no-variants", action="store_true", help="Skip WebP/AVIF variants of the atlas sheets"
+    )
+    args = parser.parse_args()
+
+    manifest_path = ASSETS_DIR / "manifest.json"
+    if not manifest_path.exists():
+        print(f"ERROR: Manifest not found: {manifest_path}")
+        sys.exit(1)
+
+    manifest = Manifest(manifest_path, ASSETS_DIR)
+    print("=== Packing texture atlases ===\n")
+    sheets = build_atlases(manifest, force=args.force)
+    if sheets and not args.no_variants:
+        encode_atlas_variants(manifest, sheets)
+    manifest.save()
+
+    sprites = sum(len(entry["sprites"]) for entry in manifest.atlases.values())
+    print(f"\nAtlases: {len(manifest.atlases)} sheets, {sprites} sprites ({len(sheets)} rebuilt)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Composite finished card images from card art and frame overlays.
+
+generate-assets.py runs this stage after every run that loads the card
+database; this script re-runs it on its own, e.g. after regenerating frames
+with generate-card-frame.py. Each card with art in game-assets/cards/ is
+blended into its Card_Type frame with its deck's tint and written to
+game-assets/renders/, and recorded in game-assets/manifest.json. Cards whose
+art, frame and tint are unchanged are skipped unless --force is given.
+
+Usage:
+  python3 scripts/build-card-renders.py
+  python3 scripts/build-card-renders.py --force --workers 4   # Re-render everything on 4 cores
+  python3 scripts/build-card-renders.py --no-variants         # Skip WebP/AVIF copies
+
+Requires numpy and Pillow (pandas too if the card index needs recompiling).
+"""
+
+import os
+import argparse
+from pathlib import Path
+
+from asset_pipeline.card_index import load_card_index
+from asset_pipeline.card_render import build_card_renders
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.spec import AssetSpec
+from asset_pipeline.variants import build_variants
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+CARD_INDEX_PATH = ASSETS_DIR / ".cache" / "card-index.json"
+XLSX_PATH = (
+    PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable" / "lunchtable_MASTER_card_database.xlsx"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Composite finished card renders")
+    parser.add_argument("--force", action="store_true", help="Re-render even if inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: all cores)")
+    parser.add_argument(
+        "--no-variants", action="store_true", help="Skip WebP/AVIF variants of the renders"
+    )
+    args = parser.parse_args()
+
+    spec = AssetSpec.load(ASSETS_DIR, {})
+    cards = load_card_index(XLSX_PATH, CARD_INDEX_PATH, spec.prompt_columns, spec.prompt_suffix)
+    manifest = Manifest(ASSETS_DIR / "manifest.json", ASSETS_DIR)
+    print(f"=== Rendering cards ({len(cards)} in database) ===\n")
+    written = build_card_renders(cards, manifest, workers=args.workers, force=args.force)
+    if written and not args.no_variants:
+        for path, records in build_variants(written, ASSETS_DIR, workers=args.workers).items():
+            manifest.update(path, variants=records)
+    manifest.save()
+    print(f"\nRenders: {len(written)} written")
+
+
+if __name__ == "__main__":
+    main()
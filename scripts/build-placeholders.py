@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compute image placeholders for game-assets/ and public/lunchtable/.
+
+The generator scripts fill in placeholders for game-assets/ after every
+run; this script also covers public/lunchtable/ (recorded under
+"lunchtable" in the manifest). Unchanged images keep their placeholder
+unless --force is given.
+
+Usage:
+  python3 scripts/build-placeholders.py
+  python3 scripts/build-placeholders.py --force --workers 4
+
+Requires numpy and Pillow.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.placeholders import refresh_placeholders
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute LQIP/BlurHash placeholders for assets")
+    parser.add_argument("--force", action="store_true", help="Recompute even if content is unchanged")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    manifest_path = ASSETS_DIR / "manifest.json"
+    if not manifest_path.exists():
+        print(f"ERROR: Manifest not found: {manifest_path}")
+        sys.exit(1)
+
+    manifest = Manifest(manifest_path, ASSETS_DIR)
+    print("=== Computing placeholders ===\n")
+    computed = refresh_placeholders(manifest, LUNCHTABLE_DIR, workers=args.workers, force=args.force)
+    manifest.save()
+
+    covered = sum("placeholder" in e for e in manifest.assets.values()) + sum(
+        "placeholder" in e for e in manifest.lunchtable.values()
+    )
+    print(f"Placeholders: {covered} images covered ({computed} computed this run)")
+
+
+if __name__ == "__main__":
+    main()
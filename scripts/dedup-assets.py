@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Find duplicate and near-duplicate images in public/lunchtable and game-assets.
+
+Keeps a hash index (sha256, dHash, pHash per image) in
+game-assets/.cache/dedup-index.json and only rehashes files whose mtime or
+size changed, so re-running after a generation run is cheap. Prints
+byte-identical clusters with the bytes they waste, then near-duplicate
+clusters (see asset_pipeline/dedup.py for the thresholds). With --alias,
+manifest.json entries (game-assets and lunchtable) that are byte-identical
+copies of another image get "alias_of" pointing at one canonical file,
+which may be in either tree.
+
+Usage:
+  python3 scripts/dedup-assets.py
+  python3 scripts/dedup-assets.py --alias              # Also rewrite manifest aliases
+  python3 scripts/dedup-assets.py --json dupes.json    # Write the clusters as JSON
+  python3 scripts/dedup-assets.py --phash 4 --dhash 6  # Stricter near-duplicate match
+
+Requires numpy and Pillow.
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from asset_pipeline.dedup import (
+    DHASH_DISTANCE,
+    PHASH_DISTANCE,
+    DedupIndex,
+    alias_duplicates,
+    exact_clusters,
+    near_clusters,
+)
+from asset_pipeline.manifest import Manifest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+INDEX_PATH = ASSETS_DIR / ".cache" / "dedup-index.json"
+# Index keys are "<label>/<path>", so cluster reports read as "lunchtable/logo.png".
+ROOTS = {"lunchtable": LUNCHTABLE_DIR, "game-assets": ASSETS_DIR}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report duplicate images in the asset library")
+    parser.add_argument("--alias", action="store_true", help="Alias exact duplicates in manifest.json")
+    parser.add_argument("--phash", type=int, default=PHASH_DISTANCE, help="Max pHash distance (bits)")
+    parser.add_argument("--dhash", type=int, default=DHASH_DISTANCE, help="Max dHash distance (bits)")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: all cores)")
+    parser.add_argument("--json", help="Write the clusters to this JSON file")
+    args = parser.parse_args()
+
+    index = DedupIndex(INDEX_PATH)
+    hashed = index.refresh(ROOTS, workers=args.workers)
+    index.save()
+    print(f"Indexed {len(index.files)} images ({hashed} hashed this run)")
+
+    exact = exact_clusters(index.files)
+    near = near_clusters(index.files, args.phash, args.dhash)
+
+    wasted = sum(index.files[c[0]]["size"] * (len(c) - 1) for c in exact)
+    print(f"\n=== {len(exact)} byte-identical clusters ({wasted // 1024}KB duplicated) ===\n")
+    for cluster in exact:
+        print(f"  {index.files[cluster[0]]['size'] // 1024}KB x{len(cluster)}: {', '.join(cluster)}")
+    print(f"\n=== {len(near)} near-duplicate clusters ===\n")
+    for cluster in near:
+        print(f"  {', '.join(cluster)}")
+
+    if args.alias:
+        manifest_path = ASSETS_DIR / "manifest.json"
+        if not manifest_path.exists():
+            print(f"ERROR: Manifest not found: {manifest_path}")
+            sys.exit(1)
+        manifest = Manifest(manifest_path, ASSETS_DIR)
+        aliases = alias_duplicates(
+            {"game-assets": manifest.assets, "lunchtable": manifest.lunchtable}, index.files
+        )
+        manifest.save()
+        print(f"\nManifest: {len(aliases)} aliased duplicates")
+        for alias, canonical in sorted(aliases.items()):
+            print(f"  {alias} -> {canonical}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"exact": exact, "near": near}, indent=2))
+        print(f"\nClusters written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
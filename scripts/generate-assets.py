@@ -7,46 +7,129 @@ Usage:
   python3 scripts/generate-assets.py --mode sample    # Generate 6 sample cards (1 per deck)
   python3 scripts/generate-assets.py --mode all       # Generate all 132 card arts
   python3 scripts/generate-assets.py --mode card --name "Back Alley Bookie"  # Single card
-
-Requires OPENAI_API_KEY environment variable.
+  python3 scripts/generate-assets.py --mode all --concurrency 6   # Up to 6 requests in flight
+  python3 scripts/generate-assets.py --resume         # Finish what an interrupted run left undone
+  python3 scripts/generate-assets.py --retry-failed   # Re-run only jobs that failed
+  python3 scripts/generate-assets.py --mode all --dry-run   # Show what would be generated, no API calls
+  python3 scripts/generate-assets.py --mode all --backend mock:latency=0.2,rate_limit=0.1   # Offline stand-in
+  python3 scripts/generate-assets.py --mode all --draft   # Cheap low-quality drafts + contact sheets
+  python3 scripts/generate-assets.py --promote "Back Alley Bookie" "Debugging Dana"   # Final renders of approved drafts
+  python3 scripts/generate-assets.py --mode all --shard 2/4   # This machine's quarter of the run
+  python3 scripts/generate-assets.py --mode merge             # Combine collected shard outputs
+  python3 scripts/generate-assets.py --mode all --watch       # Keep regenerating as the xlsx is edited
+  python3 scripts/generate-assets.py --mode all --batch       # One Batch API job instead of live calls
+
+Board assets and the card art settings come from the asset spec in
+scripts/assets.toml (see build-assets.py).
+
+Outputs are tracked in a content-addressed cache (game-assets/.cache) keyed on
+prompt, model and render parameters, so editing a prompt in the master xlsx
+regenerates just that card and unchanged cards are skipped without an API call.
+Every job's state is appended to game-assets/.cache/journal-assets.jsonl
+and its timings to game-assets/.cache/metrics/ (see
+asset_pipeline/metrics.py); the run ends with a throughput, latency and
+spend summary.
+New outputs get WebP/AVIF variants under game-assets/variants/ (see
+generate-variants.py to re-run that stage on its own), and their
+game-assets/manifest.json entries (hash, size, dimensions, alpha, card,
+variants) are refreshed in place. Each card with art is then composited into
+its deck-tinted frame under game-assets/renders/ (see build-card-renders.py),
+and frames, board textures and card arts are packed into texture atlases
+under game-assets/atlases/ (see build-atlases.py).
+
+Every transparent output passes an alpha quality gate before it is cached
+(see asset_pipeline/quality.py): opaque or blank renders, and frames whose
+art window isn't clear, are regenerated up to --quality-retries times, and
+card arts are trimmed to their visible bounds.
+
+--draft renders low-quality drafts and contact sheets into
+game-assets/.cache/drafts/; --promote renders the approved ones at final
+quality (see asset_pipeline/drafts.py).
+
+--shard i/N renders one name-hashed slice of the run; once the shard
+outputs are copied into one tree, --mode merge builds manifest.json, renders
+and atlases from them (see asset_pipeline/shards.py).
+
+--watch stays running after the run and, on each saved edit of the master
+xlsx, regenerates just the cards whose prompt, type or deck changed and
+retires the outputs of renamed or deleted ones.
+
+--batch submits the uncached requests as one Batch API job (a local
+stand-in with --backend mock), polls it every --batch-poll seconds and
+feeds the results through the usual pipeline; an interrupted run resumes
+the same batch if rerun with the same selection (see asset_pipeline/batch.py).
+
+Cards are read from a compiled index (game-assets/.cache/card-index.json) that
+is rebuilt from the master xlsx only when the workbook changes, so pandas is
+only imported on those runs.
+
+Requires OPENAI_API_KEY environment variable (except for --dry-run and
+--backend mock). LTCG_ASSETS_DIR overrides the output directory.
+
+`ltcg-assets.py generate` runs this script; see ltcg-assets.py for the
+offline list, manifest and validate commands.
 """
 
 import os
 import sys
-import json
-import base64
 import argparse
 from pathlib import Path
 
-# Try imports
-try:
-    from openai import OpenAI
-except ImportError:
-    print("ERROR: pip install openai")
-    sys.exit(1)
-
-try:
-    import pandas as pd
-except ImportError:
-    print("ERROR: pip install pandas openpyxl")
-    sys.exit(1)
+from asset_pipeline.backends import make_client
+from asset_pipeline.batch import DEFAULT_POLL_SECONDS as BATCH_POLL_SECONDS
+from asset_pipeline.batch import BatchSubmission, make_batch_backend
+from asset_pipeline.cache import DEFAULT_MAX_BYTES, GenerationCache, plan
+from asset_pipeline.card_index import load_card_index
+from asset_pipeline.card_render import DECK_COLORS
+from asset_pipeline.drafts import (
+    DraftLedger,
+    build_contact_sheets,
+    draft_renderer,
+    draft_request,
+)
+from asset_pipeline.journal import DONE, FAILED, UNFINISHED, Journal
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.metrics import RunMetrics
+from asset_pipeline.payloads import DEFAULT_BUDGET_BYTES, PayloadBudget
+from asset_pipeline.postprocess import finish_run
+from asset_pipeline.quality import DEFAULT_QUALITY_RETRIES, check_output
+from asset_pipeline.render import render_request
+from asset_pipeline.runner import Runner
+from asset_pipeline.scheduler import AdaptiveScheduler
+from asset_pipeline.shards import (
+    in_shard,
+    merge_shards,
+    parse_shard,
+    shard_tag,
+    write_status,
+    manifest_path as shard_manifest_path,
+)
+from asset_pipeline.spec import AssetSpec
+from asset_pipeline.watch import (
+    DEFAULT_POLL_SECONDS,
+    FileWatcher,
+    card_changes,
+    card_output_paths,
+    retire_outputs,
+)
 
 
 PROJECT_ROOT = Path(__file__).parent.parent
-ASSETS_DIR = PROJECT_ROOT / "apps" / "web" / "public" / "game-assets"
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
 CARD_ART_DIR = ASSETS_DIR / "cards"
 BOARD_DIR = ASSETS_DIR / "board"
-XLSX_PATH = PROJECT_ROOT / "apps" / "web" / "public" / "lunchtable" / "lunchtable_MASTER_card_database.xlsx"
-
-# Archetype color map for card frame tinting
-DECK_COLORS = {
-    "Dropouts": "#ef4444",    # red
-    "Preps": "#3b82f6",       # blue
-    "Geeks": "#eab308",       # yellow
-    "Freaks": "#a855f7",      # purple
-    "Nerds": "#22c55e",       # green
-    "Goodies": "#9ca3af",     # gray
-}
+CACHE_DIR = ASSETS_DIR / ".cache"
+JOURNAL_PATH = CACHE_DIR / "journal-assets.jsonl"
+DRAFTS_DIR = CACHE_DIR / "drafts"
+SHARDS_DIR = CACHE_DIR / "shards"
+DRAFT_JOURNAL_PATH = CACHE_DIR / "journal-drafts.jsonl"
+BATCH_DIR = CACHE_DIR / "batches"
+METRICS_DIR = CACHE_DIR / "metrics"
+CARD_INDEX_PATH = CACHE_DIR / "card-index.json"
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+XLSX_PATH = LUNCHTABLE_DIR / "lunchtable_MASTER_card_database.xlsx"
 
 
 def ensure_dirs():
@@ -54,242 +137,497 @@ def ensure_dirs():
     BOARD_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def save_image(client, prompt, path, size="1024x1024", background="transparent", quality="high"):
-    """Generate and save a single image."""
-    print(f"  Generating: {path.name}...")
-    try:
-        result = client.images.generate(
-            model="gpt-image-1",
-            prompt=prompt,
-            size=size,
-            background=background,
-            quality=quality,
-            n=1,
-        )
-        # gpt-image-1 returns base64
-        image_data = base64.b64decode(result.data[0].b64_json)
-        path.write_bytes(image_data)
-        print(f"  Saved: {path} ({len(image_data) // 1024}KB)")
-        return True
-    except Exception as e:
-        print(f"  ERROR: {e}")
-        return False
+def load_spec():
+    return AssetSpec.load(ASSETS_DIR, {"lunchtable": LUNCHTABLE_DIR})
 
 
-def generate_board_assets(client):
-    """Generate playmat, card back, and UI textures."""
-    print("\n=== Generating Board Assets ===\n")
+def load_cards(spec):
+    return load_card_index(XLSX_PATH, CARD_INDEX_PATH, spec.prompt_columns, spec.prompt_suffix)
 
-    assets = [
-        {
-            "name": "playmat.png",
-            "prompt": (
-                "Top-down view of a dark worn leather game table surface for a trading card game. "
-                "Dark brown-black leather texture with subtle scratches, wear marks, and aged patina. "
-                "Faint grid lines etched into the leather marking card zones. "
-                "Moody dramatic lighting from above casting subtle shadows. "
-                "No cards, no text, no objects on the surface. "
-                "Photorealistic texture, 4K quality, dark color palette."
-            ),
-            "size": "1536x1024",
-            "background": "opaque",
-        },
-        {
-            "name": "card-back.png",
-            "prompt": (
-                "Trading card game card back design, portrait orientation. "
-                "Dark punk zine aesthetic with ink black background. "
-                "Central emblem: a stylized lunch table with crossed pencils and a crown, "
-                "surrounded by an ornate border of chains, spray paint drips, and torn paper edges. "
-                "Text 'LT' subtly integrated into the design. "
-                "Color scheme: black, dark gray, gold (#ffcc00) accents. "
-                "Sharp corners, no rounded edges. Underground comic book style. "
-                "High contrast, gritty xerox photocopy texture. No photograph."
-            ),
-            "size": "1024x1536",
-            "background": "opaque",
-        },
-        {
-            "name": "card-frame-monster.png",
-            "prompt": (
-                "Trading card game card frame template, portrait orientation. "
-                "Ornate border design for a monster/character card. "
-                "Sharp angular frame with industrial punk aesthetic - rivets, bolts, scratched metal. "
-                "The center is completely empty/transparent (this is a frame overlay). "
-                "Top: name plate area with angular metal banner. "
-                "Middle: large empty rectangular window for character art. "
-                "Bottom: stat box area with two number slots (ATK/DEF style). "
-                "Color: dark gunmetal gray with gold (#ffcc00) accent lines. "
-                "Sharp corners, no curves. Gritty industrial texture. Transparent background."
-            ),
-            "size": "1024x1536",
-            "background": "transparent",
-        },
-        {
-            "name": "card-frame-spell.png",
-            "prompt": (
-                "Trading card game card frame template, portrait orientation. "
-                "Ornate border for a spell/magic card. "
-                "Flowing angular frame with neon energy aesthetic - circuit lines, glowing edges. "
-                "The center is completely empty/transparent (this is a frame overlay). "
-                "Top: name plate area with angular banner. "
-                "Middle: large empty window for spell art. "
-                "Bottom: effect text area. "
-                "Color: deep teal/cyan (#33ccff) with dark edges. "
-                "Sharp corners, punk zine style. Transparent background."
-            ),
-            "size": "1024x1536",
-            "background": "transparent",
-        },
-        {
-            "name": "card-frame-trap.png",
-            "prompt": (
-                "Trading card game card frame template, portrait orientation. "
-                "Ornate border for a trap card. "
-                "Angular frame with barbed wire and warning stripe aesthetic. "
-                "The center is completely empty/transparent (this is a frame overlay). "
-                "Top: name plate area with danger-tape styled banner. "
-                "Middle: large empty window for trap art. "
-                "Bottom: effect text area. "
-                "Color: deep magenta/pink (#d946ef) with dark edges and yellow caution stripes. "
-                "Sharp corners, industrial punk. Transparent background."
-            ),
-            "size": "1024x1536",
-            "background": "transparent",
-        },
-        {
-            "name": "zone-glow-red.png",
-            "prompt": (
-                "Soft glowing red energy aura effect on transparent background. "
-                "Circular/rectangular soft glow, like a neon light seen through fog. "
-                "Color: warm red (#ef4444). Feathered edges fading to transparency. "
-                "No solid shapes, just atmospheric light. Game UI element."
-            ),
-            "size": "1024x1024",
-            "background": "transparent",
-        },
-    ]
-
-    success = 0
-    for asset in assets:
-        path = BOARD_DIR / asset["name"]
-        if path.exists():
-            print(f"  Skipping (exists): {asset['name']}")
-            success += 1
-            continue
-        if save_image(
-            client,
-            asset["prompt"],
-            path,
-            size=asset.get("size", "1024x1024"),
-            background=asset.get("background", "transparent"),
-        ):
-            success += 1
-
-    print(f"\nBoard assets: {success}/{len(assets)} generated")
-    return success
 
+def board_requests(spec):
+    """Playmat, card back, and UI textures: the spec's "board" group."""
+    return spec.requests("board")
 
-def generate_card_art(client, df, card_names=None):
-    """Generate card art from database prompts."""
+
+def card_requests(spec, cards, card_names=None):
+    """ImageRequests for card art, from the compiled card index."""
     if card_names:
-        cards = df[df["Card_Name"].isin(card_names)]
+        for name in card_names:
+            if name not in cards:
+                print(f"  ERROR: no card named {name!r} in the database")
+        selected = [(name, cards[name]) for name in card_names if name in cards]
     else:
-        cards = df
-
-    print(f"\n=== Generating {len(cards)} Card Arts ===\n")
+        selected = list(cards.items())
 
-    success = 0
-    for _, card in cards.iterrows():
-        name = card["Card_Name"]
-        card_type = card["Card_Type"]
-        deck = card["Deck"]
+    requests = []
+    for name, card in selected:
+        if not card["prompt"]:
+            print(f"  Skipping (no prompt): {name}")
+            continue
+        requests.append(spec.card_request(name, card))
+    return requests
 
-        # Create filename from card name
-        filename = name.lower().replace(" ", "_").replace("'", "").replace("-", "_") + ".png"
-        path = CARD_ART_DIR / filename
 
-        if path.exists():
-            print(f"  Skipping (exists): {filename}")
-            success += 1
-            continue
+def sample_card_names(cards):
+    """The first Stereotype from each deck."""
+    samples = []
+    for deck in DECK_COLORS:
+        name = next(
+            (n for n, c in cards.items() if c["deck"] == deck and c["type"] == "Stereotype"), None
+        )
+        if name:
+            samples.append(name)
+    return samples
 
-        # Use the FirstRelease_Art_Prompt (most specific per-card)
-        prompt = card.get("FirstRelease_Art_Prompt")
-        if pd.isna(prompt) or not prompt:
-            prompt = card.get("Custom_Art_Prompt")
-        if pd.isna(prompt) or not prompt:
-            prompt = card.get("Underground_Art_Prompt")
-        if pd.isna(prompt) or not prompt:
-            print(f"  Skipping (no prompt): {name}")
-            continue
 
-        # Add transparent background instruction
-        prompt = prompt + " Transparent background, character/subject only, no background scenery."
+def generate_board_assets(runner, spec):
+    """Generate playmat, card back, and UI textures."""
+    print("\n=== Generating Board Assets ===\n")
+    requests = board_requests(spec)
+    success, _ = runner.run(requests)
+    print(f"\nBoard assets: {success}/{len(requests)} generated")
+    return success
 
-        print(f"  [{deck}] {name} ({card_type})")
-        if save_image(client, prompt, path, size="1024x1536", background="transparent"):
-            success += 1
 
-    print(f"\nCard arts: {success}/{len(cards)} generated")
+def generate_card_art(runner, spec, cards, card_names=None):
+    """Generate card art from database prompts."""
+    requests = card_requests(spec, cards, card_names)
+    print(f"\n=== Generating {len(requests)} Card Arts ===\n")
+    success, _ = runner.run(requests)
+    print(f"\nCard arts: {success}/{len(requests)} generated")
     return success
 
 
-def generate_sample_cards(client, df):
+def generate_sample_cards(runner, spec, cards):
     """Generate 1 card per deck as samples."""
-    # Pick the first Stereotype from each deck
-    samples = []
-    for deck in DECK_COLORS:
-        deck_cards = df[(df["Deck"] == deck) & (df["Card_Type"] == "Stereotype")]
-        if len(deck_cards) > 0:
-            samples.append(deck_cards.iloc[0]["Card_Name"])
-
+    samples = sample_card_names(cards)
     print(f"Sample cards: {samples}")
-    return generate_card_art(client, df, card_names=samples)
+    return generate_card_art(runner, spec, cards, card_names=samples)
+
+
+def mode_requests(spec, mode, cards, name=None):
+    """Every ImageRequest a --mode run would submit, in order."""
+    if mode == "board":
+        return board_requests(spec)
+    if mode == "sample":
+        return board_requests(spec) + card_requests(spec, cards, sample_card_names(cards))
+    if mode == "all":
+        return board_requests(spec) + card_requests(spec, cards)
+    return card_requests(spec, cards, [name])
+
+
+def generate_drafts(runner, requests, drafts):
+    """Draft every request without a current draft. Returns the draft requests run."""
+    todo = [req for req in requests if not drafts.is_drafted(req)]
+    print(f"\n=== Drafting {len(todo)} images ({len(requests) - len(todo)} already drafted) ===\n")
+    draft_reqs = [draft_request(req, DRAFTS_DIR, ASSETS_DIR) for req in todo]
+    for parent in {draft.path.parent for draft in draft_reqs}:
+        parent.mkdir(parents=True, exist_ok=True)
+    success, _ = runner.run(draft_reqs)
+    print(f"\nDrafts: {success}/{len(draft_reqs)} rendered")
+    return draft_reqs
+
+
+def promote_drafts(runner, spec, cards, names, drafts):
+    """Render the named requests at final quality, if each has a current draft."""
+    final = {req.name: req for req in mode_requests(spec, "all", cards)}
+    chosen = []
+    for name in names:
+        req = final.get(name)
+        if req is None:
+            print(f"  ERROR: no card or board asset named {name!r}")
+            continue
+        problem = drafts.promotion_problem(req)
+        if problem:
+            print(f"  Not promoting {name}: {problem}")
+            continue
+        chosen.append(req)
+    print(f"\n=== Promoting {len(chosen)} approved drafts ===\n")
+    success, _ = runner.run(chosen)
+    print(f"\nPromoted: {success}/{len(chosen)} rendered at final quality")
+    return chosen
+
+
+def merge_shard_outputs(args, spec, cards):
+    """Fold collected shard manifests into manifest.json and report gaps."""
+    manifest = Manifest(ASSETS_DIR / "manifest.json", ASSETS_DIR)
+    report = merge_shards(manifest, SHARDS_DIR)
+    if not report["count"]:
+        print(f"ERROR: No shard status files in {SHARDS_DIR}")
+        sys.exit(1)
+    manifest.prune()
+    manifest.save()
+    print(f"\n=== Merged {report['merged']} entries from {report['count']} shards ===")
+
+    finish_run(
+        [],
+        ASSETS_DIR,
+        variants=not args.no_variants,
+        atlases=not args.no_atlas,
+        cards=render_selection(args, spec, cards),
+    )
+
+    for index in report["missing_shards"]:
+        print(f"  MISSING SHARD: {index}/{report['count']} never reported")
+    for name, tag in sorted(report["failed"].items()):
+        print(f"  FAILED: {name} (shard {tag})")
+    for name, rel in sorted(report["missing"].items()):
+        print(f"  MISSING: {name} -> {rel}")
+    problems = len(report["missing_shards"]) + len(report["failed"]) + len(report["missing"])
+    print(f"\nMerge: {'OK' if not problems else f'{problems} problem(s)'}")
+    if problems:
+        sys.exit(1)
+
+
+def watch_cards(runner, spec, cards, cache, watcher, args):
+    """
+    Regenerate selected cards as the master xlsx is edited, until Ctrl-C.
+    `watcher` was started before `cards` were loaded, so edits made during
+    the initial run are picked up too.
+    """
+    def finish(touched, cards):
+        manifest = finish_run(
+            touched,
+            ASSETS_DIR,
+            variants=not args.no_variants,
+            encode=spec.wants_variants,
+            atlases=not args.no_atlas,
+            cards=render_selection(args, spec, cards),
+            unchanged=runner.unchanged,
+        )
+        runner.touched.clear()
+        runner.unchanged.clear()
+        return manifest
+
+    finish(runner.touched, cards)
+    print(f"\n=== Watching {XLSX_PATH.name} for card changes (Ctrl-C to stop) ===")
+    while True:
+        try:
+            watcher.wait(DEFAULT_POLL_SECONDS)
+        except KeyboardInterrupt:
+            # Ctrl-C mid-regeneration propagates like any interrupted run (see --resume).
+            print("\nStopped watching")
+            return
+        try:
+            new_cards = load_cards(spec)
+        except Exception as e:
+            print(f"  ERROR: could not read {XLSX_PATH.name}, waiting for the next save: {e}")
+            continue
+        changed, removed, renamed = card_changes(cards, new_cards)
+        if not changed and not removed:
+            print(f"\n{XLSX_PATH.name} saved; no prompt, type or deck changes")
+            cards = new_cards
+            continue
+        print(f"\n=== {len(changed)} changed, {len(removed)} removed cards ===")
+        for old, new in sorted(renamed.items()):
+            print(f"  Renamed: {old} -> {new}")
+
+        manifest = Manifest(ASSETS_DIR / "manifest.json", ASSETS_DIR)
+        # Never retire a path some current card still writes to.
+        live = {p for card in new_cards.values() for p in card_output_paths(card, ASSETS_DIR)}
+        stale = [
+            p for name in removed for p in card_output_paths(cards[name], ASSETS_DIR)
+            if p not in live
+        ]
+        if retire_outputs(stale, manifest, cache):
+            manifest.save()
+
+        selected = {req.name for req in mode_requests(spec, args.mode, new_cards, args.name)}
+        requests = card_requests(spec, new_cards, [name for name in changed if name in selected])
+        ok, failed = runner.run(requests)
+        print(f"\nCard arts: {ok}/{len(requests)} current")
+        # Type/deck edits reuse the cached art but still need their manifest entry refreshed.
+        touched = {req.path: req for req in runner.touched + requests if req.path.exists()}
+        manifest = finish(list(touched.values()), new_cards)
+        cards = new_cards
+        report_metrics(runner.metrics)
+        print(f"Manifest updated: {len(manifest.assets)} assets; watching again")
+
+
+def render_selection(args, spec, cards):
+    """The card index to composite renders for, or None when renders are off."""
+    if args.no_renders or not spec.renders_cards():
+        return None
+    return cards
+
+
+def report_metrics(metrics):
+    """Print the run summary so far and refresh the Prometheus snapshot."""
+    metrics.write_prometheus()
+    print("\n=== Run metrics ===")
+    for line in metrics.summary_lines():
+        print(f"  {line}")
+    print(f"  Events: {metrics.events_path}")
+
+
+def dry_run(requests, cache):
+    """Print what a run would do for each request without calling the API."""
+    counts = {}
+    for req, status in plan(cache, requests):
+        counts[status] = counts.get(status, 0) + 1
+        print(f"  {status:<9} {req.path.relative_to(ASSETS_DIR)}  {req.label}")
+    print(f"\nDry run: {len(requests)} requests, {counts}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate LunchTable TCG game assets")
-    parser.add_argument("--mode", choices=["board", "sample", "all", "card"], default="sample")
+    parser.add_argument(
+        "--mode", choices=["board", "sample", "all", "card", "merge"], default="sample"
+    )
     parser.add_argument("--name", help="Card name for --mode card")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Max image requests in flight (backs off on 429/5xx, ramps back up on success)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Size cap for the generation cache; least recently used renders are evicted",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Re-run queued, in-flight and failed jobs from the journal and finish post-processing "
+        "of done ones (ignores --mode)",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Re-run only jobs the journal records as failed (ignores --mode)",
+    )
+    parser.add_argument(
+        "--no-variants", action="store_true", help="Skip WebP/AVIF variant encoding"
+    )
+    parser.add_argument(
+        "--no-atlas", action="store_true", help="Skip texture atlas packing"
+    )
+    parser.add_argument(
+        "--quality-retries",
+        type=int,
+        default=DEFAULT_QUALITY_RETRIES,
+        help="Re-renders allowed per image that fails the alpha quality gate",
+    )
+    parser.add_argument(
+        "--no-renders", action="store_true", help="Skip pre-composited card renders"
+    )
+    parser.add_argument(
+        "--draft",
+        action="store_true",
+        help="Render the --mode selection as low-quality drafts with contact sheets for review",
+    )
+    parser.add_argument(
+        "--promote",
+        nargs="+",
+        metavar="NAME",
+        help="Render these drafted cards/board assets at final quality (ignores --mode)",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Render only shard I of N (stable by card name); see --mode merge",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the run, keep polling the master xlsx and regenerate cards as rows change",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit uncached requests as one batch job and poll for it instead of calling the API live",
+    )
+    parser.add_argument(
+        "--batch-poll",
+        type=float,
+        default=BATCH_POLL_SECONDS,
+        help="Seconds between batch status checks",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List what each request would do (generate/reuse/skip) without calling the API",
+    )
+    parser.add_argument(
+        "--backend",
+        default="openai",
+        help="Image backend: openai, or mock[:latency=S,rate_limit=P,error_rate=P,defect_rate=P,seed=N]",
+    )
+    parser.add_argument(
+        "--max-payload-mb",
+        type=int,
+        default=DEFAULT_BUDGET_BYTES // (1024 * 1024),
+        help="Memory budget for image payloads held by in-flight requests",
+    )
     args = parser.parse_args()
 
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        print("ERROR: Set OPENAI_API_KEY environment variable")
+    if args.mode == "card" and not args.name:
+        print("ERROR: --name required for card mode")
+        sys.exit(1)
+    if args.draft and args.promote:
+        print("ERROR: --draft and --promote are separate steps")
+        sys.exit(1)
+    shard = parse_shard(args.shard) if args.shard else None
+    if shard and (args.draft or args.promote or args.mode == "merge"):
+        print("ERROR: --shard applies to final renders only")
+        sys.exit(1)
+    if args.mode == "merge" and (args.resume or args.retry_failed):
+        print("ERROR: --mode merge combines finished shards; resume or retry each shard instead")
+        sys.exit(1)
+    if args.watch and (
+        args.draft or args.promote or shard or args.dry_run or args.resume or args.retry_failed
+        or args.mode in ("board", "merge")
+    ):
+        print("ERROR: --watch runs alongside a plain card-generating --mode (sample, all, card)")
+        sys.exit(1)
+    if args.batch and (
+        args.draft or args.promote or shard or args.watch or args.resume or args.retry_failed
+        or args.mode == "merge"
+    ):
+        print("ERROR: --batch applies to a plain final-render --mode run")
         sys.exit(1)
 
-    client = OpenAI(api_key=api_key)
-    ensure_dirs()
+    cache = GenerationCache(CACHE_DIR, ASSETS_DIR, max_bytes=args.cache_max_mb * 1024 * 1024)
+    replay = args.resume or args.retry_failed
+
+    spec = load_spec()
+    watcher = FileWatcher([XLSX_PATH]) if args.watch else None
+    if not replay:
+        cards = load_cards(spec)
+        print(f"Loaded {len(cards)} cards from database")
 
-    # Load card database
-    df = pd.read_excel(XLSX_PATH, sheet_name="Master Cards")
-    print(f"Loaded {len(df)} cards from database")
-
-    if args.mode == "board":
-        generate_board_assets(client)
-    elif args.mode == "sample":
-        generate_board_assets(client)
-        generate_sample_cards(client, df)
-    elif args.mode == "all":
-        generate_board_assets(client)
-        generate_card_art(client, df)
-    elif args.mode == "card":
-        if not args.name:
-            print("ERROR: --name required for card mode")
-            sys.exit(1)
-        generate_card_art(client, df, card_names=[args.name])
-
-    # Write manifest
-    manifest = {"generated": []}
-    for d in [BOARD_DIR, CARD_ART_DIR]:
-        for f in sorted(d.glob("*.png")):
-            manifest["generated"].append(str(f.relative_to(ASSETS_DIR)))
-
-    manifest_path = ASSETS_DIR / "manifest.json"
-    manifest_path.write_text(json.dumps(manifest, indent=2))
-    print(f"\nManifest written to {manifest_path}")
-    print(f"Total assets: {len(manifest['generated'])}")
+    if args.mode == "merge":
+        merge_shard_outputs(args, spec, cards)
+        return
+
+    if shard:
+        journal_path = CACHE_DIR / f"journal-assets.shard-{shard_tag(shard)}.jsonl"
+    elif args.draft:
+        journal_path = DRAFT_JOURNAL_PATH
+    else:
+        journal_path = JOURNAL_PATH
+
+    if args.dry_run:
+        if replay:
+            with Journal(journal_path, ASSETS_DIR) as journal:
+                requests = journal.pending((FAILED,) if args.retry_failed else UNFINISHED)
+        else:
+            requests = mode_requests(spec, args.mode, cards, args.name)
+            if args.draft:
+                requests = [draft_request(req, DRAFTS_DIR, ASSETS_DIR) for req in requests]
+            if shard:
+                requests = in_shard(requests, shard)
+        dry_run(requests, cache)
+        return
+
+    client = make_client(args.backend, os.environ.get("OPENAI_API_KEY"))
+    ensure_dirs()
+    journal = Journal(journal_path, ASSETS_DIR)
+    drafts = DraftLedger(DRAFTS_DIR)
+    metrics = RunMetrics(METRICS_DIR, "assets")
+
+    with journal, metrics, AdaptiveScheduler(concurrency=args.concurrency) as scheduler:
+        budget = PayloadBudget(args.max_payload_mb * 1024 * 1024)
+
+        def render(req):
+            return render_request(client, budget, req)
+
+        batch = None
+        if args.batch:
+            backend = make_batch_backend(args.backend, client, BATCH_DIR / "local")
+            batch = BatchSubmission(backend, BATCH_DIR, journal)
+            render = batch.renderer(render, budget)
+
+        runner = Runner(
+            draft_renderer(render) if args.draft else render,
+            scheduler,
+            cache,
+            journal,
+            validate=spec.gate(check_output),
+            quality_retries=args.quality_retries,
+            metrics=metrics,
+        )
+        if replay:
+            pending = journal.pending((FAILED,) if args.retry_failed else UNFINISHED)
+            print(f"\n=== Replaying {len(pending)} unfinished jobs from {journal.path.name} ===\n")
+            ok, failed = runner.run(pending)
+            print(f"\nReplayed: {ok}/{len(pending)} done")
+            ran = pending
+            # Jobs journaled done may have been cut off in post-processing.
+            runner.unchanged.extend(journal.pending((DONE,)))
+        elif args.draft:
+            ran = generate_drafts(runner, mode_requests(spec, args.mode, cards, args.name), drafts)
+        elif args.promote:
+            promoted = promote_drafts(runner, spec, cards, args.promote, drafts)
+        elif batch:
+            requests = mode_requests(spec, args.mode, cards, args.name)
+            print(f"\n=== Batch render of {len(requests)} requests ===\n")
+            ok, failed = batch.run(runner, requests, args.batch_poll)
+            print(f"\nBatch: {ok}/{len(requests)} current")
+        elif shard:
+            ran = in_shard(mode_requests(spec, args.mode, cards, args.name), shard)
+            print(f"\n=== Shard {shard[0]}/{shard[1]}: {len(ran)} requests ===\n")
+            ok, failed = runner.run(ran)
+            print(f"\nShard {shard[0]}/{shard[1]}: {ok}/{len(ran)} done")
+        elif args.mode == "board":
+            generate_board_assets(runner, spec)
+        elif args.mode == "sample":
+            generate_board_assets(runner, spec)
+            generate_sample_cards(runner, spec, cards)
+        elif args.mode == "all":
+            generate_board_assets(runner, spec)
+            generate_card_art(runner, spec, cards)
+        elif args.mode == "card":
+            generate_card_art(runner, spec, cards, card_names=[args.name])
+        print(f"Journal: {journal.summary()}")
+        report_metrics(metrics)
+        if args.watch:
+            watch_cards(runner, spec, cards, cache, watcher, args)
+            print(f"Journal: {journal.summary()}")
+            return
+
+    if args.draft:
+        for draft in ran:
+            if cache.is_current(draft.path, draft.cache_key()):
+                drafts.record(draft)
+        drafts.save()
+        if not replay:
+            print("\n=== Building contact sheets ===\n")
+            build_contact_sheets(drafts.current(mode_requests(spec, args.mode, cards, args.name)), DRAFTS_DIR)
+        return
+    if shard:
+        write_status(SHARDS_DIR, shard, ran, failed, ASSETS_DIR)
+        partial = finish_run(
+            [req for req in ran if req.path.exists()],
+            ASSETS_DIR,
+            variants=not args.no_variants,
+            encode=spec.wants_variants,
+            atlases=False,
+            manifest_path=shard_manifest_path(SHARDS_DIR, shard),
+            unchanged=runner.unchanged,
+        )
+        print(f"\nShard manifest: {partial.path} ({len(partial.assets)} assets)")
+        return
+    if args.promote:
+        for req in promoted:
+            if cache.is_current(req.path, req.cache_key()):
+                drafts.mark_promoted(req)
+        drafts.save()
+
+    manifest = finish_run(
+        runner.touched,
+        ASSETS_DIR,
+        variants=not args.no_variants,
+        encode=spec.wants_variants,
+        atlases=not args.no_atlas,
+        cards=None if replay else render_selection(args, spec, cards),
+        unchanged=runner.unchanged,
+    )
+    print(f"\nManifest updated: {manifest.path} ({len(runner.touched)} assets refreshed)")
+    print(f"Total assets: {len(manifest.assets)}, atlases: {len(manifest.atlases)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Encode responsive WebP/AVIF variants for generated game assets.
+
+generate-assets.py and generate-card-frame.py run this stage on the files
+they write; this script re-runs it on its own against the existing tree and
+records the variants in game-assets/manifest.json.
+
+Usage:
+  python3 scripts/generate-variants.py                         # Whole game-assets/ tree
+  python3 scripts/generate-variants.py cards/foo.png           # Specific files (relative to game-assets/)
+  python3 scripts/generate-variants.py --force --workers 4     # Re-encode everything on 4 cores
+
+LTCG_ASSETS_DIR overrides the assets directory.
+
+Requires Pillow (AVIF needs Pillow >= 11.2 or pillow-avif-plugin).
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.variants import build_variants, iter_sources
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode WebP/AVIF variants of game assets")
+    parser.add_argument("paths", nargs="*", help="PNG paths relative to game-assets/ (default: all)")
+    parser.add_argument("--force", action="store_true", help="Re-encode even if variants are current")
+    parser.add_argument("--workers", type=int, default=None, help="Encoder processes (default: all cores)")
+    args = parser.parse_args()
+
+    if not ASSETS_DIR.exists():
+        print(f"ERROR: Assets directory not found: {ASSETS_DIR}")
+        sys.exit(1)
+
+    sources = [ASSETS_DIR / p for p in args.paths] if args.paths else list(iter_sources(ASSETS_DIR))
+    print(f"=== Encoding variants for {len(sources)} assets ===\n")
+    results = build_variants(sources, ASSETS_DIR, workers=args.workers, force=args.force)
+    total = sum(r["bytes"] for records in results.values() for r in records)
+
+    manifest = Manifest(ASSETS_DIR / "manifest.json", ASSETS_DIR)
+    for src, records in results.items():
+        manifest.update(src, variants=records)
+    manifest.save()
+    print(f"\nVariants: {len(results)}/{len(sources)} assets, {total // 1024}KB total")
+
+
+if __name__ == "__main__":
+    main()
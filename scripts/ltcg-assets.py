@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the LunchTable TCG asset pipeline.
+
+Usage:
+  python3 scripts/ltcg-assets.py generate --mode board       # generate-assets.py with these options
+  python3 scripts/ltcg-assets.py frames --concurrency 3      # generate-card-frame.py with these options
+  python3 scripts/ltcg-assets.py dry-run 'frames/*'          # build-assets.py --plan: what would rebuild
+  python3 scripts/ltcg-assets.py list --group board frames   # Spec targets and whether they're current
+  python3 scripts/ltcg-assets.py manifest                    # Rebuild manifest.json from the files on disk
+  python3 scripts/ltcg-assets.py validate                    # Quality gate + manifest hashes, read-only
+  python3 scripts/ltcg-assets.py optimize --check            # optimize-pngs.py: size budgets
+
+generate, frames, dry-run and optimize hand their remaining arguments to
+generate-assets.py, generate-card-frame.py, build-assets.py --plan and
+optimize-pngs.py (`ltcg-assets.py generate --help` shows that script's
+options). list, manifest and validate never build an image client, so they
+run offline without an API key.
+
+This file imports only the standard library; each subcommand imports the
+pipeline modules it needs when it runs. tests/test_imports.py holds `list`
+to an import-time budget without openai, pandas, numpy or Pillow.
+
+--group takes spec groups plus "cards" for card art (default: all), as in
+build-assets.py. LTCG_ASSETS_DIR overrides the assets directory.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+CACHE_DIR = ASSETS_DIR / ".cache"
+CARD_INDEX_PATH = CACHE_DIR / "card-index.json"
+MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+XLSX_PATH = LUNCHTABLE_DIR / "lunchtable_MASTER_card_database.xlsx"
+CARDS_GROUP = "cards"
+
+# Subcommands that run a generator script: (script, leading arguments, help).
+FORWARDED = {
+    "generate": ("generate-assets.py", [], "Generate board assets and card art (generate-assets.py)"),
+    "frames": ("generate-card-frame.py", [], "Generate card frames and the card back (generate-card-frame.py)"),
+    "dry-run": ("build-assets.py", ["--plan"], "Show what a build would regenerate (build-assets.py --plan)"),
+    "optimize": ("optimize-pngs.py", [], "Recompress lunchtable PNGs and check size budgets (optimize-pngs.py)"),
+}
+
+
+def forward(command, argv):
+    """Run the subcommand's script as if it had been called directly with `argv`."""
+    import runpy
+
+    script, leading, _ = FORWARDED[command]
+    path = SCRIPTS_DIR / script
+    sys.argv = [str(path), *leading, *argv]
+    runpy.run_path(str(path), run_name="__main__")
+
+
+def load_spec():
+    from asset_pipeline.spec import AssetSpec
+
+    return AssetSpec.load(ASSETS_DIR, {"lunchtable": LUNCHTABLE_DIR})
+
+
+def target_requests(spec, groups):
+    """ImageRequests for the chosen groups in spec order, card art last."""
+    requests = []
+    for group in spec.groups():
+        if group in groups:
+            requests.extend(spec.requests(group))
+    if CARDS_GROUP in groups:
+        from asset_pipeline.card_index import load_card_index
+
+        cards = load_card_index(XLSX_PATH, CARD_INDEX_PATH, spec.prompt_columns, spec.prompt_suffix)
+        requests.extend(spec.card_request(name, card) for name, card in cards.items() if card["prompt"])
+    return requests
+
+
+def selected_requests(args):
+    """(spec, requests for --group), exiting on an unknown group."""
+    spec = load_spec()
+    known = spec.groups() + [CARDS_GROUP]
+    groups = args.group or known
+    unknown = [group for group in groups if group not in known]
+    if unknown:
+        print(f"ERROR: unknown group(s) {', '.join(unknown)}; the spec has {', '.join(known)}")
+        sys.exit(1)
+    return spec, target_requests(spec, groups)
+
+
+def rel(path):
+    return path.relative_to(ASSETS_DIR).as_posix()
+
+
+def list_targets(args):
+    """Print each target with its kind and whether the file on disk is current."""
+    from asset_pipeline.cache import GenerationCache
+
+    _, requests = selected_requests(args)
+    cache = GenerationCache(CACHE_DIR, ASSETS_DIR)
+    counts = {}
+    for req in requests:
+        kind = (req.source or {}).get("kind", "")
+        if not req.path.exists():
+            status = "missing"
+        elif cache.is_current(req.path, req.cache_key()):
+            status = "current"
+        else:
+            status = "stale"
+        counts[status] = counts.get(status, 0) + 1
+        print(f"  {status:<8} {kind:<10} {rel(req.path)}  {req.label}")
+    print(f"\n{len(requests)} targets: {counts}")
+
+
+def rebuild_manifest(args):
+    """
+    Re-read every manifest entry and its WebP/AVIF variants from disk, add
+    the selected targets that are on disk but not recorded, and drop entries
+    whose file is gone.
+    """
+    from asset_pipeline.manifest import Manifest, png_info
+    from asset_pipeline.variants import existing_variants
+
+    _, requests = selected_requests(args)
+    manifest = Manifest(MANIFEST_PATH, ASSETS_DIR)
+    before = {path: entry.get("sha256") for path, entry in manifest.assets.items()}
+    gone = manifest.prune()
+    sources = {ASSETS_DIR / path: None for path in manifest.assets}
+    sources.update((req.path, req.source) for req in requests if req.path.exists())
+    variants = 0
+    for path, source in sources.items():
+        found = existing_variants(path, ASSETS_DIR, png_info(path)[:2])
+        manifest.update(path, source=source, variants=found)
+        variants += len(found)
+    manifest.save()
+
+    added = [path for path in manifest.assets if path not in before]
+    changed = [
+        path for path, digest in before.items()
+        if path in manifest.assets and manifest.assets[path]["sha256"] != digest
+    ]
+    print(f"Manifest rebuilt: {manifest.path} ({len(manifest.assets)} assets, {variants} variants)")
+    print(f"  {len(added)} added, {len(changed)} changed on disk, {len(gone)} removed (file gone)")
+    for path in gone:
+        print(f"  Removed: {path}")
+
+
+def manifest_problems(manifest):
+    """[(path, problem)] for manifest entries that don't match the files on disk."""
+    from asset_pipeline.fsutil import sha256_file
+
+    problems = []
+    for path, entry in manifest.assets.items():
+        file_path = ASSETS_DIR / path
+        if not file_path.exists():
+            problems.append((path, "in manifest.json but missing on disk"))
+            continue
+        if entry.get("sha256") and sha256_file(file_path) != entry["sha256"]:
+            problems.append((path, "changed since manifest.json was written"))
+        for variant in entry.get("variants", []):
+            if not (ASSETS_DIR / variant["path"]).exists():
+                problems.append((path, f"variant {variant['path']} missing"))
+    return problems
+
+
+def validate(args):
+    """
+    Run the alpha quality gate over the selected targets on disk (without
+    trimming anything) and check manifest.json against the files. Exits 1 on
+    any problem.
+    """
+    from asset_pipeline.manifest import Manifest
+    from asset_pipeline.quality import check_output
+
+    spec, requests = selected_requests(args)
+    gate = spec.gate(lambda req: check_output(req, trim=False))
+    present = [req for req in requests if req.path.exists()]
+    problems = [(rel(req.path), problem) for req in present for problem in gate(req)]
+    checked = f"{len(present)}/{len(requests)} targets on disk checked"
+    if not args.no_manifest:
+        manifest = Manifest(MANIFEST_PATH, ASSETS_DIR)
+        problems.extend(manifest_problems(manifest))
+        checked += f", {len(manifest.assets)} manifest entries"
+
+    for path, problem in problems:
+        print(f"  FAILED: {path}: {problem}")
+    print(f"\n{checked}: {len(problems)} problem(s)")
+    if problems:
+        sys.exit(1)
+
+
+def add_group_option(parser):
+    parser.add_argument(
+        "--group",
+        nargs="+",
+        metavar="GROUP",
+        help=f"Spec groups, plus {CARDS_GROUP!r} for card art (default: all)",
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="ltcg-assets", description="LunchTable TCG asset pipeline"
+    )
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+    for name, (_, _, help_text) in FORWARDED.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    listing = commands.add_parser("list", help="List spec targets and whether each is current")
+    add_group_option(listing)
+    listing.set_defaults(run=list_targets)
+
+    manifest = commands.add_parser("manifest", help="Rebuild manifest.json from the files on disk")
+    add_group_option(manifest)
+    manifest.set_defaults(run=rebuild_manifest)
+
+    check = commands.add_parser("validate", help="Quality-check targets on disk and manifest.json, read-only")
+    add_group_option(check)
+    check.add_argument("--no-manifest", action="store_true", help="Skip the manifest.json checks")
+    check.set_defaults(run=validate)
+    return parser
+
+
+def main():
+    argv = sys.argv[1:]
+    # Forwarded arguments belong to the script, so they bypass this parser.
+    if argv and argv[0] in FORWARDED:
+        forward(argv[0], argv[1:])
+        return
+    args = build_parser().parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Losslessly recompress the PNGs in public/lunchtable and enforce image size
+budgets.
+
+Discord Activity frames load public/lunchtable/ straight from
+PUBLIC_ASSET_BASE, so every byte there is on the first paint. PNGs are
+recompressed losslessly (see asset_pipeline/recompress.py), then every
+image is checked against a per-file and a total size budget; the script
+exits 1 if either is exceeded. manifest.lunchtable entries of recompressed
+files move to the new content hash.
+
+Usage:
+  python3 scripts/optimize-pngs.py                       # Recompress, then check budgets
+  python3 scripts/optimize-pngs.py --dry-run             # Report what recompression would save
+  python3 scripts/optimize-pngs.py --check               # Budgets only (no Pillow needed)
+  python3 scripts/optimize-pngs.py --max-file-kb 1024 --max-total-mb 48 --top 20
+  python3 scripts/optimize-pngs.py apps/web-tanstack/public/lunchtable/pvp.png
+
+Requires numpy and Pillow (except for --check).
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from asset_pipeline.recompress import RecompressIndex, size_budget
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+INDEX_PATH = ASSETS_DIR / ".cache" / "recompress-index.json"
+MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+DEFAULT_MAX_FILE_KB = 3072
+DEFAULT_MAX_TOTAL_MB = 72
+
+
+def display(path):
+    try:
+        return str(path.relative_to(LUNCHTABLE_DIR))
+    except ValueError:
+        return str(path)
+
+
+def carry_placeholders(results):
+    """Point manifest.lunchtable entries of recompressed files at their new hash."""
+    if not MANIFEST_PATH.exists():
+        return 0
+    from asset_pipeline.manifest import Manifest
+
+    manifest = Manifest(MANIFEST_PATH, ASSETS_DIR)
+    moved = 0
+    for path, result in results.items():
+        if not result["written"]:
+            continue
+        try:
+            entry = manifest.lunchtable.get(str(path.relative_to(LUNCHTABLE_DIR)))
+        except ValueError:
+            continue
+        if entry and entry.get("sha256") == result["source_sha256"]:
+            entry["sha256"] = result["sha256"]
+            moved += 1
+    if moved:
+        manifest.save()
+    return moved
+
+
+def recompress(roots, args):
+    index = RecompressIndex(INDEX_PATH)
+    print("=== Recompressing PNGs ===\n")
+    results = index.refresh(roots, workers=args.workers, write=not args.dry_run)
+    shrunk = {path: r for path, r in results.items() if r["after"] < r["before"]}
+    for path, r in sorted(shrunk.items(), key=lambda item: item[1]["after"] - item[1]["before"]):
+        print(
+            f"  {display(path)}: {r['before'] // 1024}KB -> {r['after'] // 1024}KB "
+            f"({1 - r['after'] / r['before']:.0%} smaller, {r['mode']})"
+        )
+    for path, r in results.items():
+        if "skipped" in r:
+            print(f"  Skipped ({r['skipped']}): {display(path)}")
+
+    saved = sum(r["before"] - r["after"] for r in shrunk.values())
+    verb = "would save" if args.dry_run else "saved"
+    print(
+        f"\nPNGs: {len(results)} checked this run ({len(shrunk)} shrunk, {verb} {saved // 1024}KB); "
+        f"{index.saved_bytes() // 1024}KB saved in total across {len(index.hashes)} PNGs"
+    )
+    if args.dry_run:
+        return index.saved_bytes()
+    index.save()
+    moved = carry_placeholders(results)
+    if moved:
+        print(f"Manifest: {moved} lunchtable placeholders moved to the recompressed hash")
+    return index.saved_bytes()
+
+
+def check_budgets(roots, args):
+    max_file = args.max_file_kb * 1024
+    max_total = args.max_total_mb * 1024 * 1024
+    report = size_budget(roots, max_file, max_total)
+    print(f"\n=== Size budget: {args.max_file_kb}KB per file, {args.max_total_mb}MB total ===\n")
+    for path, size in report["files"][:args.top]:
+        flag = "  OVER" if size > max_file else ""
+        print(f"  {size // 1024:>7}KB  {display(path)}{flag}")
+    print(f"\nTotal: {report['total'] / (1024 * 1024):.1f}MB in {len(report['files'])} images")
+    for path, size in report["over_file"]:
+        print(f"  OVER BUDGET: {display(path)} is {size // 1024}KB (budget {args.max_file_kb}KB)")
+    if report["over_total"]:
+        print(f"  OVER BUDGET: total is {report['total'] // (1024 * 1024)}MB (budget {args.max_total_mb}MB)")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompress PNGs losslessly and check image size budgets")
+    parser.add_argument(
+        "paths", nargs="*", type=Path, help=f"Directories or files (default: {display(LUNCHTABLE_DIR)})"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without rewriting files")
+    parser.add_argument("--check", action="store_true", help="Only check the size budgets")
+    parser.add_argument(
+        "--max-file-kb", type=int, default=DEFAULT_MAX_FILE_KB,
+        help="Per-image budget (default %(default)sKB, a ratchet just above the largest committed PNG, ~2847KB)",
+    )
+    parser.add_argument(
+        "--max-total-mb", type=int, default=DEFAULT_MAX_TOTAL_MB,
+        help="Budget for all images (default %(default)sMB, a ratchet just above the committed ~66.1MB)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Largest files to list")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--json", help="Write the budget report to this JSON file")
+    args = parser.parse_args()
+
+    roots = [path.absolute() for path in args.paths] or [LUNCHTABLE_DIR]
+    missing = [str(path) for path in roots if not path.exists()]
+    if missing:
+        print(f"ERROR: not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    saved = None if args.check else recompress(roots, args)
+    report = check_budgets(roots, args)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "total_bytes": report["total"],
+            "saved_bytes": saved,
+            "largest": [{"path": display(p), "bytes": s} for p, s in report["files"][:args.top]],
+            "over_file": [{"path": display(p), "bytes": s} for p, s in report["over_file"]],
+            "over_total": report["over_total"],
+        }, indent=2))
+        print(f"\nReport written to {args.json}")
+    if report["over_file"] or report["over_total"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
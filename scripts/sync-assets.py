@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Upload new or changed assets to Vercel Blob.
+
+Uploads only what changed since the last sync, under the pathnames
+blobUrls.ts resolves (lunchtable/lunchtable/<path>,
+lunchtable/lunchtable/game-assets/<path>); an interrupted sync resumes
+where it stopped. See asset_pipeline/blob_sync.py.
+
+Usage:
+  python3 scripts/sync-assets.py --dry-run                 # Show what would upload
+  python3 scripts/sync-assets.py                           # Upload (needs BLOB_READ_WRITE_TOKEN)
+  python3 scripts/sync-assets.py --prune                   # Also delete blobs removed locally
+  python3 scripts/sync-assets.py --stub /tmp/blobs         # Sync to a local stand-in server
+  python3 scripts/sync-assets.py --stub /tmp/blobs --stub-fail-rate 0.2 --state /tmp/state.json
+
+Setup:
+  vercel env pull  # writes BLOB_READ_WRITE_TOKEN (see docs/VERCEL_BLOB_SETUP.md)
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from asset_pipeline.blob_stub import BlobStub
+from asset_pipeline.blob_sync import (
+    DEFAULT_API_URL,
+    BlobClient,
+    SyncState,
+    diff,
+    hash_tree,
+    manifest_objects,
+    pathname_for,
+    prune,
+    upload,
+)
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.scheduler import AdaptiveScheduler
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ASSETS_DIR = Path(
+    os.environ.get("LTCG_ASSETS_DIR", PROJECT_ROOT / "apps" / "web" / "public" / "game-assets")
+)
+LUNCHTABLE_DIR = PROJECT_ROOT / "apps" / "web-tanstack" / "public" / "lunchtable"
+STATE_PATH = ASSETS_DIR / ".cache" / "blob-sync-state.json"
+# Matches VERCEL_BLOB_BASE in apps/web-tanstack/src/app/lib/blobUrls.ts.
+BLOB_PREFIX = "lunchtable/lunchtable"
+
+
+def local_objects(state):
+    """{blob pathname: (path, sha256, bytes)} for everything that should be in the store."""
+    objects = {}
+    if LUNCHTABLE_DIR.exists():
+        for rel, obj in hash_tree(LUNCHTABLE_DIR, state.local_hashes).items():
+            objects[pathname_for(BLOB_PREFIX, rel)] = obj
+    manifest_path = ASSETS_DIR / "manifest.json"
+    if manifest_path.exists():
+        for rel, obj in manifest_objects(Manifest(manifest_path, ASSETS_DIR)).items():
+            objects[pathname_for(BLOB_PREFIX, f"game-assets/{rel}")] = obj
+    return objects
+
+
+def sync(args, state, api_url, token):
+    objects = local_objects(state)
+    changed, stale = diff(objects, state)
+    total = sum(obj[2] for obj in changed.values())
+    print(f"=== {len(objects)} local objects: {len(changed)} to upload ({total // 1024}KB), "
+          f"{len(stale)} no longer local ===\n")
+    if args.dry_run:
+        for pathname, (_, _, size) in sorted(changed.items()):
+            print(f"  upload  {pathname} ({size // 1024}KB)")
+        for pathname in stale:
+            print(f"  {'delete' if args.prune else 'stale '}  {pathname}")
+        state.save()
+        return 0
+
+    client = BlobClient(api_url, token)
+    with AdaptiveScheduler(concurrency=args.workers) as scheduler:
+        try:
+            uploaded, failed = upload(client, scheduler, changed, state)
+        finally:
+            state.save()
+    if args.prune and stale:
+        prune(client, state, stale)
+        state.save()
+        print(f"  Deleted {len(stale)} stale blobs")
+    client.close()
+    print(f"\nUploaded {len(uploaded)}/{len(changed)} objects over "
+          f"{client.connections_opened} connections")
+    if failed:
+        print(f"{len(failed)} failed; re-run to retry them")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload changed assets to Vercel Blob")
+    parser.add_argument("--dry-run", action="store_true", help="List the plan without uploading")
+    parser.add_argument("--prune", action="store_true", help="Delete blobs whose files are gone")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel uploads (default: 8)")
+    parser.add_argument("--state", type=Path, default=STATE_PATH, help="Sync state file")
+    parser.add_argument("--api-url", default=os.environ.get("BLOB_API_URL", DEFAULT_API_URL),
+                        help="Blob API base URL")
+    parser.add_argument("--stub", type=Path, help="Upload to a local stand-in server storing into this dir")
+    parser.add_argument("--stub-fail-rate", type=float, default=0.0,
+                        help="Fraction of stand-in requests answered with 503")
+    args = parser.parse_args()
+
+    state = SyncState(args.state)
+    if args.stub:
+        with BlobStub(args.stub, fail_rate=args.stub_fail_rate) as stub:
+            status = sync(args, state, stub.url, "stub")
+            print(f"Stand-in served {stub.requests} requests on {stub.connections} connections "
+                  f"({stub.failures} injected failures) into {args.stub}")
+        sys.exit(status)
+
+    token = os.environ.get("BLOB_READ_WRITE_TOKEN")
+    if not token and not args.dry_run:
+        print("ERROR: Set BLOB_READ_WRITE_TOKEN (vercel env pull)")
+        sys.exit(1)
+    sys.exit(sync(args, state, args.api_url, token))
+
+
+if __name__ == "__main__":
+    main()
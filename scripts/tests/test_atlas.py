@@ -0,0 +1,70 @@
+"""MaxRects packing in atlas.py on random sprite sizes."""
+
+import random
+import unittest
+
+from asset_pipeline.atlas import MaxRectsBin, pack
+
+PADDING = 2
+
+
+def overlaps(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+class PackTest(unittest.TestCase):
+    def check(self, sizes, max_size):
+        bins = pack(sizes, max_size=max_size, padding=PADDING)
+        placed = [key for _, positions in bins for key in positions]
+        self.assertEqual(sorted(placed), sorted(sizes))
+        for bin_, positions in bins:
+            padded = []
+            for key, (x, y) in positions.items():
+                w, h = sizes[key]
+                self.assertGreaterEqual(min(x, y), PADDING, key)
+                self.assertLessEqual(x + w + PADDING, bin_.used_width, key)
+                self.assertLessEqual(y + h + PADDING, bin_.used_height, key)
+                padded.append((x - PADDING, y - PADDING, w + 2 * PADDING, h + 2 * PADDING))
+            self.assertLessEqual(max(bin_.used_width, bin_.used_height), max_size)
+            for i, a in enumerate(padded):
+                for b in padded[i + 1:]:
+                    self.assertFalse(overlaps(a, b), (a, b))
+        return bins
+
+    def test_random_sizes(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            sizes = {
+                f"sprite-{i}": (rng.randint(1, 200), rng.randint(1, 200))
+                for i in range(rng.randint(1, 60))
+            }
+            with self.subTest(seed=seed):
+                self.check(sizes, max_size=512)
+
+    def test_overflow_opens_more_bins(self):
+        sizes = {f"card-{i}": (256, 384) for i in range(10)}
+        bins = self.check(sizes, max_size=1024)
+        # 3 columns x 2 rows of padded 260x388 cells per 1024px sheet.
+        self.assertEqual([len(positions) for _, positions in bins], [6, 4])
+
+    def test_sprite_filling_the_whole_sheet(self):
+        self.check({"big": (512 - 2 * PADDING, 512 - 2 * PADDING)}, max_size=512)
+
+    def test_oversize_sprite_is_rejected(self):
+        with self.assertRaises(ValueError) as ctx:
+            pack({"ok": (10, 10), "huge": (600, 10)}, max_size=512, padding=PADDING)
+        self.assertIn("huge", str(ctx.exception))
+        with self.assertRaises(ValueError):
+            pack({"edge": (512 - 2 * PADDING + 1, 10)}, max_size=512, padding=PADDING)
+
+    def test_bin_reports_when_full(self):
+        bin_ = MaxRectsBin(100, 100)
+        self.assertEqual(bin_.insert(100, 60), (0, 0))
+        self.assertIsNone(bin_.insert(50, 50))
+        self.assertIsNotNone(bin_.insert(50, 40))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""--batch flow end to end on the file-based batch backend."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.backends import MockImageClient
+from asset_pipeline.batch import BatchSubmission, LocalBatchBackend
+from asset_pipeline.cache import GenerationCache
+from asset_pipeline.image_request import ImageRequest
+from asset_pipeline.journal import DONE, QUEUED, Journal
+from asset_pipeline.postprocess import finish_run
+from asset_pipeline.quality import check_output
+from asset_pipeline.render import render_request
+from asset_pipeline.runner import Runner
+from asset_pipeline.scheduler import AdaptiveScheduler
+
+COUNT = 12
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.assets = self.tmp / "game-assets"
+        (self.assets / "icons").mkdir(parents=True)
+        self.cache = GenerationCache(self.assets / ".cache" / "generations", self.assets)
+        self.journal = Journal(self.assets / ".cache" / "journal.jsonl", self.assets)
+        self.addCleanup(self.journal.close)
+        self.live = MockImageClient(latency=0.0)
+        self.requests = [
+            ImageRequest(
+                f"icon-{i}", self.assets / "icons" / f"icon-{i}.png", f"icon number {i}",
+                size="64x64", source={"kind": "icon"},
+            )
+            for i in range(COUNT)
+        ]
+
+    def backend(self, **options):
+        images = MockImageClient(latency=0.0, **options).images
+        return LocalBatchBackend(self.tmp / "batches-local", images)
+
+    def submission(self, backend):
+        return BatchSubmission(backend, self.assets / ".cache" / "batches", self.journal)
+
+    def run_batch(self, submission):
+        scheduler = AdaptiveScheduler(4, base_delay=0.01)
+        self.addCleanup(scheduler.close)
+        render = submission.renderer(lambda req: render_request(self.live, None, req))
+        runner = Runner(render, scheduler, self.cache, self.journal, validate=check_output)
+        ok, failed = submission.run(runner, self.requests, poll_seconds=0)
+        return runner, ok, failed
+
+    def queued_lines(self):
+        counts = {}
+        for line in self.journal.path.read_text().splitlines():
+            record = json.loads(line)
+            if record["state"] == QUEUED:
+                counts[record["key"]] = counts.get(record["key"], 0) + 1
+        return counts
+
+    def test_submit_poll_fan_out(self):
+        backend = self.backend()
+        runner, ok, failed = self.run_batch(self.submission(backend))
+        self.assertEqual((ok, failed), (COUNT, []))
+        self.assertEqual(self.live.images.calls, 0)
+        self.assertEqual(backend.images.calls, COUNT)
+        for req in self.requests:
+            self.assertEqual(check_output(req, trim=False), [])
+            self.assertEqual(self.journal.state(req), DONE)
+        self.assertEqual(set(self.queued_lines().values()), {1})
+        self.assertFalse((self.assets / ".cache" / "batches" / "pending.json").exists())
+
+        manifest = finish_run(runner.touched, self.assets, variants=False, atlases=False)
+        self.assertEqual(set(manifest.assets), {f"icons/icon-{i}.png" for i in range(COUNT)})
+        self.assertTrue(all(entry["sha256"] for entry in manifest.assets.values()))
+
+        # Everything is cached now: a second run submits nothing.
+        _, ok, _ = self.run_batch(self.submission(backend))
+        self.assertEqual(ok, COUNT)
+        self.assertEqual(backend.images.calls, COUNT)
+
+    def test_failed_lines_render_live(self):
+        backend = self.backend(error_rate=0.4, seed=7)
+        _, ok, failed = self.run_batch(self.submission(backend))
+        self.assertEqual((ok, failed), (COUNT, []))
+        errors = (backend.root / next(backend.root.iterdir()) / "errors.jsonl").read_text().splitlines()
+        self.assertTrue(errors)
+        self.assertEqual(self.live.images.calls, len(errors))
+
+    def test_resume_from_pending(self):
+        backend = self.backend()
+        self.submission(backend).submit(self.requests, self.cache)
+        self.assertTrue((self.assets / ".cache" / "batches" / "pending.json").exists())
+
+        # A new process finds pending.json and polls that batch instead of submitting another.
+        _, ok, failed = self.run_batch(self.submission(backend))
+        self.assertEqual((ok, failed), (COUNT, []))
+        self.assertEqual(len(list(backend.root.iterdir())), 1)
+        self.assertEqual(self.live.images.calls, 0)
+        self.assertEqual(set(self.queued_lines().values()), {1})
+
+    def test_resume_refuses_a_different_selection(self):
+        backend = self.backend()
+        self.submission(backend).submit(self.requests, self.cache)
+        pending = self.assets / ".cache" / "batches" / "pending.json"
+        self.assertEqual(len(json.loads(pending.read_text())["keys"]), COUNT)
+
+        # Resuming with half the requests would drop the other half's results.
+        full, self.requests = self.requests, self.requests[: COUNT // 2]
+        with self.assertRaises(SystemExit) as ctx:
+            self.run_batch(self.submission(backend))
+        self.assertIn("pending.json", str(ctx.exception))
+        self.assertTrue(pending.exists())
+        self.assertEqual(self.live.images.calls, 0)
+
+        # A wider selection resumes; the requests outside the batch render live.
+        self.requests = full + [
+            ImageRequest("extra", self.assets / "icons" / "extra.png", "one more icon", size="64x64")
+        ]
+        _, ok, failed = self.run_batch(self.submission(backend))
+        self.assertEqual((ok, failed), (COUNT + 1, []))
+        self.assertEqual((backend.images.calls, self.live.images.calls), (COUNT, 1))
+        self.assertFalse(pending.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
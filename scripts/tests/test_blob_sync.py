@@ -0,0 +1,139 @@
+"""blob_sync uploads against the local Blob stub."""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.blob_stub import BlobStub
+from asset_pipeline.blob_sync import BlobClient, SyncState, diff, hash_tree, upload
+from asset_pipeline.scheduler import AdaptiveScheduler
+
+PART_SIZE = 1024
+THRESHOLD = 4 * 1024
+
+
+class FlakyComplete:
+    """A BlobClient whose complete_multipart always fails with a connection error."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def complete_multipart(self, *args):
+        raise ConnectionError("connection reset")
+
+
+class UploadTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.local = self.tmp / "local"
+        self.local.mkdir()
+        self.state_path = self.tmp / "state.json"
+        self.write("small/a.png", 100, 1)
+        self.write("small/b.json", 2000, 2)
+        self.write("big.png", 3 * THRESHOLD + 100, 3)
+
+    def write(self, rel, size, seed):
+        path = self.local / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes((seed + i * 7) % 251 for i in range(size)))
+
+    def stub(self, **options):
+        stub = BlobStub(self.tmp / "remote", **options)
+        stub.__enter__()
+        self.addCleanup(stub.__exit__, None, None, None)
+        return stub
+
+    def sync(self, stub, client=None, max_attempts=5, save_every=1):
+        state = SyncState(self.state_path, save_every=save_every)
+        changed, _ = diff(hash_tree(self.local, state.local_hashes), state)
+        if client is None:
+            client = BlobClient(stub.url, "token")
+            self.addCleanup(client.close)
+        with AdaptiveScheduler(4, max_attempts=max_attempts, base_delay=0.01) as scheduler:
+            uploaded, failed = upload(client, scheduler, changed, state, PART_SIZE, THRESHOLD)
+        return state, uploaded, failed
+
+    def assertMirrored(self, stub):
+        for path in self.local.rglob("*"):
+            if path.is_file():
+                remote = stub.root / path.relative_to(self.local)
+                self.assertEqual(remote.read_bytes(), path.read_bytes(), path.name)
+
+    def saved(self):
+        return json.loads(self.state_path.read_text())
+
+    def test_put_and_multipart(self):
+        stub = self.stub()
+        _, uploaded, failed = self.sync(stub)
+        self.assertEqual(failed, [])
+        self.assertEqual(sorted(uploaded), ["big.png", "small/a.png", "small/b.json"])
+        self.assertMirrored(stub)
+        # 2 puts, then create + 13 parts + complete for big.png.
+        self.assertEqual(stub.requests, 2 + 1 + 13 + 1)
+        # Saved by the jobs themselves, without a final save().
+        saved = self.saved()
+        self.assertEqual(sorted(saved["objects"]), sorted(uploaded))
+        self.assertEqual(saved["multipart"], {})
+
+    def test_retries_injected_failures(self):
+        stub = self.stub(fail_rate=0.3, seed=4)
+        _, uploaded, failed = self.sync(stub, max_attempts=10)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(uploaded), 3)
+        self.assertGreater(stub.failures, 0)
+        self.assertMirrored(stub)
+
+    def test_second_run_uploads_nothing(self):
+        stub = self.stub()
+        state, _, _ = self.sync(stub)
+        state.save()
+        requests = stub.requests
+        _, uploaded, failed = self.sync(stub)
+        self.assertEqual((uploaded, failed), ([], []))
+        self.assertEqual(stub.requests, requests)
+
+        self.write("small/a.png", 120, 9)
+        os.utime(self.local / "small/a.png", ns=(1, 1))
+        _, uploaded, _ = self.sync(stub)
+        self.assertEqual(uploaded, ["small/a.png"])
+        self.assertEqual(stub.requests, requests + 1)
+
+    def test_interrupted_multipart_resumes(self):
+        stub = self.stub()
+        client = BlobClient(stub.url, "token")
+        self.addCleanup(client.close)
+        _, uploaded, failed = self.sync(stub, client=FlakyComplete(client), max_attempts=1)
+        self.assertEqual(failed, ["big.png"])
+        entry = self.saved()["multipart"]["big.png"]
+        self.assertEqual(len(entry["parts"]), 13)
+
+        requests = stub.requests
+        _, uploaded, failed = self.sync(stub)
+        self.assertEqual((uploaded, failed), (["big.png"], []))
+        # Only the complete call: the parts were already up.
+        self.assertEqual(stub.requests, requests + 1)
+        self.assertMirrored(stub)
+
+    def test_rejected_multipart_starts_over(self):
+        stub = self.stub()
+        state = SyncState(self.state_path)
+        state.start_multipart("big.png", hash_tree(self.local, {})["big.png"][1], "big.png", "gone")
+        state.save()
+        _, _, failed = self.sync(stub)
+        self.assertEqual(failed, ["big.png"])
+        self.assertNotIn("big.png", self.saved()["multipart"])
+
+        _, uploaded, failed = self.sync(stub)
+        self.assertEqual((uploaded, failed), (["big.png"], []))
+        self.assertMirrored(stub)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""GenerationCache: keys, shared renders, adopted files and eviction."""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from asset_pipeline.backends import MockImageClient, solid_png
+from asset_pipeline.cache import GenerationCache, cached_jobs, plan
+from asset_pipeline.image_request import ImageRequest
+from asset_pipeline.render import render_request
+from asset_pipeline.runner import Runner
+from asset_pipeline.scheduler import AdaptiveScheduler, Job
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_key_is_stable_and_ignores_metadata(self):
+        a = ImageRequest("a", Path("/x/a.png"), "a red card", size="64x64")
+        b = ImageRequest(
+            "b", Path("/y/b.png"), "a red card", size="64x64", label="B", source={"kind": "card"}
+        )
+        self.assertEqual(a.cache_key(), b.cache_key())
+        reloaded = ImageRequest.from_dict(a.to_dict(Path("/x")), Path("/x"))
+        self.assertEqual(a.cache_key(), reloaded.cache_key())
+        self.assertEqual(len(a.cache_key()), 64)
+
+    def test_key_changes_with_every_render_field(self):
+        base = dict(name="a", path=Path("/x/a.png"), prompt="a red card", size="64x64")
+        keys = {ImageRequest(**base).cache_key()}
+        for field, value in (
+            ("prompt", "a blue card"), ("model", "gpt-image-2"), ("size", "32x32"),
+            ("background", "opaque"), ("quality", "low"),
+        ):
+            keys.add(ImageRequest(**{**base, field: value}).cache_key())
+        self.assertEqual(len(keys), 6)
+
+    def test_key_follows_reference_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ref = Path(tmp) / "ref.png"
+            ref.write_bytes(solid_png(8, 8, (1, 2, 3, 255)))
+            req = ImageRequest("a", Path(tmp) / "a.png", "edit it", reference=ref)
+            before = req.cache_key()
+            self.assertEqual(req.cache_key(), before)
+            ref.write_bytes(solid_png(8, 8, (3, 2, 1, 255)))
+            self.assertNotEqual(req.cache_key(), before)
+
+
+class CachedJobsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.assets = Path(tmp.name) / "game-assets"
+        (self.assets / "icons").mkdir(parents=True)
+        self.client = MockImageClient(latency=0.0)
+
+    def cache(self, **options):
+        return GenerationCache(self.assets / ".cache" / "generations", self.assets, **options)
+
+    def request(self, name, prompt=None):
+        return ImageRequest(
+            name, self.assets / "icons" / f"{name}.png", prompt or f"icon {name}", size="32x32"
+        )
+
+    def generate(self, requests, cache=None):
+        with AdaptiveScheduler(2) as scheduler:
+            runner = Runner(
+                lambda req: render_request(self.client, None, req), scheduler, cache or self.cache()
+            )
+            self.assertEqual(runner.run(requests), (len(requests), []))
+        return runner
+
+    def test_shared_key_renders_once(self):
+        requests = [self.request(name, "the same icon") for name in ("a", "b", "c")]
+        requests.append(self.request("d"))
+        self.assertEqual(
+            [status for _, status in plan(self.cache(), requests)],
+            ["generate", "shared", "shared", "generate"],
+        )
+        jobs, skipped, touched = cached_jobs(
+            self.cache(), requests, lambda req: Job(req.name, req.label, lambda: None)
+        )
+        self.assertEqual(([len(job.requests) for job in jobs], skipped, touched), ([3, 1], [], []))
+
+        runner = self.generate(requests)
+        self.assertEqual(self.client.images.calls, 2)
+        self.assertEqual(len(runner.touched), 4)
+        contents = {req.path.read_bytes() for req in requests[:3]}
+        self.assertEqual(len(contents), 1)
+
+    def test_unchanged_and_reused(self):
+        requests = [self.request("a"), self.request("b")]
+        self.generate(requests)
+        runner = self.generate(requests)
+        self.assertEqual((runner.touched, runner.unchanged), ([], requests))
+
+        requests[0].path.unlink()
+        runner = self.generate(requests)
+        self.assertEqual(runner.touched, [requests[0]])
+        self.assertEqual(self.client.images.calls, 2)
+
+    def test_untracked_files_are_adopted(self):
+        req = self.request("a")
+        req.path.write_bytes(solid_png(32, 32, (9, 9, 9, 255)))
+        cache = self.cache()
+        self.assertEqual(plan(cache, [req]), [(req, "adopt")])
+        runner = self.generate([req], cache)
+        self.assertEqual(runner.touched, [req])
+        self.assertEqual(self.client.images.calls, 0)
+        self.assertTrue(self.cache().is_current(req.path, req.cache_key()))
+
+        # Once tracked, a new prompt renders over the file instead of adopting it.
+        edited = self.request("a", "a different icon")
+        self.assertEqual(plan(self.cache(), [edited]), [(edited, "generate")])
+        self.generate([edited])
+        self.assertEqual(self.client.images.calls, 1)
+
+    def test_least_recently_used_objects_are_evicted(self):
+        requests = [self.request(name) for name in ("a", "b", "c")]
+        size = 0
+        for i, req in enumerate(requests):
+            req.path.write_bytes(solid_png(32, 32, (i, i, i, 255)))
+            size = max(size, req.path.stat().st_size)
+        cache = self.cache(max_bytes=int(size * 2.5))
+        keys = [req.cache_key() for req in requests]
+        cache.store(keys[0], requests[0].path)
+        time.sleep(0.01)
+        cache.store(keys[1], requests[1].path)
+        time.sleep(0.01)
+        self.assertTrue(cache.is_current(requests[0].path, keys[0]))  # a is now the newest
+        time.sleep(0.01)
+        cache.store(keys[2], requests[2].path)
+
+        reopened = self.cache(max_bytes=int(size * 2.5))
+        self.assertEqual([reopened.contains(key) for key in keys], [True, False, True])
+        objects = list((self.assets / ".cache" / "generations" / "objects").rglob("*.png"))
+        self.assertEqual(len(objects), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""Manifest aliasing of byte-identical images across both trees."""
+
+import unittest
+
+from asset_pipeline.dedup import alias_duplicates
+
+
+class AliasDuplicatesTest(unittest.TestCase):
+    def test_aliases_across_trees(self):
+        files = {
+            "game-assets/board/playmat.png": {"sha256": "a"},
+            "game-assets/cards/logo-copy.png": {"sha256": "b"},
+            "lunchtable/logo.png": {"sha256": "b"},
+            "lunchtable/menu/logo.png": {"sha256": "b"},
+            "lunchtable/pvp.png": {"sha256": "c"},
+        }
+        assets = {"board/playmat.png": {}, "cards/logo-copy.png": {"alias_of": "game-assets/board/playmat.png"}}
+        lunchtable = {"logo.png": {"alias_of": "lunchtable/pvp.png"}, "menu/logo.png": {}, "pvp.png": {}}
+
+        aliases = alias_duplicates({"game-assets": assets, "lunchtable": lunchtable}, files)
+
+        self.assertEqual(aliases, {
+            "game-assets/cards/logo-copy.png": "lunchtable/logo.png",
+            "lunchtable/menu/logo.png": "lunchtable/logo.png",
+        })
+        self.assertEqual(assets["cards/logo-copy.png"]["alias_of"], "lunchtable/logo.png")
+        self.assertEqual(lunchtable["menu/logo.png"]["alias_of"], "lunchtable/logo.png")
+        # Canonical files and files without a copy carry no alias, stale ones are cleared.
+        self.assertNotIn("alias_of", lunchtable["logo.png"])
+        self.assertNotIn("alias_of", assets["board/playmat.png"])
+        self.assertNotIn("alias_of", lunchtable["pvp.png"])
+
+    def test_unindexed_entries_are_left_alone(self):
+        assets = {"cards/new.png": {"alias_of": "lunchtable/logo.png"}}
+        self.assertEqual(alias_duplicates({"game-assets": assets}, {}), {})
+        self.assertNotIn("alias_of", assets["cards/new.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Startup cost of the ltcg-assets.py entry point."""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+# Same budget as bench-asset-pipeline.py --imports-only.
+IMPORT_BUDGET_MS = 150.0
+DEFERRED_MODULES = ("openai", "pandas", "numpy", "PIL")
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)")
+
+
+def importtime(args):
+    """(total ms, {module}) for everything `python -X importtime` reports while running `args`."""
+    with tempfile.TemporaryDirectory() as assets_dir:
+        env = {**os.environ, "LTCG_ASSETS_DIR": assets_dir}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=SCRIPTS_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+    total_us, modules = 0, set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            cumulative, indent, module = match.groups()
+            modules.add(module)
+            if indent == "":
+                total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+class LtcgAssetsImportTest(unittest.TestCase):
+    def test_list_stays_light(self):
+        # Card art needs the compiled card index, so list just the spec groups.
+        ms, modules = importtime(["ltcg-assets.py", "list", "--group", "board", "frames"])
+        loaded = sorted(m for m in modules if m.split(".")[0] in DEFERRED_MODULES)
+        self.assertEqual(loaded, [])
+        self.assertLess(ms, IMPORT_BUDGET_MS)
+
+    def test_help_stays_light(self):
+        ms, modules = importtime(["ltcg-assets.py", "--help"])
+        self.assertNotIn("asset_pipeline", {m.split(".")[0] for m in modules})
+        self.assertLess(ms, IMPORT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
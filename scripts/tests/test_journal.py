@@ -0,0 +1,88 @@
+"""Journal replay, compaction and the --resume / --retry-failed selections."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.image_request import ImageRequest
+from asset_pipeline.journal import COMPACT_RATIO, DONE, FAILED, IN_FLIGHT, UNFINISHED, Journal
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.assets = Path(tmp.name)
+        self.path = self.assets / ".cache" / "journal.jsonl"
+        self.requests = {
+            name: ImageRequest(name, self.assets / "cards" / f"{name}.png", f"prompt for {name}",
+                               source={"kind": "card-art", "card": name})
+            for name in ("done", "failed", "flying", "queued")
+        }
+
+    def open(self):
+        journal = Journal(self.path, self.assets)
+        self.addCleanup(journal.close)
+        return journal
+
+    def write_run(self):
+        with Journal(self.path, self.assets) as journal:
+            journal.queue(self.requests.values())
+            journal.record(self.requests["done"], IN_FLIGHT, attempt=1)
+            journal.record(self.requests["done"], DONE, attempt=1)
+            journal.record(self.requests["failed"], FAILED, attempt=3, error=RuntimeError("boom"))
+            journal.record(self.requests["flying"], IN_FLIGHT, attempt=1)
+
+    def names(self, requests):
+        return sorted(req.name for req in requests)
+
+    def test_resume_and_retry_failed_selections(self):
+        self.write_run()
+        journal = self.open()
+        self.assertEqual(self.names(journal.pending(UNFINISHED)), ["failed", "flying", "queued"])
+        self.assertEqual(self.names(journal.pending((FAILED,))), ["failed"])
+        self.assertEqual(self.names(journal.pending((DONE,))), ["done"])
+        replayed = journal.pending((FAILED,))[0]
+        original = self.requests["failed"]
+        self.assertEqual(replayed.path, original.path)
+        self.assertEqual(replayed.cache_key(), original.cache_key())
+        self.assertEqual(replayed.source, original.source)
+        self.assertEqual(journal.summary(), {DONE: 1, FAILED: 1, IN_FLIGHT: 1, "queued": 1})
+
+    def test_torn_last_line_is_ignored(self):
+        self.write_run()
+        with open(self.path, "a") as f:
+            f.write('{"ts": 1, "run": "x", "key": "cards/flying.png", "state": "do')
+        journal = self.open()
+        self.assertEqual(journal.state(self.requests["flying"]), IN_FLIGHT)
+        self.assertEqual(self.names(journal.pending(UNFINISHED)), ["failed", "flying", "queued"])
+        # Appending after the torn line still yields a readable journal.
+        journal.record(self.requests["flying"], DONE)
+        journal.close()
+        self.assertEqual(self.open().state(self.requests["flying"]), DONE)
+
+    def test_compaction_keeps_latest_states_and_requests(self):
+        self.write_run()
+        with Journal(self.path, self.assets) as journal:
+            for attempt in range(COMPACT_RATIO * len(self.requests)):
+                journal.record(self.requests["flying"], IN_FLIGHT, attempt=attempt)
+        lines = len(self.path.read_text().splitlines())
+        self.assertGreater(lines, COMPACT_RATIO * len(self.requests))
+
+        journal = self.open()
+        self.assertEqual(len(self.path.read_text().splitlines()), len(self.requests))
+        self.assertEqual(journal.state(self.requests["done"]), DONE)
+        self.assertEqual(self.names(journal.pending(UNFINISHED)), ["failed", "flying", "queued"])
+
+    def test_requeueing_an_unchanged_request_writes_nothing(self):
+        self.write_run()
+        journal = self.open()
+        lines = len(self.path.read_text().splitlines())
+        journal.queue([self.requests["queued"]])
+        self.assertEqual(len(self.path.read_text().splitlines()), lines)
+        journal.queue([self.requests["failed"]])
+        self.assertEqual(len(self.path.read_text().splitlines()), lines + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Post-processing after a run whose outputs were already current."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.backends import MockImageClient
+from asset_pipeline.cache import GenerationCache
+from asset_pipeline.image_request import ImageRequest
+from asset_pipeline.manifest import Manifest, png_info
+from asset_pipeline.postprocess import finish_run
+from asset_pipeline.render import render_request
+from asset_pipeline.runner import Runner
+from asset_pipeline.scheduler import AdaptiveScheduler
+from asset_pipeline.variants import existing_variants
+
+COUNT = 4
+
+
+class InterruptedRunTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.assets = Path(tmp.name) / "game-assets"
+        (self.assets / "cards").mkdir(parents=True)
+        self.client = MockImageClient(latency=0.0)
+        self.requests = [
+            ImageRequest(
+                f"card-{i}", self.assets / "cards" / f"card-{i}.png", f"card number {i}",
+                size="64x96", source={"kind": "card-art", "card": f"Card {i}"},
+            )
+            for i in range(COUNT)
+        ]
+
+    def run_once(self):
+        """A fresh process: new cache handle, runner and scheduler."""
+        cache = GenerationCache(self.assets / ".cache" / "generations", self.assets)
+        with AdaptiveScheduler(2) as scheduler:
+            runner = Runner(lambda req: render_request(self.client, None, req), scheduler, cache)
+            ok, failed = runner.run(self.requests)
+        self.assertEqual((ok, failed), (COUNT, []))
+        return runner
+
+    def finish(self, runner, variants=True):
+        return finish_run(
+            runner.touched, self.assets, variants=variants, atlases=False, unchanged=runner.unchanged
+        )
+
+    def test_rerun_after_crash_before_manifest(self):
+        self.run_once()  # killed before finish_run
+        runner = self.run_once()
+        self.assertEqual((runner.touched, len(runner.unchanged)), ([], COUNT))
+        self.assertEqual(self.client.images.calls, COUNT)
+
+        manifest = self.finish(runner)
+        self.assertEqual(set(manifest.assets), {f"cards/card-{i}.png" for i in range(COUNT)})
+        for entry in manifest.assets.values():
+            self.assertEqual(entry["source"]["kind"], "card-art")
+            self.assertTrue(entry["variants"])
+            for variant in entry["variants"]:
+                self.assertTrue((self.assets / variant["path"]).exists())
+
+    def test_rerun_fills_in_missing_variants(self):
+        self.finish(self.run_once(), variants=False)
+        manifest = Manifest(self.assets / "manifest.json", self.assets)
+        self.assertEqual(len(manifest.assets), COUNT)
+        self.assertFalse(any(entry.get("variants") for entry in manifest.assets.values()))
+
+        manifest = self.finish(self.run_once())
+        self.assertTrue(all(entry.get("variants") for entry in manifest.assets.values()))
+
+    def test_current_manifest_is_left_alone(self):
+        self.finish(self.run_once())
+        before = (self.assets / "manifest.json").read_text()
+        self.finish(self.run_once())
+        self.assertEqual((self.assets / "manifest.json").read_text(), before)
+
+    def test_variants_on_disk_match_the_manifest(self):
+        recorded = self.finish(self.run_once()).assets
+        rebuilt = Manifest(self.assets / "rebuilt.json", self.assets)
+        for req in self.requests:
+            found = existing_variants(req.path, self.assets, png_info(req.path)[:2])
+            rebuilt.update(req.path, source=req.source, variants=found)
+        for path, entry in rebuilt.assets.items():
+            self.assertEqual(entry["variants"], recorded[path]["variants"])
+
+        self.requests[0].path.touch()  # newer than its variants
+        self.assertEqual(existing_variants(self.requests[0].path, self.assets, (64, 96)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
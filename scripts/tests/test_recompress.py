@@ -0,0 +1,103 @@
+"""recompress_png round trips: same RGBA pixels, never a bigger file."""
+
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.deps import load_numpy, load_pillow
+from asset_pipeline.recompress import recompress_png
+
+
+class RoundTripTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.np = load_numpy()
+        self.Image = load_pillow()
+        self.rng = self.np.random.default_rng(7)
+
+    def blocks(self, channels, levels):
+        """64x64 of 8x8 blocks drawn from `levels`: compressible but not trivial."""
+        small = self.rng.choice(levels, size=(8, 8, channels)).astype(self.np.uint8)
+        return small.repeat(8, axis=0).repeat(8, axis=1)
+
+    def save(self, name, im, **params):
+        path = self.dir / f"{name}.png"
+        # compress_level=1 leaves room for recompression to win.
+        im.save(path, format="PNG", compress_level=1, **params)
+        return path
+
+    def pixels(self, path):
+        with self.Image.open(path) as im:
+            return self.np.asarray(im.convert("RGBA"))
+
+    def check(self, path, shrinks=True):
+        before = self.pixels(path)
+        size = path.stat().st_size
+        result = recompress_png(path)
+        self.assertNotIn("skipped", result)
+        self.assertEqual(result["before"], size)
+        self.assertLessEqual(result["after"], result["before"])
+        self.assertEqual(path.stat().st_size, result["after"])
+        self.assertEqual(result["sha256"], hashlib.sha256(path.read_bytes()).hexdigest())
+        self.assertTrue(self.np.array_equal(self.pixels(path), before))
+        if shrinks:
+            self.assertTrue(result["written"])
+            self.assertLess(result["after"], result["before"])
+        return result
+
+    def test_rgba_keeps_colour_under_full_transparency(self):
+        rgba = self.blocks(4, [0, 40, 200, 255])
+        rgba[:8, :, 3] = 0  # invisible, but the RGB underneath must survive too
+        rgba[8:16, :, 3] = 128
+        self.check(self.save("rgba", self.Image.fromarray(rgba)))
+
+    def test_opaque_rgba_drops_alpha(self):
+        rgba = self.rng.integers(0, 256, size=(64, 64, 4), dtype=self.np.uint8)  # > 256 colours
+        rgba[..., 3] = 255
+        result = self.check(self.save("opaque", self.Image.fromarray(rgba)))
+        self.assertEqual(result["mode"], "RGB")
+
+    def test_grey_with_alpha(self):
+        grey = self.blocks(1, list(range(0, 256, 5)))[..., 0]
+        rgba = self.np.dstack([grey, grey, grey, grey[::-1]])
+        self.check(self.save("grey", self.Image.fromarray(rgba)))
+
+    def test_palette_with_transparency(self):
+        rgba = self.blocks(4, [0, 255])
+        rgba[..., 3] = self.np.where(rgba[..., 0] > 0, 255, 64)
+        im = self.Image.fromarray(rgba)
+        result = self.check(self.save("palette", im))
+        self.assertEqual(result["mode"], "P")
+
+        # An already-paletted source with tRNS goes through the same check.
+        self.check(self.dir / "palette.png", shrinks=False)
+
+    def test_small_file_is_left_as_is(self):
+        path = self.dir / "tiny.png"
+        self.Image.new("RGBA", (1, 1), (1, 2, 3, 4)).save(path, format="PNG", optimize=True)
+        original = path.read_bytes()
+        result = self.check(path, shrinks=False)
+        if not result["written"]:
+            self.assertEqual(path.read_bytes(), original)
+
+    def test_dry_run_writes_nothing(self):
+        path = self.save("rgb", self.Image.fromarray(self.blocks(3, [0, 100, 255])))
+        original = path.read_bytes()
+        result = recompress_png(path, write=False)
+        self.assertLess(result["after"], result["before"])
+        self.assertFalse(result["written"])
+        self.assertEqual(path.read_bytes(), original)
+
+    def test_sixteen_bit_is_skipped(self):
+        path = self.dir / "deep.png"
+        self.Image.new("I;16", (4, 4), 1000).save(path, format="PNG")
+        original = path.read_bytes()
+        self.assertIn("skipped", recompress_png(path))
+        self.assertEqual(path.read_bytes(), original)
+
+
+if __name__ == "__main__":
+    unittest.main()
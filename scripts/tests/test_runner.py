@@ -0,0 +1,59 @@
+"""Quality rejects across repeated Runner.run() calls, as --watch makes them."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.backends import MockImageClient
+from asset_pipeline.cache import GenerationCache
+from asset_pipeline.image_request import ImageRequest
+from asset_pipeline.render import render_request
+from asset_pipeline.runner import Runner
+from asset_pipeline.scheduler import AdaptiveScheduler
+
+
+class RejectBudgetTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.assets = Path(tmp.name) / "game-assets"
+        (self.assets / "icons").mkdir(parents=True)
+        self.client = MockImageClient(latency=0.0)
+        self.seen = set()
+
+    def first_render_of_each_prompt(self, req):
+        """Reject the first output for every prompt, accept the retry."""
+        if req.prompt in self.seen:
+            return []
+        self.seen.add(req.prompt)
+        return ["first try"]
+
+    def request(self, prompt):
+        return ImageRequest("icon", self.assets / "icons" / "icon.png", prompt, size="64x64")
+
+    def test_each_run_gets_its_own_budget(self):
+        cache = GenerationCache(self.assets / ".cache" / "generations", self.assets)
+        with AdaptiveScheduler(1) as scheduler:
+            runner = Runner(
+                lambda req: render_request(self.client, None, req), scheduler, cache,
+                validate=self.first_render_of_each_prompt, quality_retries=1,
+            )
+            for prompt in ("an icon", "an edited icon", "edited again"):
+                self.assertEqual(runner.run([self.request(prompt)]), (1, []))
+        self.assertEqual(self.client.images.calls, 6)
+
+    def test_budget_spans_scheduler_retries(self):
+        cache = GenerationCache(self.assets / ".cache" / "generations", self.assets)
+        with AdaptiveScheduler(1) as scheduler:
+            runner = Runner(
+                lambda req: render_request(self.client, None, req), scheduler, cache,
+                validate=lambda req: ["always wrong"], quality_retries=2,
+            )
+            ok, failed = runner.run([self.request("an icon")])
+        self.assertEqual((ok, failed), (0, ["icon"]))
+        self.assertEqual(self.client.images.calls, 3)
+        self.assertFalse((self.assets / "icons" / "icon.png").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""AdaptiveScheduler: which errors are retried, Retry-After, and AIMD concurrency."""
+
+import time
+import unittest
+
+from asset_pipeline.backends import MockAPIError, MockImageClient
+from asset_pipeline.scheduler import AdaptiveScheduler, Job, is_retryable, retry_after
+
+
+def flaky(errors, value="ok"):
+    """A job body that raises each of `errors` in turn, then returns `value`."""
+    errors = list(errors)
+
+    def run():
+        if errors:
+            raise errors.pop(0)
+        return value
+
+    return run
+
+
+class RetryableTest(unittest.TestCase):
+    def test_status_codes(self):
+        for code in (408, 409, 429, 500, 502, 503, 504):
+            self.assertTrue(is_retryable(MockAPIError(code, "x")), code)
+        for code in (400, 401, 403, 404, 413, 422):
+            self.assertFalse(is_retryable(MockAPIError(code, "x")), code)
+
+    def test_connection_errors(self):
+        class APITimeoutError(Exception):
+            pass
+
+        self.assertTrue(is_retryable(ConnectionResetError()))
+        self.assertTrue(is_retryable(TimeoutError()))
+        self.assertTrue(is_retryable(APITimeoutError()))
+        self.assertFalse(is_retryable(ValueError("bad size")))
+
+    def test_retry_after_header(self):
+        self.assertEqual(retry_after(MockAPIError(429, "x", {"retry-after": "1.5"})), 1.5)
+        self.assertIsNone(retry_after(MockAPIError(429, "x", {"retry-after": "soon"})))
+        self.assertIsNone(retry_after(MockAPIError(500, "x")))
+        self.assertIsNone(retry_after(ConnectionError()))
+
+
+class SchedulerTest(unittest.TestCase):
+    def scheduler(self, concurrency=4, **options):
+        scheduler = AdaptiveScheduler(concurrency, **options)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    def test_client_errors_are_not_retried(self):
+        scheduler = self.scheduler(base_delay=0.0)
+        [result] = scheduler.run([Job("a", "a", flaky([MockAPIError(404, "gone")]))])
+        self.assertEqual((result.ok, result.attempts, result.error.status_code), (False, 1, 404))
+        self.assertEqual(scheduler.limit, 4)
+
+    def test_retryable_errors_are_retried(self):
+        scheduler = self.scheduler(base_delay=0.0)
+        errors = [MockAPIError(code, "x") for code in (408, 409, 429, 500)]
+        [result] = scheduler.run([Job("a", "a", flaky(errors))])
+        self.assertEqual((result.ok, result.value, result.attempts), (True, "ok", 5))
+
+    def test_gives_up_after_max_attempts(self):
+        scheduler = self.scheduler(max_attempts=3, base_delay=0.0)
+        [result] = scheduler.run([Job("a", "a", flaky([MockAPIError(503, "x")] * 5))])
+        self.assertEqual((result.ok, result.attempts), (False, 3))
+
+    def test_retry_after_overrides_backoff(self):
+        scheduler = self.scheduler(base_delay=30.0)
+        error = MockAPIError(429, "slow down", {"retry-after": "0.2"})
+        start = time.monotonic()
+        [result] = scheduler.run([Job("a", "a", flaky([error]))])
+        elapsed = time.monotonic() - start
+        self.assertTrue(result.ok)
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 2.0)
+
+    def test_backoff_without_header_doubles_up_to_max(self):
+        scheduler = self.scheduler(base_delay=1.0, max_delay=5.0)
+        error = MockAPIError(500, "x")
+        for attempt, low in ((1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (6, 5.0)):
+            delay = scheduler._backoff(error, attempt)
+            self.assertTrue(low <= delay <= low * 1.25, (attempt, delay))
+
+    def test_throttling_halves_then_regrows_concurrency(self):
+        scheduler = self.scheduler(concurrency=4, base_delay=0.0)
+        limits = []
+        scheduler.add_listener(
+            lambda event, job, attempt, error: limits.append(scheduler.limit) if event == "retry" else None
+        )
+        throttled = [MockAPIError(429, "x", {"retry-after": "0"})] * 2
+        scheduler.run([Job("a", "a", flaky(throttled))])
+        # 4 -> 2 -> 1, then the success is a full window at a limit of one.
+        self.assertEqual((limits, scheduler.limit), ([2, 1], 2))
+
+        def ok_jobs(n):
+            return [Job(str(i), str(i), flaky([])) for i in range(n)]
+
+        scheduler.run(ok_jobs(1))
+        self.assertEqual(scheduler.limit, 2)  # one success isn't a window of two
+        scheduler.run(ok_jobs(1))
+        self.assertEqual(scheduler.limit, 3)
+        scheduler.run(ok_jobs(3))
+        self.assertEqual(scheduler.limit, 4)
+        scheduler.run(ok_jobs(8))
+        self.assertEqual(scheduler.limit, 4)  # never above `concurrency`
+
+    def test_mock_backend_with_rate_limits_and_server_errors(self):
+        client = MockImageClient(latency=0.0, rate_limit=0.3, error_rate=0.1, retry_after=0.0, seed=3)
+        scheduler = self.scheduler(concurrency=4, max_attempts=20, base_delay=0.0)
+        events = []
+        scheduler.add_listener(lambda event, job, attempt, error: events.append(event))
+        jobs = [
+            Job(str(i), str(i), lambda i=i: client.images.generate(f"prompt {i}", size="16x16"))
+            for i in range(20)
+        ]
+        results = scheduler.run(jobs)
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(sum(r.attempts for r in results), client.images.calls)
+        self.assertGreater(client.images.calls, 20)
+        self.assertEqual(events.count("retry"), client.images.calls - 20)
+        self.assertEqual(events.count("done"), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
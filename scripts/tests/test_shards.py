@@ -0,0 +1,116 @@
+"""Shard assignment and --mode merge of the shards' partial manifests."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from asset_pipeline.backends import solid_png
+from asset_pipeline.image_request import ImageRequest
+from asset_pipeline.manifest import Manifest
+from asset_pipeline.shards import (
+    in_shard,
+    manifest_path,
+    merge_shards,
+    parse_shard,
+    shard_of,
+    write_status,
+)
+
+NAMES = [f"card-{i}" for i in range(300)]
+
+
+class AssignmentTest(unittest.TestCase):
+    def test_assignment_is_pinned(self):
+        # sha256 of the name: the same on every machine and Python process.
+        names = ("blue-eyes", "dark-magician", "card-frame-gold", "board-back")
+        self.assertEqual([shard_of(name, 4) for name in names], [1, 2, 3, 4])
+        self.assertTrue(all(shard_of(name, 1) == 1 for name in NAMES))
+
+    def test_shards_partition_the_run(self):
+        requests = [ImageRequest(name, Path(f"{name}.png"), name) for name in NAMES]
+        for count in (2, 3, 4, 7):
+            shards = [in_shard(requests, (i, count)) for i in range(1, count + 1)]
+            names = [req.name for shard in shards for req in shard]
+            self.assertEqual(sorted(names), sorted(NAMES), count)
+            self.assertTrue(all(shards), count)
+            self.assertLess(max(map(len, shards)), 2 * len(NAMES) / count, count)
+
+    def test_new_names_do_not_move_others(self):
+        before = {name: shard_of(name, 4) for name in NAMES}
+        grown = NAMES + [f"new-card-{i}" for i in range(50)]
+        self.assertEqual({name: shard_of(name, 4) for name in grown if name in before}, before)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "1/0", "2", "a/b"):
+            with self.assertRaises(SystemExit, msg=bad):
+                parse_shard(bad)
+
+
+class MergeTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.assets = Path(tmp.name) / "game-assets"
+        (self.assets / "cards").mkdir(parents=True)
+        self.shards_dir = self.assets / ".cache" / "shards"
+        self.shards_dir.mkdir(parents=True)
+        self.requests = [
+            ImageRequest(name, self.assets / "cards" / f"{name}.png", name, source={"kind": "card"})
+            for name in NAMES[:20]
+        ]
+
+    def run_shard(self, shard, fail=()):
+        """What generate-assets.py --shard leaves behind, minus the rendering."""
+        ran = in_shard(self.requests, shard)
+        partial = Manifest(manifest_path(self.shards_dir, shard), self.assets)
+        for req in ran:
+            if req.name not in fail:
+                req.path.write_bytes(solid_png(8, 8, (len(req.name), 0, 0, 255)))
+                partial.update(req.path, source=req.source)
+        partial.save()
+        failed = [req.label for req in ran if req.name in fail]
+        write_status(self.shards_dir, shard, ran, failed, self.assets)
+        return ran
+
+    def test_merge_combines_every_shard(self):
+        manifest = Manifest(self.assets / "manifest.json", self.assets)
+        manifest.assets["legacy.png"] = {"sha256": "kept"}
+        for i in (1, 2, 3):
+            self.run_shard((i, 3))
+        report = merge_shards(manifest, self.shards_dir)
+        self.assertEqual((report["count"], report["merged"]), (3, 20))
+        self.assertEqual(report["missing_shards"], [])
+        self.assertEqual((report["failed"], report["missing"]), ({}, {}))
+        expected = {"legacy.png"} | {f"cards/{name}.png" for name in NAMES[:20]}
+        self.assertEqual(set(manifest.assets), expected)
+        self.assertEqual(manifest.assets["cards/card-0.png"]["source"], {"kind": "card"})
+
+    def test_merge_reports_gaps(self):
+        failed = in_shard(self.requests, (1, 3))[0]
+        self.run_shard((1, 3), fail={failed.name})
+        lost = self.run_shard((2, 3))[0]
+        lost.path.unlink()  # copied back without its file
+
+        report = merge_shards(Manifest(self.assets / "manifest.json", self.assets), self.shards_dir)
+        self.assertEqual(report["missing_shards"], [3])
+        self.assertEqual(report["failed"], {failed.name: "1-of-3"})
+        self.assertEqual(report["missing"], {lost.name: f"cards/{lost.name}.png"})
+
+        # A --resume of shard 1 that succeeds clears its failure.
+        self.run_shard((1, 3))
+        report = merge_shards(Manifest(self.assets / "manifest.json", self.assets), self.shards_dir)
+        self.assertEqual(report["failed"], {})
+        status = json.loads((self.shards_dir / "status-1-of-3.json").read_text())
+        self.assertEqual(status["failed"], [])
+
+    def test_merge_refuses_mixed_shard_counts(self):
+        self.run_shard((1, 2))
+        self.run_shard((1, 3))
+        with self.assertRaises(SystemExit):
+            merge_shards(Manifest(self.assets / "manifest.json", self.assets), self.shards_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()